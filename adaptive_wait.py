@@ -0,0 +1,104 @@
+"""
+Condition-driven waiting for lazily loaded list rows.
+
+Instead of sleeping a fixed delay after every scroll, the list state is
+polled until it changes. The timeout ceiling is derived from the load
+latencies observed on recent passes and backs off after passes where
+nothing arrived.
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Optional, Tuple
+
+from run_log import sleep
+
+
+class AdaptiveScrollWait:
+    """Wait for new list content after a scroll, learning how long loads take."""
+
+    def __init__(self, min_ceiling: float = 0.5, max_ceiling: float = 8.0,
+                 initial_latency: float = 1.0, headroom: float = 3.0,
+                 backoff_factor: float = 2.0, poll_interval: float = 0.1,
+                 history_size: int = 20):
+        """
+        Args:
+            min_ceiling: Shortest time a single wait may give up after (seconds)
+            max_ceiling: Longest time a single wait may last (seconds)
+            initial_latency: Assumed load latency before any has been observed
+            headroom: Ceiling as a multiple of the typical observed latency
+            backoff_factor: Ceiling multiplier applied after each wait that
+                timed out, reset once content arrives again
+            poll_interval: Delay between two probes of the list state
+            history_size: Number of recent load latencies to learn from
+        """
+        self.min_ceiling = min_ceiling
+        self.max_ceiling = max_ceiling
+        self.initial_latency = initial_latency
+        self.headroom = headroom
+        self.backoff_factor = backoff_factor
+        self.poll_interval = poll_interval
+        self._latencies = deque(maxlen=history_size)
+        self._backoff = 1.0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_wait_time = 0.0
+
+    @property
+    def typical_latency(self) -> float:
+        """Median load latency of recent passes (initial_latency until one is seen)."""
+        if not self._latencies:
+            return self.initial_latency
+        ordered = sorted(self._latencies)
+        return ordered[len(ordered) // 2]
+
+    @property
+    def ceiling(self) -> float:
+        """How long the next wait may last before giving up."""
+        base = max(self.min_ceiling, self.typical_latency * self.headroom)
+        return min(self.max_ceiling, base * self._backoff)
+
+    def wait(self, probe: Callable[[], Any], baseline: Any,
+             started_at: Optional[float] = None) -> Tuple[bool, Any]:
+        """
+        Poll probe() until its result differs from baseline or the ceiling passes.
+
+        Args:
+            probe: Returns a comparable snapshot of the list state
+            baseline: The state captured before the scroll
+            started_at: time.monotonic() of the scroll that triggered the
+                load, when earlier than now; the latency and ceiling are
+                measured from it
+
+        Returns:
+            Tuple of (whether the state changed, last probed state)
+        """
+        wait_start = time.monotonic()
+        load_start = started_at if started_at is not None else wait_start
+        deadline = load_start + self.ceiling
+        self.waits += 1
+
+        while True:
+            state = probe()
+            now = time.monotonic()
+            if state != baseline:
+                self._latencies.append(now - load_start)
+                self._backoff = 1.0
+                self.total_wait_time += now - wait_start
+                return True, state
+            if now >= deadline:
+                self.timeouts += 1
+                self._backoff = min(self._backoff * self.backoff_factor,
+                                    self.max_ceiling / self.min_ceiling)
+                self.total_wait_time += now - wait_start
+                return False, state
+            sleep(min(self.poll_interval, deadline - now))
+
+    def stats(self) -> dict:
+        """Summary of the waits performed so far."""
+        return {
+            "waits": self.waits,
+            "wait_timeouts": self.timeouts,
+            "wait_time": round(self.total_wait_time, 3),
+            "typical_load_latency": round(self.typical_latency, 3),
+        }
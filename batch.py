@@ -0,0 +1,347 @@
+"""
+Non-interactive entry point for scheduled runs (cron, CI, containers).
+
+    python batch.py --account my_account --output results.jsonl
+
+Logs in with the saved session or $INSTAGRAM_PASSWORD, runs one analysis
+and writes the result, with per-phase timings, as JSON, JSONL or CSV. The
+bot's progress output goes to stderr so stdout only carries the result.
+The exit code tells the scheduler what happened:
+
+    0  success
+    1  unexpected error
+    2  invalid arguments
+    3  partial result (a list fell short of the count on the profile)
+    4  rate limited by Instagram (retry later)
+    5  login failed or the session was rejected (needs a person)
+    6  a phase sent more WebDriver commands than its --command-budget
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+from instagram_bot import InstagramBot
+from session_store import SessionStore
+from snapshot_store import SnapshotStore
+from selector_cache import SelectorCache
+from checkpoint_store import CheckpointStore
+from page_health import PageHealthError, RATE_LIMITED
+from rate_limiter import RequestScheduler
+from run_log import configure_logging
+from command_stats import CommandBudgetExceeded, check_budgets, parse_budgets
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2  # argparse's own exit code
+EXIT_PARTIAL = 3
+EXIT_RATE_LIMITED = 4
+EXIT_AUTH_FAILED = 5
+EXIT_OVER_BUDGET = 6
+
+STATUSES = {
+    EXIT_OK: "ok",
+    EXIT_ERROR: "error",
+    EXIT_PARTIAL: "partial",
+    EXIT_RATE_LIMITED: "rate_limited",
+    EXIT_AUTH_FAILED: "auth_failed",
+    EXIT_OVER_BUDGET: "over_budget",
+}
+
+OUTPUT_FORMATS = ("json", "jsonl", "csv")
+
+CSV_COLUMNS = [
+    "account", "status", "exit_code", "started_at", "followers", "following",
+    "non_followers_count", "complete", "login_s", "followers_s", "following_s",
+    "total_s", "non_followers", "error",
+]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line options of the batch runner."""
+    parser = argparse.ArgumentParser(
+        description="Run one non-follower analysis without the interactive menu.",
+        epilog="Exit codes: 0 ok, 1 error, 2 usage, 3 partial, 4 rate limited, 5 login failed, "
+               "6 over the command budget.",
+    )
+    parser.add_argument("--account", default=os.environ.get("INSTAGRAM_USERNAME"),
+                        help="Instagram username (default: $INSTAGRAM_USERNAME)")
+    parser.add_argument("--password-env", default="INSTAGRAM_PASSWORD", metavar="VAR",
+                        help="environment variable holding the password, used when no saved "
+                             "session is valid (default: INSTAGRAM_PASSWORD)")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=True,
+                        help="run Chrome without a window (default: on)")
+    parser.add_argument("--reuse-session", action=argparse.BooleanOptionalAction, default=True,
+                        help="restore the saved session instead of logging in (default: on)")
+    parser.add_argument("--session-dir", help="folder of saved sessions (default: ~/.instagram_bot/sessions)")
+    parser.add_argument("--backend", choices=InstagramBot.BACKENDS, default="browser",
+                        help="scroll the list dialog, or page the API over HTTP")
+    parser.add_argument("--harvest-mode", choices=InstagramBot.HARVEST_MODES, default="batched")
+    parser.add_argument("--scroll-strategy", choices=InstagramBot.SCROLL_STRATEGIES, default="serial")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only scroll through the newest followers and merge them into the last snapshot "
+                             "(the following list is always scanned in full)")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="extract both lists at once in two browsers")
+    parser.add_argument("--lean", action=argparse.BooleanOptionalAction, default=True,
+                        help="skip images, media and fonts (default: on)")
+    parser.add_argument("--page-load-timeout", type=float, default=60.0, metavar="SECONDS",
+                        help="longest time a page may take to load (default: 60)")
+    parser.add_argument("--max-scroll-wait", type=float, default=8.0, metavar="SECONDS",
+                        help="longest wait for new rows after one scroll (default: 8)")
+    parser.add_argument("--idle-budget", type=float, default=12.0, metavar="SECONDS",
+                        help="stop a list after this long without new users (default: 12)")
+    parser.add_argument("--count-tolerance", type=float, default=0.01, metavar="FRACTION",
+                        help="fraction of the profile count a list may fall short of and still "
+                             "be complete (default: 0.01)")
+    parser.add_argument("--rate", type=float, default=3.0, metavar="PER_SECOND",
+                        help="sustained requests per second to Instagram (default: 3)")
+    parser.add_argument("--snapshots", action=argparse.BooleanOptionalAction, default=True,
+                        help="save the lists to the snapshot database (default: on)")
+    parser.add_argument("--checkpoints", action=argparse.BooleanOptionalAction, default=True,
+                        help="checkpoint lists in progress and resume interrupted ones (default: on)")
+    parser.add_argument("--base-url", default="https://www.instagram.com", help=argparse.SUPPRESS)
+    parser.add_argument("--output", "-o", default="-",
+                        help="result file; JSONL and CSV are appended to, '-' is stdout (default)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS,
+                        help="output format (default: from the --output extension, else json)")
+    parser.add_argument("--quiet", "-q", action="store_true", help="discard the bot's progress output")
+    parser.add_argument("--command-report", metavar="PATH",
+                        help="write WebDriver command counts and times by command and call site; "
+                             "Prometheus text format if PATH ends in .prom")
+    parser.add_argument("--command-budget", action="append", default=[], metavar="PHASE=COUNT",
+                        help="exit with code 6 if one occurrence of a phase (e.g. scroll_pass=4) or the "
+                             "whole run (total=2000) sends more WebDriver commands (repeatable)")
+    parser.add_argument("--log-level", choices=("DEBUG", "INFO", "WARNING", "ERROR", "OFF"), type=str.upper,
+                        help="diagnostics written to stderr (default: $INSTAGRAM_BOT_LOG_LEVEL, else WARNING)")
+    parser.add_argument("--log-json", action="store_true", default=None,
+                        help="write diagnostics as JSON lines (default: $INSTAGRAM_BOT_LOG_FORMAT=json)")
+    return parser
+
+
+def make_bot(args: argparse.Namespace) -> InstagramBot:
+    """Create the bot the options describe."""
+    return InstagramBot(
+        headless=args.headless,
+        harvest_mode=args.harvest_mode,
+        max_scroll_wait=args.max_scroll_wait,
+        idle_budget=args.idle_budget,
+        count_tolerance=args.count_tolerance,
+        scroll_strategy=args.scroll_strategy,
+        session_store=SessionStore(args.session_dir) if args.session_dir else SessionStore(),
+        snapshot_store=SnapshotStore() if args.snapshots else None,
+        selector_cache=SelectorCache(),
+        checkpoint_store=CheckpointStore() if args.checkpoints else None,
+        lean=args.lean,
+        base_url=args.base_url,
+        backend=args.backend,
+        page_load_timeout=args.page_load_timeout,
+        scheduler=RequestScheduler(rate=args.rate, burst=max(2.0, 2 * args.rate)),
+    )
+
+
+def classify_error(error: BaseException) -> int:
+    """Map an exception from the bot to an exit code."""
+    if isinstance(error, PageHealthError):
+        return EXIT_RATE_LIMITED if error.status == RATE_LIMITED else EXIT_AUTH_FAILED
+    message = str(error).lower()
+    if "rate limit" in message or "rate-limited" in message:
+        return EXIT_RATE_LIMITED
+    if "not logged in" in message or "login again" in message:
+        return EXIT_AUTH_FAILED
+    return EXIT_ERROR
+
+
+def log_in(bot: InstagramBot, args: argparse.Namespace) -> bool:
+    """Restore the saved session or log in with the password from the environment."""
+    if args.reuse_session and bot.restore_session(args.account):
+        return True
+    password = os.environ.get(args.password_env)
+    if not password:
+        print(f"✗ No valid saved session for {args.account} and ${args.password_env} is not set.")
+        return False
+    return bot.login(args.account, password, reuse_session=False)
+
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Run one analysis.
+
+    Returns:
+        The result record, including its "exit_code"
+    """
+    started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    start = time.monotonic()
+    result = {
+        "account": args.account,
+        "started_at": started_at,
+        "backend": args.backend,
+        "non_followers": [],
+        "counts": {},
+        "complete": {},
+        "timings": {},
+        "error": None,
+    }
+    bot = make_bot(args)
+    try:
+        phase_start = time.monotonic()
+        try:
+            logged_in = log_in(bot, args)
+        except Exception as e:
+            logged_in = False
+            result["error"] = str(e)
+        result["timings"]["login"] = round(time.monotonic() - phase_start, 3)
+        if not logged_in:
+            result["error"] = result["error"] or "Login failed"
+            exit_code = EXIT_AUTH_FAILED
+        else:
+            phase_start = time.monotonic()
+            try:
+                non_followers = bot.find_non_followers(concurrent=args.concurrent,
+                                                       incremental=args.incremental)
+                result["non_followers"] = non_followers
+                complete = all(bot.list_is_complete(kind) for kind in ("followers", "following"))
+                exit_code = EXIT_OK if complete else EXIT_PARTIAL
+            except Exception as e:
+                result["error"] = str(e)
+                exit_code = classify_error(e)
+            result["timings"]["analysis"] = round(time.monotonic() - phase_start, 3)
+
+        for kind in ("followers", "following"):
+            stats = bot.extraction_stats.get(kind)
+            if not stats:
+                continue
+            result["counts"][kind] = stats.get("users")
+            result["complete"][kind] = bot.list_is_complete(kind)
+            result["timings"][kind] = {
+                "elapsed": stats.get("elapsed"),
+                "phases": stats.get("phase_times"),
+            }
+        result["counts"]["non_followers"] = len(result["non_followers"])
+        result["timings"]["startup"] = dict(bot.startup_timings)
+        result["timings"]["run"] = bot.timer.summary()
+        result["webdriver"] = bot.command_stats.as_dict()
+        if args.command_report:
+            bot.command_stats.write(args.command_report, bot.timer, {"account": args.account})
+        if args.command_budget and exit_code in (EXIT_OK, EXIT_PARTIAL):
+            try:
+                check_budgets(bot.timer, parse_budgets(args.command_budget))
+            except CommandBudgetExceeded as e:
+                result["error"] = str(e)
+                exit_code = EXIT_OVER_BUDGET
+        result["stats"] = bot.extraction_stats
+        result["pacing"] = bot.scheduler.stats()
+    finally:
+        bot.close()
+
+    result["timings"]["total"] = round(time.monotonic() - start, 3)
+    result["status"] = STATUSES[exit_code]
+    result["exit_code"] = exit_code
+    return result
+
+
+def csv_row(result: dict) -> dict:
+    """Flatten a result record into one CSV row."""
+    timings = result["timings"]
+    return {
+        "account": result["account"],
+        "status": result["status"],
+        "exit_code": result["exit_code"],
+        "started_at": result["started_at"],
+        "followers": result["counts"].get("followers"),
+        "following": result["counts"].get("following"),
+        "non_followers_count": result["counts"].get("non_followers"),
+        "complete": all(result["complete"].values()) if result["complete"] else "",
+        "login_s": timings.get("login"),
+        "followers_s": (timings.get("followers") or {}).get("elapsed"),
+        "following_s": (timings.get("following") or {}).get("elapsed"),
+        "total_s": timings.get("total"),
+        "non_followers": ";".join(result["non_followers"]),
+        "error": result["error"] or "",
+    }
+
+
+def write_results(results: List[dict], path: str, output_format: str):
+    """
+    Write result records to path ('-' for stdout).
+
+    JSON writes one document (an object, or a list for several records);
+    JSONL and CSV append one line per record, so a cron job can keep
+    adding to the same file.
+    """
+    buffer = io.StringIO()
+    append = output_format != "json" and path != "-"
+    if output_format == "json":
+        json.dump(results[0] if len(results) == 1 else results, buffer, indent=2)
+        buffer.write("\n")
+    elif output_format == "jsonl":
+        for result in results:
+            buffer.write(json.dumps(result) + "\n")
+    else:
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+        if not append or not os.path.exists(path) or os.path.getsize(path) == 0:
+            writer.writeheader()
+        for result in results:
+            writer.writerow(csv_row(result))
+
+    if path == "-":
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "a" if append else "w", encoding="utf-8", newline="") as f:
+        f.write(buffer.getvalue())
+
+
+def output_format_for(path: str, requested: Optional[str]) -> str:
+    """The output format to use: the requested one, else the file extension's."""
+    if requested:
+        return requested
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in OUTPUT_FORMATS else "json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Batch entry point; returns the exit code."""
+    if load_dotenv:
+        load_dotenv()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.account:
+        parser.error("--account is required (or set INSTAGRAM_USERNAME)")
+    try:
+        parse_budgets(args.command_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    configure_logging(args.log_level, args.log_json)
+    progress = open(os.devnull, "w") if args.quiet else sys.stderr
+    try:
+        with contextlib.redirect_stdout(progress):
+            result = run(args)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        if args.quiet:
+            progress.close()
+
+    write_results([result], args.output, output_format_for(args.output, args.format))
+    return result["exit_code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
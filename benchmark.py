@@ -0,0 +1,274 @@
+"""
+Offline benchmark of the list extraction engine.
+
+    python benchmark.py --sizes 1000,10000,50000 --strategies batched/serial,observer/pipelined,http
+
+Starts the fake Instagram (fake_instagram_server.py) in a child process,
+so its lists do not count towards the bot's memory, serves a followers
+list of each size from it, logs a headless Chrome into it once per
+strategy and times ``_extract_user_list("followers")``. A strategy is
+``<harvest mode>/<scroll strategy>`` for the browser backend (e.g.
+``network/pipelined``) or ``http`` for the HTTP backend. The list dialog
+loads its rows from the paginated API with ``--latency`` seconds per page
+and, with ``--virtual-window``, keeps only that many rows in the DOM as
+Instagram's virtualized list does.
+
+For every run it reports users per second, WebDriver commands, API
+requests, peak browser memory, the peak of Python memory allocated during
+the run (traced with tracemalloc) and total time, as a table and
+optionally as JSON (``--output``). ``--command-budget`` makes the
+benchmark exit with 1 when a phase of one run sends more WebDriver
+commands than allowed (see command_stats.py).
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from instagram_bot import InstagramBot
+from fake_instagram_server import FakeInstagram, serve, synthetic_users
+from rate_limiter import RequestScheduler
+from run_log import RunTimer, configure_logging
+from command_stats import check_budgets, parse_budgets
+
+DEFAULT_STRATEGIES = "batched/serial,batched/pipelined,observer/serial,network/serial,http"
+
+
+def parse_strategy(spec: str) -> Tuple[str, str, str]:
+    """
+    Split a strategy specification.
+
+    Returns:
+        Tuple of (backend, harvest mode, scroll strategy)
+    """
+    if spec == "http":
+        return "http", "batched", "serial"
+    harvest_mode, _, scroll_strategy = spec.partition("/")
+    scroll_strategy = scroll_strategy or "serial"
+    if harvest_mode not in InstagramBot.HARVEST_MODES or scroll_strategy not in InstagramBot.SCROLL_STRATEGIES:
+        raise ValueError(f"Unknown strategy {spec!r}; use <harvest mode>/<scroll strategy> or http")
+    return "browser", harvest_mode, scroll_strategy
+
+
+def _run_fake_site(conn, options: dict):
+    """Child process: serve a FakeInstagram and answer the parent's commands."""
+    app = FakeInstagram(**options)
+    server = serve(app)
+    conn.send(server.server_port)
+    followers = {}
+    try:
+        while True:
+            command, argument = conn.recv()
+            if command == "followers":
+                if argument not in followers:
+                    followers[argument] = synthetic_users(argument, "follower")
+                app.lists["followers"] = followers[argument]
+                conn.send(None)
+            elif command == "api_requests":
+                conn.send(app.api_requests)
+            else:
+                break
+    except EOFError:
+        pass
+    finally:
+        server.shutdown()
+
+
+class FakeSite:
+    """The fake Instagram running in a child process."""
+
+    def __init__(self, **options):
+        """
+        Args:
+            options: FakeInstagram arguments
+        """
+        self.username = options.get("username", "fake_user")
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_run_fake_site, args=(child_conn, options),
+                                                name="fake-instagram", daemon=True)
+        self._process.start()
+        self.base_url = f"http://127.0.0.1:{self._conn.recv()}"
+
+    def _call(self, command: str, argument=None):
+        self._conn.send((command, argument))
+        return self._conn.recv()
+
+    def set_followers(self, count: int):
+        """Serve a generated followers list of count users."""
+        self._call("followers", count)
+
+    @property
+    def api_requests(self) -> int:
+        return self._call("api_requests")
+
+    def close(self):
+        try:
+            self._conn.send(("stop", None))
+        except OSError:
+            pass
+        self._process.join(timeout=5)
+
+
+def make_bot(base_url: str, backend: str, harvest_mode: str, args: argparse.Namespace) -> InstagramBot:
+    """A bot for the fake site that is paced by the site's latency only, not by the scheduler."""
+    return InstagramBot(
+        headless=args.headless,
+        harvest_mode=harvest_mode,
+        max_scroll_wait=args.max_scroll_wait,
+        idle_budget=args.idle_budget,
+        lean=True,
+        base_url=base_url,
+        backend=backend,
+        scheduler=RequestScheduler(rate=1000.0, burst=1000.0, jitter=0.0),
+    )
+
+
+def run_once(bot: InstagramBot, site: FakeSite, scroll_strategy: str, budgets: Dict[str, int]) -> dict:
+    """Extract the followers list once and measure it."""
+    bot.profile_counts = {}  # Re-read the header count of this list size
+    bot.peak_browser_rss = 0
+    bot.timer = RunTimer(lambda: bot.command_stats.total)  # Budgets apply to this run alone
+    api_before = site.api_requests
+    traced_before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    start = time.monotonic()
+    with bot.timer.span("extract", list="followers"):
+        users = bot._extract_user_list("followers", strategy=scroll_strategy)
+    elapsed = time.monotonic() - start
+    python_peak = tracemalloc.get_traced_memory()[1] - traced_before
+    return {
+        "users": len(users),
+        "seconds": round(elapsed, 3),
+        "users_per_s": round(len(users) / elapsed, 1) if elapsed else None,
+        "webdriver_commands": bot.timer.summary()["webdriver_commands"],
+        "api_requests": site.api_requests - api_before,
+        "peak_browser_mb": round(bot.peak_browser_rss / 2**20, 1) if bot.peak_browser_rss else None,
+        "python_peak_mb": round(max(0, python_peak) / 2**20, 1),
+        "budget_violations": check_budgets(bot.timer, budgets, raise_on_violation=False) if budgets else [],
+    }
+
+
+def benchmark_strategy(spec: str, site: FakeSite, sizes: List[int],
+                       args: argparse.Namespace, budgets: Dict[str, int]) -> List[dict]:
+    """Run one strategy against every list size; returns one result per size."""
+    backend, harvest_mode, scroll_strategy = parse_strategy(spec)
+    bot = make_bot(site.base_url, backend, harvest_mode, args)
+    results = []
+    try:
+        if not bot.login(site.username, "benchmark", reuse_session=False):
+            raise Exception("Could not log into the fake site")
+        if backend == "http":
+            bot.release_browser()
+        for size in sizes:
+            site.set_followers(size)
+            runs = [run_once(bot, site, scroll_strategy, budgets) for _ in range(args.repeat)]
+            seconds = statistics.median(run["seconds"] for run in runs)
+            result = dict(min(runs, key=lambda run: abs(run["seconds"] - seconds)))
+            result.update({
+                "strategy": spec,
+                "size": size,
+                "complete": all(run["users"] >= size for run in runs),
+                "runs": [run["seconds"] for run in runs],
+                "python_peak_mb": max(run["python_peak_mb"] for run in runs),
+                "budget_violations": sorted({violation for run in runs for violation in run["budget_violations"]}),
+            })
+            results.append(result)
+            print(f"{spec} {size:,}: {result['users_per_s']} users/s", file=sys.stderr)
+    finally:
+        bot.close()
+    return results
+
+
+def print_table(results: List[dict]):
+    """One line per strategy and list size."""
+    print(f"{'Strategy':<20} {'Size':>8} {'Users':>8} {'Users/s':>9} {'Commands':>9} "
+          f"{'API req':>8} {'Browser MB':>10} {'Python MB':>9} {'Time s':>8}")
+    for r in results:
+        print(f"{r['strategy']:<20} {r['size']:>8,} {r['users']:>8,} {r['users_per_s'] or 0:>9.1f} "
+              f"{r['webdriver_commands']:>9,} {r['api_requests']:>8,} {r['peak_browser_mb'] or '-':>10} "
+              f"{r['python_peak_mb']:>9} {r['seconds']:>8.2f}"
+              f"{'' if r['complete'] else '  (incomplete)'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Benchmark entry point.
+
+    Returns:
+        0, or 1 if a strategy failed, fell short of a list or exceeded a
+        command budget
+    """
+    parser = argparse.ArgumentParser(description="Benchmark list extraction against a local fake Instagram.")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated followers list sizes (default: 1000,10000)")
+    parser.add_argument("--strategies", default=DEFAULT_STRATEGIES,
+                        help=f"comma-separated <harvest mode>/<scroll strategy> or http (default: {DEFAULT_STRATEGIES})")
+    parser.add_argument("--latency", type=float, default=0.05, metavar="SECONDS",
+                        help="delay of every API page (default: 0.05)")
+    parser.add_argument("--page-size", type=int, default=25, help="users per API page (default: 25)")
+    parser.add_argument("--virtual-window", type=int, default=0, metavar="ROWS",
+                        help="keep only this many rows in the dialog, like a virtualized list (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per strategy and size; the median is reported")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--max-scroll-wait", type=float, default=8.0, metavar="SECONDS")
+    parser.add_argument("--idle-budget", type=float, default=12.0, metavar="SECONDS")
+    parser.add_argument("--command-budget", action="append", default=[], metavar="PHASE=COUNT",
+                        help="fail if one occurrence of a phase (e.g. scroll_pass=4) sends more WebDriver commands")
+    parser.add_argument("--output", "-o", help="also write the results as JSON to this file")
+    parser.add_argument("--log-level", type=str.upper, choices=("DEBUG", "INFO", "WARNING", "ERROR", "OFF"))
+    args = parser.parse_args(argv)
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+        strategies = [spec.strip() for spec in args.strategies.split(",")]
+        for spec in strategies:
+            parse_strategy(spec)
+        budgets = parse_budgets(args.command_budget)
+    except ValueError as e:
+        parser.error(str(e))
+    configure_logging(args.log_level)
+
+    site = FakeSite(
+        username="bench_user",
+        following=synthetic_users(10, "followed"),
+        page_size=args.page_size,
+        latency=args.latency,
+        virtual_window=args.virtual_window,
+    )
+
+    results = []
+    failed = False
+    tracemalloc.start()
+    try:
+        # The bot's progress output would mix with the table
+        with contextlib.redirect_stdout(sys.stderr):
+            for spec in strategies:
+                try:
+                    results += benchmark_strategy(spec, site, sizes, args, budgets)
+                except Exception as e:
+                    print(f"{spec}: failed: {str(e)}", file=sys.stderr)
+                    failed = True
+    finally:
+        tracemalloc.stop()
+        site.close()
+
+    print_table(results)
+    for r in results:
+        if r["budget_violations"]:
+            print(f"{r['strategy']} {r['size']:,}: over the command budget: {'; '.join(r['budget_violations'])}")
+            failed = True
+    failed = failed or not all(r["complete"] for r in results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": {key: value for key, value in vars(args).items() if key != "output"},
+                       "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+On-disk checkpoints of list extractions in progress.
+
+A long extraction periodically saves the usernames harvested so far and
+how deep into the list it got, so a run that is interrupted (Ctrl+C, a
+timeout, a crashed browser) can resume from there instead of reading the
+whole list again.
+"""
+
+import json
+import os
+import re
+import time
+from typing import List, NamedTuple, Optional
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".instagram_bot", "checkpoints")
+
+
+class Checkpoint(NamedTuple):
+    """Progress of one interrupted extraction."""
+    account: str
+    list_type: str
+    mode: str  # "full" or "incremental", as in SnapshotStore
+    usernames: List[str]
+    depth: int = 0  # Scroll height reached in the list dialog, in pixels (browser backend)
+    cursor: Optional[str] = None  # Next page cursor (HTTP backend)
+    saved_at: float = 0.0
+
+
+class CheckpointStore:
+    """Checkpoints saved as one JSON file per account and list."""
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR, max_age: float = 6 * 3600):
+        """
+        Args:
+            directory: Folder holding the checkpoint files (created on first save)
+            max_age: Checkpoints older than this (seconds) are ignored, since
+                the list has probably changed too much to resume
+        """
+        self.directory = directory
+        self.max_age = max_age
+
+    def path_for(self, account: str, list_type: str) -> str:
+        """Return the checkpoint file path for an account's list."""
+        safe_name = re.sub(r'[^A-Za-z0-9._-]', '_', account.lower())
+        return os.path.join(self.directory, f"{safe_name}.{list_type}.json")
+
+    def load(self, account: str, list_type: str, mode: str) -> Optional[Checkpoint]:
+        """
+        Load the checkpoint of an interrupted extraction.
+
+        Returns:
+            The checkpoint, or None if there is none, it is too old or it
+            was taken in another mode
+        """
+        try:
+            with open(self.path_for(account, list_type), "r", encoding="utf-8") as f:
+                checkpoint = Checkpoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if checkpoint.mode != mode or time.time() - checkpoint.saved_at > self.max_age:
+            return None
+        return checkpoint
+
+    def save(self, checkpoint: Checkpoint):
+        """Save a checkpoint, replacing the previous one for the same list."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(checkpoint.account, checkpoint.list_type)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint._replace(saved_at=time.time())._asdict(), f)
+        os.replace(tmp_path, path)
+
+    def delete(self, account: str, list_type: str):
+        """Forget the checkpoint of a list, e.g. once its extraction completed."""
+        try:
+            os.remove(self.path_for(account, list_type))
+        except FileNotFoundError:
+            pass
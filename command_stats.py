@@ -0,0 +1,243 @@
+"""
+Accounting of the WebDriver commands a bot sends.
+
+Every Selenium call (find_elements, get_attribute, execute_script,
+is_displayed, ...) is one HTTP round trip to chromedriver, and those round
+trips dominate the time spent in login and list extraction. CommandStats
+counts and times them by command and by the bot method that issued them,
+and exports the figures as a text report or in the Prometheus text format:
+
+    bot.command_stats.write("webdriver.prom")
+
+check_budgets() compares the per-phase command counts of a RunTimer with
+a budget, so a benchmark can fail when a change adds round trips.
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from run_log import PHASES
+
+# Call sites are reported by the first frame outside these files
+_SELENIUM_DIR = os.sep + "selenium" + os.sep
+
+
+def _call_site(depth: int = 2) -> str:
+    """Qualified name of the function that issued the current WebDriver command."""
+    frame = sys._getframe(depth)
+    while frame is not None:
+        code = frame.f_code
+        if _SELENIUM_DIR not in code.co_filename and code.co_filename != __file__:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class CommandStats:
+    """Count, total and longest time of WebDriver commands, by command and by call site."""
+
+    def __init__(self, track_call_sites: bool = True):
+        """
+        Args:
+            track_call_sites: Also attribute each command to the function that
+                sent it (walks a few stack frames per command)
+        """
+        self.track_call_sites = track_call_sites
+        self.by_command = {}  # command -> [count, seconds, max seconds]
+        self.by_site = {}  # (call site, command) -> [count, seconds, max seconds]
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def record(self, command: str, seconds: float):
+        """Account one command; call it from the driver.execute wrapper."""
+        site = _call_site(3) if self.track_call_sites else None
+        with self._lock:
+            self._total += 1
+            self._add(self.by_command, command, 1, seconds, seconds)
+            if site is not None:
+                self._add(self.by_site, (site, command), 1, seconds, seconds)
+
+    @staticmethod
+    def _add(table: dict, key, count: int, seconds: float, longest: float):
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [count, seconds, longest]
+        else:
+            entry[0] += count
+            entry[1] += seconds
+            entry[2] = max(entry[2], longest)
+
+    def merge(self, other: "CommandStats"):
+        """Add another bot's figures (e.g. a concurrent worker's) to these."""
+        with self._lock:
+            self._total += other.total
+            for key, entry in other.by_command.items():
+                self._add(self.by_command, key, *entry)
+            for key, entry in other.by_site.items():
+                self._add(self.by_site, key, *entry)
+
+    @property
+    def total(self) -> int:
+        """Commands sent so far; the one count the bot's other figures derive from."""
+        return self._total
+
+    def as_dict(self) -> dict:
+        """The figures as plain data, e.g. for a JSON result record."""
+        with self._lock:
+            return {
+                "total": self._total,
+                "by_command": {
+                    command: {"count": entry[0], "seconds": round(entry[1], 4), "max": round(entry[2], 4)}
+                    for command, entry in sorted(self.by_command.items(), key=lambda item: -item[1][0])
+                },
+                "by_site": [
+                    {"site": site, "command": command, "count": entry[0],
+                     "seconds": round(entry[1], 4), "max": round(entry[2], 4)}
+                    for (site, command), entry in sorted(self.by_site.items(), key=lambda item: -item[1][0])
+                ],
+            }
+
+    def report(self, top: int = 20) -> str:
+        """Text tables of the commands and of the busiest call sites."""
+        data = self.as_dict()
+        lines = [f"WebDriver commands: {data['total']}", "",
+                 f"{'Command':<32} {'Count':>8} {'Total s':>9} {'Avg ms':>8} {'Max ms':>8}"]
+        for command, entry in data["by_command"].items():
+            lines.append(f"{command:<32} {entry['count']:>8} {entry['seconds']:>9.2f} "
+                         f"{entry['seconds'] / entry['count'] * 1000:>8.1f} {entry['max'] * 1000:>8.1f}")
+        if data["by_site"]:
+            lines += ["", f"{'Call site':<56} {'Command':<24} {'Count':>8} {'Total s':>9}"]
+            for entry in data["by_site"][:top]:
+                lines.append(f"{entry['site']:<56} {entry['command']:<24} {entry['count']:>8} {entry['seconds']:>9.2f}")
+        return "\n".join(lines) + "\n"
+
+    def prometheus(self, timer=None, labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        The figures in the Prometheus text exposition format.
+
+        Args:
+            timer: RunTimer whose per-phase command counts and durations to
+                include as well
+            labels: Extra labels for every sample, e.g. {"account": "..."}
+        """
+        base = "".join(f',{name}="{_escape(value)}"' for name, value in (labels or {}).items())
+        lines = [
+            "# HELP instagram_bot_webdriver_commands_total WebDriver commands sent, by command.",
+            "# TYPE instagram_bot_webdriver_commands_total counter",
+        ]
+        with self._lock:
+            by_command = dict(self.by_command)
+            by_site = dict(self.by_site)
+        for command, entry in sorted(by_command.items()):
+            lines.append(f'instagram_bot_webdriver_commands_total{{command="{_escape(command)}"{base}}} {entry[0]}')
+        lines += [
+            "# HELP instagram_bot_webdriver_command_seconds_total Time spent waiting on WebDriver commands.",
+            "# TYPE instagram_bot_webdriver_command_seconds_total counter",
+        ]
+        for command, entry in sorted(by_command.items()):
+            lines.append(f'instagram_bot_webdriver_command_seconds_total{{command="{_escape(command)}"{base}}} {entry[1]:.6f}')
+        if by_site:
+            lines += [
+                "# HELP instagram_bot_webdriver_site_commands_total WebDriver commands sent, by call site.",
+                "# TYPE instagram_bot_webdriver_site_commands_total counter",
+            ]
+            for (site, command), entry in sorted(by_site.items()):
+                lines.append(f'instagram_bot_webdriver_site_commands_total{{site="{_escape(site)}",'
+                             f'command="{_escape(command)}"{base}}} {entry[0]}')
+        if timer is not None:
+            phases = timer.summary()["phases"]
+            lines += [
+                "# HELP instagram_bot_phase_webdriver_commands_total WebDriver commands sent during a phase.",
+                "# TYPE instagram_bot_phase_webdriver_commands_total counter",
+            ]
+            for phase, stats in sorted(phases.items()):
+                lines.append(f'instagram_bot_phase_webdriver_commands_total{{phase="{_escape(phase)}"{base}}} '
+                             f'{stats["commands"]}')
+            lines += [
+                "# HELP instagram_bot_phase_seconds_total Time spent in a phase.",
+                "# TYPE instagram_bot_phase_seconds_total counter",
+            ]
+            for phase, stats in sorted(phases.items()):
+                lines.append(f'instagram_bot_phase_seconds_total{{phase="{_escape(phase)}"{base}}} {stats["total"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, timer=None, labels: Optional[Dict[str, str]] = None):
+        """Write the Prometheus text (for a .prom file) or else the text report to path."""
+        text = self.prometheus(timer, labels) if path.endswith(".prom") else self.report()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        # Replace atomically so a node_exporter textfile collector never reads half a file
+        os.replace(temp_path, path)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CommandBudgetExceeded(Exception):
+    """A phase sent more WebDriver commands than its budget allows."""
+
+    def __init__(self, violations: List[str]):
+        super().__init__("WebDriver command budget exceeded: " + "; ".join(violations))
+        self.violations = violations
+
+
+def parse_budgets(specs: List[str]) -> Dict[str, int]:
+    """
+    Parse budget specifications such as ``scroll_pass=4`` or ``total=2000``.
+
+    A phase's budget applies to each occurrence of it (the most commands
+    one scroll pass sent); "total" limits the whole run.
+
+    Raises:
+        ValueError: For a malformed specification or a phase name that is
+            neither "total" nor one of run_log.PHASES, since a budget for
+            a phase that never runs would always pass
+    """
+    budgets = {}
+    for spec in specs:
+        phase, separator, limit = spec.partition("=")
+        if not separator or not phase or not limit.isdigit():
+            raise ValueError(f"Invalid command budget {spec!r}, expected PHASE=COUNT")
+        if phase != "total" and phase not in PHASES:
+            raise ValueError(f"Unknown phase {phase!r} in command budget {spec!r}; "
+                             f"use total or one of: {', '.join(PHASES)}")
+        budgets[phase] = int(limit)
+    return budgets
+
+
+def check_budgets(timer, budgets: Dict[str, int], raise_on_violation: bool = True) -> List[str]:
+    """
+    Compare a RunTimer's per-phase command counts with budgets.
+
+    Args:
+        timer: The bot's RunTimer
+        budgets: Phase name to the most commands one occurrence may send;
+            "total" limits all commands of the run
+        raise_on_violation: Raise CommandBudgetExceeded instead of only
+            returning the violations
+
+    Returns:
+        Descriptions of the budgets that were exceeded (empty if none)
+    """
+    summary = timer.summary()
+    violations = []
+    for phase, limit in budgets.items():
+        if phase == "total":
+            used = summary["webdriver_commands"]
+        else:
+            stats = summary["phases"].get(phase)
+            if stats is None:
+                continue
+            used = stats["max_commands"]
+        if used > limit:
+            violations.append(f"{phase} used {used} commands (budget {limit})")
+    if violations and raise_on_violation:
+        raise CommandBudgetExceeded(violations)
+    return violations
@@ -0,0 +1,529 @@
+"""
+Keep logged-in bots warm and serve analyses over a local HTTP API.
+
+    python daemon.py --account my_account --port 8765
+    python daemon.py accounts.json --max-age 900 --backend http
+
+Every account gets a worker thread that owns one InstagramBot, logs it in
+once (saved session or password from the environment, as ``batch.py``
+does) and then runs the analyses queued for it. Results are cached, so a
+repeated query answers from memory while the result is younger than its
+``max_age``; concurrent requests for the same account share one queued
+analysis. A bot whose browser grows past ``--max-browser-mb``, or that
+has run ``--recycle-after`` analyses, is closed after the analysis and
+logged in again from the saved session before the next one.
+
+The API has no authentication, so it only listens on a loopback address
+(127.0.0.1 unless ``--host`` names another one) and answers JSON:
+
+    GET  /status                              workers, queues, cache, memory
+    GET  /non-followers?account=A[&max_age=S] non-followers (cached or fresh)
+    GET  /lists?account=A[&max_age=S]         followers and following lists
+    GET  /diff?account=A[&list=followers][&since=2024-06-01][&max_age=S]
+                                              changes between snapshots
+    POST /refresh?account=A                   queue a fresh analysis
+
+``max_age=0`` forces a fresh analysis; ``wait=0`` returns 202 right away
+instead of waiting for a queued analysis to finish.
+"""
+
+import argparse
+import ipaddress
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+import batch
+from driver_cache import resolve_chromedriver
+from multi_account import account_arguments, load_accounts
+from run_log import configure_logging, get_logger
+from snapshot_store import LIST_TYPES, SnapshotStore
+
+log = get_logger("daemon")
+
+# HTTP status answered for each batch.py exit code of a failed analysis
+HTTP_STATUS = {
+    batch.EXIT_ERROR: 500,
+    batch.EXIT_RATE_LIMITED: 429,
+    batch.EXIT_AUTH_FAILED: 401,
+}
+
+
+class AnalysisJob:
+    """One queued analysis and the requests waiting for it."""
+
+    def __init__(self, account: str):
+        self.account = account
+        self.queued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None  # Cached result record once finished
+        self.error = None
+        self.exit_code = None
+
+
+class AccountWorker(threading.Thread):
+    """Owns one account's bot and runs its analyses one at a time."""
+
+    def __init__(self, args: argparse.Namespace, max_browser_rss: Optional[int] = None,
+                 recycle_after: int = 0):
+        """
+        Args:
+            args: batch.py options of the account (see batch.build_parser)
+            max_browser_rss: Recycle the browser once its resident memory
+                exceeds this many bytes after an analysis
+            recycle_after: Recycle the bot after this many analyses (0: never)
+        """
+        super().__init__(name=f"worker-{args.account}", daemon=True)
+        self.args = args
+        self.account = args.account
+        self.max_browser_rss = max_browser_rss
+        self.recycle_after = recycle_after
+        self.bot = None
+        self.state = "starting"
+        self.analyses = 0  # Since the bot was (re)started
+        self.recycles = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_error = None
+        self.last_rss = None
+        self._cache = None  # Last result record
+        self._cached_at = None  # time.monotonic() of the last result
+        self._running = None  # Job being analysed; its result will be fresh too
+        self._pending = None  # Queued job not started yet, shared by new requests
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+
+    def cached(self, max_age: float) -> Optional[dict]:
+        """The cached result if it is at most max_age seconds old."""
+        with self._lock:
+            return self._fresh(max_age)
+
+    def _fresh(self, max_age: float) -> Optional[dict]:
+        if self._cache is None or time.monotonic() - self._cached_at > max_age:
+            return None
+        return self._cache
+
+    def request(self, max_age: float) -> AnalysisJob:
+        """
+        Get a result at most max_age seconds old.
+
+        Returns:
+            A finished job holding the cached result, or the running or
+            queued job that will produce a fresh one (shared with other
+            waiting requests; max_age=0 always waits for a new analysis)
+        """
+        with self._lock:
+            cached = self._fresh(max_age)
+            if cached is not None:
+                self.cache_hits += 1
+                job = AnalysisJob(self.account)
+                job.result = cached
+                job.done.set()
+                return job
+            self.cache_misses += 1
+            if self._running is not None and max_age > 0:
+                return self._running
+            if self._pending is None:
+                self._pending = AnalysisJob(self.account)
+                self._jobs.put(self._pending)
+            return self._pending
+
+    def stop(self):
+        """Let the worker finish its current analysis and close the bot."""
+        self._jobs.put(None)
+
+    def run(self):
+        try:
+            try:
+                self._start_bot()
+            except Exception as e:
+                self.last_error = str(e)
+                self.state = "login_failed"
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                with self._lock:
+                    if self._pending is job:
+                        self._pending = None
+                    self._running = job
+                try:
+                    self._run_job(job)
+                except Exception as e:
+                    # Never leave the waiting requests hanging
+                    job.error = self.last_error = str(e)
+                    job.exit_code = batch.EXIT_ERROR
+                    job.done.set()
+                finally:
+                    with self._lock:
+                        self._running = None
+        finally:
+            self._close_bot()
+            self.state = "stopped"
+
+    def _start_bot(self) -> bool:
+        """Create the bot and log it in; the browser then stays open between analyses."""
+        self.state = "logging_in"
+        self.bot = batch.make_bot(self.args)
+        self.analyses = 0
+        try:
+            logged_in = batch.log_in(self.bot, self.args)
+        except Exception as e:
+            self.last_error = str(e)
+            logged_in = False
+        if not logged_in:
+            self.last_error = self.last_error or "Login failed"
+            self._close_bot()
+            self.state = "login_failed"
+            return False
+        if self.args.backend == "http" and self.bot.has_driver:
+            # The lists are paged over HTTP; no need to keep Chrome around
+            self.bot.release_browser()
+        self.state = "idle"
+        return True
+
+    def _close_bot(self):
+        if self.bot is None:
+            return
+        if self.bot.snapshot_store:
+            self.bot.snapshot_store.close()
+        self.bot.close()
+        self.bot = None
+
+    def _run_job(self, job: AnalysisJob):
+        if self.bot is None and not self._start_bot():
+            job.error = self.last_error
+            job.exit_code = batch.EXIT_AUTH_FAILED
+            job.done.set()
+            return
+
+        self.state = "busy"
+        start = time.monotonic()
+        try:
+            non_followers = self.bot.find_non_followers(concurrent=self.args.concurrent,
+                                                        incremental=self.args.incremental)
+        except Exception as e:
+            job.error = self.last_error = str(e)
+            job.exit_code = batch.classify_error(e)
+            if job.exit_code == batch.EXIT_ERROR:
+                # The browser is in an unknown state; start over for the next request
+                self._recycle("analysis failed")
+            elif job.exit_code == batch.EXIT_AUTH_FAILED:
+                # The session was rejected; log in again (saved session, then password)
+                # instead of sending every later request with the same cookies
+                self._recycle("session rejected")
+            self.state = "idle" if self.bot else self.state
+            job.done.set()
+            return
+
+        bot = self.bot
+        result = {
+            "account": self.account,
+            "finished_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "analysis_s": round(time.monotonic() - start, 3),
+            "non_followers": non_followers,
+            "followers": bot.last_lists.get("followers", []),
+            "following": bot.last_lists.get("following", []),
+            "counts": {kind: len(bot.last_lists.get(kind, [])) for kind in LIST_TYPES},
+            "complete": {kind: bot.list_is_complete(kind) for kind in LIST_TYPES},
+        }
+        result["counts"]["non_followers"] = len(non_followers)
+        with self._lock:
+            self._cache = result
+            self._cached_at = time.monotonic()
+        self.analyses += 1
+        self.last_error = None
+        job.result = result
+        job.exit_code = batch.EXIT_OK if all(result["complete"].values()) else batch.EXIT_PARTIAL
+        job.done.set()
+
+        self.last_rss = bot.browser_rss()
+        if self.max_browser_rss and self.last_rss and self.last_rss > self.max_browser_rss:
+            self._recycle(f"browser uses {self.last_rss / 2**20:.0f} MB")
+        elif self.recycle_after and self.analyses >= self.recycle_after:
+            self._recycle(f"{self.analyses} analyses")
+        self.state = "idle" if self.bot else self.state
+
+    def _recycle(self, reason: str):
+        """Quit the bot and log in again (from the saved session) with a fresh browser."""
+        log.info(f"{self.account}: recycling the bot ({reason})")
+        self.recycles += 1
+        self._close_bot()
+        self._start_bot()
+
+    def status(self) -> dict:
+        with self._lock:
+            cache_age = None if self._cached_at is None else round(time.monotonic() - self._cached_at, 1)
+            pending = self._pending is not None
+        return {
+            "state": self.state,
+            "queued": pending,
+            "analyses": self.analyses,
+            "recycles": self.recycles,
+            "cache_age_s": cache_age,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "browser_rss_mb": round(self.last_rss / 2**20, 1) if self.last_rss else None,
+            "last_error": self.last_error,
+        }
+
+
+class AnalysisDaemon:
+    """The account workers, their shared snapshot history and the request defaults."""
+
+    def __init__(self, workers: Dict[str, AccountWorker], max_age: float = 900.0,
+                 wait_timeout: float = 900.0, snapshot_store: Optional[SnapshotStore] = None):
+        """
+        Args:
+            workers: Worker per account name
+            max_age: Default age (seconds) up to which cached results are served
+            wait_timeout: Longest time a request waits for a queued analysis
+                before it is answered with 202
+            snapshot_store: Snapshot history for /diff (None disables it)
+        """
+        self.workers = workers
+        self.max_age = max_age
+        self.wait_timeout = wait_timeout
+        self.snapshot_store = snapshot_store
+        self.started_at = time.monotonic()
+
+    def start(self):
+        for worker in self.workers.values():
+            worker.start()
+
+    def stop(self):
+        for worker in self.workers.values():
+            worker.stop()
+        for worker in self.workers.values():
+            worker.join()
+        if self.snapshot_store:
+            self.snapshot_store.close()
+
+    def status(self) -> dict:
+        return {
+            "uptime_s": round(time.monotonic() - self.started_at, 1),
+            "default_max_age_s": self.max_age,
+            "accounts": {name: worker.status() for name, worker in self.workers.items()},
+        }
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """Routes API requests to the daemon held by the server."""
+
+    server_version = "InstagramBotDaemon/1.0"
+
+    @property
+    def app(self) -> AnalysisDaemon:
+        return self.server.app
+
+    def log_message(self, format, *args):
+        log.debug(f"{self.command} {self.path} -> {args[1] if len(args) > 1 else ''}")
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path == "/status":
+            self._send_json(200, self.app.status())
+        elif url.path in ("/non-followers", "/lists", "/diff"):
+            self._analysis(url.path.lstrip("/"), query)
+        else:
+            self._send_json(404, {"error": "Unknown endpoint"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path != "/refresh":
+            self._send_json(404, {"error": "Unknown endpoint"})
+            return
+        worker = self._worker(query)
+        if worker:
+            job = worker.request(0.0)
+            self._send_json(202, {"account": worker.account, "queued": True,
+                                  "queued_for_s": round(time.monotonic() - job.queued_at, 1)})
+
+    def _worker(self, query: dict) -> Optional[AccountWorker]:
+        workers = self.app.workers
+        account = query.get("account")
+        if account is None and len(workers) == 1:
+            account = next(iter(workers))
+        if account not in workers:
+            self._send_json(404, {"error": f"Unknown account: {account}", "accounts": sorted(workers)})
+            return None
+        return workers[account]
+
+    def _analysis(self, endpoint: str, query: dict):
+        worker = self._worker(query)
+        if worker is None:
+            return
+        try:
+            max_age = float(query.get("max_age", self.app.max_age))
+            wait = float(query.get("wait", self.app.wait_timeout))
+        except ValueError:
+            self._send_json(400, {"error": "max_age and wait must be numbers of seconds"})
+            return
+        list_type = query.get("list", "followers")
+        if endpoint == "diff":
+            if not self.app.snapshot_store:
+                self._send_json(400, {"error": "Snapshots are disabled (--no-snapshots)"})
+                return
+            if list_type not in LIST_TYPES:
+                self._send_json(400, {"error": f"list must be one of {', '.join(LIST_TYPES)}"})
+                return
+
+        start = time.monotonic()
+        cached = worker.cached(max_age) is not None
+        job = worker.request(max_age)
+        if not job.done.wait(wait):
+            self._send_json(202, {"account": worker.account, "queued": True, "state": worker.state})
+            return
+        if job.result is None:
+            self._send_json(HTTP_STATUS.get(job.exit_code, 500),
+                            {"account": worker.account, "error": job.error,
+                             "status": batch.STATUSES.get(job.exit_code, "error")})
+            return
+
+        result = job.result
+        payload = {
+            "account": worker.account,
+            "cached": cached,
+            "finished_at": result["finished_at"],
+            "complete": result["complete"],
+            "counts": result["counts"],
+            "served_in_s": round(time.monotonic() - start, 3),
+        }
+        if endpoint == "non-followers":
+            payload["non_followers"] = result["non_followers"]
+        elif endpoint == "lists":
+            payload["followers"] = result["followers"]
+            payload["following"] = result["following"]
+        else:
+            changes = self.app.snapshot_store.changes(worker.account, list_type, query.get("since"))
+            payload.update({
+                "list": list_type,
+                "old": changes.old.taken_at if changes.old else None,
+                "new": changes.new.taken_at if changes.new else None,
+                "added": changes.added,
+                "removed": changes.removed,
+            })
+        self._send_json(200, payload)
+
+
+def is_loopback(host: str) -> bool:
+    """Whether host is a loopback address (or "localhost")."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(daemon: AnalysisDaemon, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Start the daemon's workers and serve its API in a background thread.
+
+    Returns:
+        The running server; ``server.shutdown()`` stops answering requests
+    """
+    daemon.start()
+    server = ThreadingHTTPServer((host, port), DaemonHandler)
+    server.app = daemon
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="daemon-api", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if load_dotenv:
+        load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Keep logged-in bots warm and serve analyses over a local HTTP API.",
+        epilog="Any further arguments (e.g. --backend http --incremental) are passed to every account's "
+               "bot as batch.py options.",
+    )
+    parser.add_argument("accounts_file", nargs="?", help="JSON or text file listing the accounts (see multi_account.py)")
+    parser.add_argument("--account", action="append", default=[],
+                        help="account to serve (repeatable; default: $INSTAGRAM_USERNAME)")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="loopback address to listen on; the API has no authentication (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-age", type=float, default=900.0, metavar="SECONDS",
+                        help="serve cached results up to this old unless a request says otherwise (default: 900)")
+    parser.add_argument("--wait", type=float, default=900.0, metavar="SECONDS",
+                        help="longest time a request waits for its analysis before getting 202 (default: 900)")
+    parser.add_argument("--max-browser-mb", type=float, default=1500.0, metavar="MB",
+                        help="recycle a browser using more memory than this after an analysis (default: 1500)")
+    parser.add_argument("--recycle-after", type=int, default=20, metavar="ANALYSES",
+                        help="recycle a bot after this many analyses, 0 for never (default: 20)")
+    parser.add_argument("--rate", type=float, default=3.0, metavar="PER_SECOND",
+                        help="requests per second for all accounts together (default: 3)")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="run one analysis per account at startup to fill the cache")
+    args, shared = parser.parse_known_args(argv)
+    if not is_loopback(args.host):
+        parser.error(f"--host {args.host} is not a loopback address; the API has no authentication "
+                     f"and would serve your lists to anyone who can reach it")
+
+    accounts = load_accounts(args.accounts_file) if args.accounts_file else []
+    accounts += [{"account": name} for name in args.account]
+    if not accounts and os.environ.get("INSTAGRAM_USERNAME"):
+        accounts = [{"account": os.environ["INSTAGRAM_USERNAME"]}]
+    if not accounts:
+        parser.error("give an accounts file or --account (or set INSTAGRAM_USERNAME)")
+
+    batch_parser = batch.build_parser()
+    account_args = [batch_parser.parse_args(account_arguments(entry, shared, args.rate / len(accounts)))
+                    for entry in accounts]
+    configure_logging(account_args[0].log_level, account_args[0].log_json)
+    if any(options.backend == "browser" for options in account_args):
+        # Resolve the driver once rather than in every worker at the same time
+        try:
+            resolve_chromedriver()
+        except Exception as e:
+            log.warning(f"Could not resolve chromedriver up front: {str(e)}")
+
+    workers = {
+        options.account: AccountWorker(options, max_browser_rss=int(args.max_browser_mb * 2**20),
+                                       recycle_after=args.recycle_after)
+        for options in account_args
+    }
+    daemon = AnalysisDaemon(workers, max_age=args.max_age, wait_timeout=args.wait,
+                            snapshot_store=SnapshotStore() if account_args[0].snapshots else None)
+    server = serve(daemon, args.host, args.port)
+    if args.prefetch:
+        for worker in workers.values():
+            worker.request(0.0)
+    print(f"Serving {len(workers)} account(s) at http://{args.host}:{server.server_port}/ (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("Stopping; waiting for running analyses to finish...")
+    finally:
+        server.shutdown()
+        daemon.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
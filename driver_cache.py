@@ -0,0 +1,86 @@
+"""
+Local cache of the chromedriver binary location.
+
+webdriver-manager checks the installed Chrome version and the driver
+registry on every install() call. Remembering the resolved binary (and the
+version it was resolved for) lets later runs start the driver straight
+away.
+"""
+
+import json
+import os
+import re
+import time
+from typing import Optional
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".instagram_bot", "chromedriver.json")
+
+# Explicit driver binary; bypasses the cache and webdriver-manager entirely
+DRIVER_PATH_ENV = "CHROMEDRIVER_PATH"
+# Driver version to pin, e.g. "120.0.6099.109"
+DRIVER_VERSION_ENV = "CHROMEDRIVER_VERSION"
+
+
+def resolve_chromedriver(version: Optional[str] = None,
+                         cache_file: str = DEFAULT_CACHE_FILE,
+                         refresh: bool = False) -> str:
+    """
+    Return the path of a chromedriver binary, downloading it only when needed.
+
+    Args:
+        version: Driver version to pin; defaults to $CHROMEDRIVER_VERSION,
+            or whatever matches the installed Chrome when neither is set
+        cache_file: JSON file remembering the resolved binary
+        refresh: Ignore the cached binary and resolve it again, e.g. after
+            the cached driver no longer matches an auto-updated Chrome
+
+    Returns:
+        Path to an executable chromedriver
+    """
+    explicit_path = os.environ.get(DRIVER_PATH_ENV)
+    if explicit_path:
+        return explicit_path
+
+    version = version or os.environ.get(DRIVER_VERSION_ENV)
+    cached = None if refresh else _read_cache(cache_file)
+    if (cached and _is_executable(cached.get("path")) and
+            (not version or cached.get("version") == version)):
+        return cached["path"]
+
+    # Imported here so cached starts don't pay for loading webdriver-manager
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager(driver_version=version).install()
+    _write_cache(cache_file, {
+        "path": path,
+        "version": version or _version_from_path(path),
+        "resolved_at": time.time(),
+    })
+    return path
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _version_from_path(path: str) -> Optional[str]:
+    """webdriver-manager stores drivers under a directory named after their version."""
+    match = re.search(r'(\d+\.\d+\.\d+\.\d+)', path)
+    return match.group(1) if match else None
+
+
+def _read_cache(cache_file: str) -> Optional[dict]:
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_file: str, entry: dict):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+    except OSError:
+        # Caching is an optimisation only
+        pass
@@ -0,0 +1,452 @@
+"""
+Local stand-in for the parts of Instagram the bot talks to.
+
+Serves a login form, a profile page with follower/following counts, the
+followers/following dialog (rows loaded from a paginated JSON API as the
+list is scrolled) and the profile and friendship APIs themselves. Lists
+are either generated or replayed from recorded API responses, and the API
+can be told to answer 429 now and then or to expire its cursors, so
+extraction backends can be exercised offline:
+
+    python fake_instagram_server.py --port 8000 --followers 500 --following 300
+
+and then ``InstagramBot(base_url="http://127.0.0.1:8000")``. Any username
+and password are accepted by the login form.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+LIST_TYPES = ("followers", "following")
+
+_API_PATH = re.compile(r"^/api/v1/friendships/([^/]+)/(followers|following)/$")
+_PROFILE_API_PATH = "/api/v1/users/web_profile_info/"
+_LIST_PATH = re.compile(r"^/([A-Za-z0-9._]+)/(followers|following)/$")
+_PROFILE_PATH = re.compile(r"^/([A-Za-z0-9._]+)/$")
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 0; }}
+header ul {{ list-style: none; display: flex; gap: 24px; }}
+div[role=dialog] {{ position: fixed; top: 10%; left: 30%; width: 40%; height: 70%;
+                    background: #fff; border: 1px solid #ccc; display: flex; flex-direction: column; }}
+.list {{ flex: 1; overflow-y: auto; }}
+.row {{ height: 60px; display: flex; align-items: center; gap: 12px; padding: 0 16px; }}
+</style></head>
+<body>{body}</body></html>
+"""
+
+_LOGIN_FORM = """
+<main><form method="post" action="/accounts/login/">
+<input type="text" name="username" aria-label="Phone number, username, or email">
+<input type="password" name="password" aria-label="Password">
+<button type="submit">Log in</button>
+</form></main>
+"""
+
+# Loads rows from the API into the dialog, one page at a time, as Instagram's
+# client does when the list is scrolled near its end. With a virtual window,
+# only the last that many rows stay in the DOM and a spacer keeps the height
+# of the removed ones, like a virtualized list.
+_DIALOG_SCRIPT = """
+<script>
+(function () {
+    var list = document.querySelector('div[role=dialog] .list');
+    var virtualWindow = %(virtual_window)d;
+    var spacer = document.createElement('div');
+    var removed = 0;
+    list.appendChild(spacer);
+    var cursor = '';
+    var loading = false;
+    var done = false;
+    function load() {
+        if (loading || done) { return; }
+        loading = true;
+        var url = '/api/v1/friendships/%(user_id)s/%(list_type)s/?count=%(page_size)d' +
+                  (cursor ? '&max_id=' + encodeURIComponent(cursor) : '');
+        fetch(url, {credentials: 'same-origin'}).then(function (response) {
+            if (!response.ok) { throw new Error('HTTP ' + response.status); }
+            return response.json();
+        }).then(function (data) {
+            (data.users || []).forEach(function (user) {
+                var row = document.createElement('div');
+                row.className = 'row';
+                var link = document.createElement('a');
+                link.href = '/' + user.username + '/';
+                link.textContent = user.username;
+                var name = document.createElement('span');
+                name.textContent = user.full_name || '';
+                row.appendChild(link);
+                row.appendChild(name);
+                list.appendChild(row);
+            });
+            if (virtualWindow) {
+                while (list.children.length - 1 > virtualWindow) {
+                    list.removeChild(spacer.nextSibling);
+                    removed++;
+                }
+                spacer.style.height = (removed * 60) + 'px';
+            }
+            cursor = data.next_max_id || '';
+            done = !cursor;
+        }).then(function () {
+            loading = false;
+            if (!done && list.scrollHeight <= list.clientHeight) { load(); }
+        }, function () {
+            // Rate limited or stale cursor: the next scroll retries, as Instagram's client does
+            loading = false;
+        });
+    }
+    list.addEventListener('scroll', function () {
+        if (list.scrollTop + list.clientHeight >= list.scrollHeight - 120) { load(); }
+    });
+    load();
+})();
+</script>
+"""
+
+
+def synthetic_users(count: int, prefix: str) -> List[dict]:
+    """Generate count users in the shape of the friendship API."""
+    return [
+        {
+            "pk": str(10_000_000 + i),
+            "username": f"{prefix}{i:05d}",
+            "full_name": f"{prefix.title()} {i}",
+            "is_private": i % 3 == 0,
+            "is_verified": i % 50 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def load_recorded_pages(directory: str) -> Dict[str, List[dict]]:
+    """
+    Read recorded API responses, one JSON body per file.
+
+    Files are named ``followers_<n>.json`` / ``following_<n>.json`` and are
+    replayed in the order of their names.
+
+    Returns:
+        The users of each recorded list, in page order
+    """
+    lists = {}
+    for list_type in LIST_TYPES:
+        users = []
+        for path in sorted(glob.glob(os.path.join(directory, f"{list_type}_*.json"))):
+            with open(path, "r", encoding="utf-8") as f:
+                users.extend(json.load(f).get("users", []))
+        if users:
+            lists[list_type] = users
+    return lists
+
+
+class FakeInstagram:
+    """State of the fake site: the account, its lists and how pages are cut."""
+
+    def __init__(self, username: str = "fake_user", followers: Optional[List[dict]] = None,
+                 following: Optional[List[dict]] = None, page_size: int = 12,
+                 latency: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: float = 1.0, cursor_ttl: float = 0.0, virtual_window: int = 0):
+        """
+        Args:
+            username: The account whose profile and lists are served
+            followers: Users following the account (friendship API shape)
+            following: Users the account follows
+            page_size: Users per API page (capped by the request's count)
+            latency: Delay added to every API response (seconds)
+            rate_limit_every: Answer every n-th list API request with 429
+                (0 never does)
+            retry_after: Retry-After sent with those 429 responses (seconds)
+            cursor_ttl: Reject pagination cursors older than this with a
+                400, as Instagram does for stale cursors (0 never expires)
+            virtual_window: Keep only this many rows in the list dialog's
+                DOM, dropping the oldest as new ones load (0 keeps all)
+        """
+        self.username = username
+        self.user_id = "4242"
+        self.lists = {
+            "followers": followers if followers is not None else synthetic_users(120, "follower"),
+            "following": following if following is not None else (
+                synthetic_users(120, "follower")[:60] + synthetic_users(20, "followed")),
+        }
+        self.page_size = page_size
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.cursor_ttl = cursor_ttl
+        self.virtual_window = virtual_window
+        self.sessions = set()
+        self.api_requests = 0
+        self.rate_limited = 0
+        self.expired_cursors = 0
+        self._lock = threading.Lock()
+
+    def new_session(self) -> str:
+        session_id = secrets.token_hex(16)
+        with self._lock:
+            self.sessions.add(session_id)
+        return session_id
+
+    def profile_info(self) -> dict:
+        """The account in the web_profile_info response format."""
+        return {
+            "data": {"user": {
+                "id": self.user_id,
+                "username": self.username,
+                "edge_followed_by": {"count": len(self.lists["followers"])},
+                "edge_follow": {"count": len(self.lists["following"])},
+            }},
+            "status": "ok",
+        }
+
+    def page(self, list_type: str, max_id: Optional[str], count: Optional[int]) -> Tuple[int, dict]:
+        """
+        One page of a list, in the friendship API's response format.
+
+        Returns:
+            Tuple of (HTTP status, response body)
+        """
+        with self._lock:
+            self.api_requests += 1
+            request_number = self.api_requests
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            with self._lock:
+                self.rate_limited += 1
+            return 429, {"message": "Please wait a few minutes before you try again.", "status": "fail"}
+
+        start = 0
+        if max_id:
+            # Cursors are "<offset>.<issued at, ms>"
+            try:
+                offset, issued_at = max_id.split(".")
+                start = int(offset)
+                expired = self.cursor_ttl and time.time() - int(issued_at) / 1000 > self.cursor_ttl
+            except ValueError:
+                expired = True
+            if expired:
+                with self._lock:
+                    self.expired_cursors += 1
+                return 400, {"message": "Invalid max_id cursor", "status": "fail"}
+
+        users = self.lists[list_type]
+        size = min(count or self.page_size, self.page_size)
+        end = start + size
+        cursor = f"{end}.{int(time.time() * 1000)}" if end < len(users) else None
+        return 200, {
+            "users": users[start:end],
+            "next_max_id": cursor,
+            "big_list": cursor is not None,
+            "page_size": size,
+            "status": "ok",
+        }
+
+
+class FakeInstagramHandler(BaseHTTPRequestHandler):
+    """Routes requests to the FakeInstagram held by the server."""
+
+    server_version = "FakeInstagram/1.0"
+
+    @property
+    def app(self) -> FakeInstagram:
+        return self.server.app
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; the bot does its own logging
+        pass
+
+    def _session(self) -> Optional[str]:
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "sessionid" and value in self.app.sessions:
+                return value
+        return None
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8",
+              headers: Optional[dict] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        self._send(status, json.dumps(payload), "application/json", headers)
+
+    def _redirect(self, location: str, cookies: Optional[List[str]] = None):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for cookie in cookies or []:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/accounts/login/":
+            self._send(404, _PAGE.format(title="Page not found", body="<main>Page not found</main>"))
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if not form.get("username") or not form.get("password"):
+            self._send(200, _PAGE.format(title="Login", body=_LOGIN_FORM))
+            return
+        session_id = self.app.new_session()
+        self._redirect("/", [
+            f"sessionid={session_id}; Path=/; Max-Age=86400; HttpOnly",
+            f"csrftoken={secrets.token_hex(16)}; Path=/; Max-Age=86400",
+            f"ds_user_id={self.app.user_id}; Path=/; Max-Age=86400",
+        ])
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        if path == "/accounts/login/":
+            self._send(200, _PAGE.format(title="Login", body=_LOGIN_FORM))
+            return
+
+        if path == _PROFILE_API_PATH:
+            if not self._session():
+                self._send_json(401, {"message": "login_required", "status": "fail"})
+            elif parse_qs(url.query).get("username", [None])[0] != self.app.username:
+                self._send_json(404, {"message": "User not found", "status": "fail"})
+            else:
+                self._send_json(200, self.app.profile_info())
+            return
+
+        api = _API_PATH.match(path)
+        if api:
+            self._api(api.group(2), parse_qs(url.query))
+            return
+
+        if not self._session():
+            if path == "/":
+                self._send(200, _PAGE.format(title="Instagram", body=_LOGIN_FORM))
+            else:
+                self._redirect("/accounts/login/")
+            return
+
+        if path == "/":
+            self._send(200, _PAGE.format(title="Instagram", body="<main><h1>Home</h1></main>"))
+            return
+        listing = _LIST_PATH.match(path)
+        if listing and listing.group(1) == self.app.username:
+            self._send(200, self._profile_page(listing.group(2)))
+            return
+        profile = _PROFILE_PATH.match(path)
+        if profile and profile.group(1) == self.app.username:
+            self._send(200, self._profile_page(None))
+            return
+        self._send(404, _PAGE.format(title="Page not found",
+                                     body="<main>Sorry, this page isn't available.</main>"))
+
+    def _api(self, list_type: str, query: dict):
+        if not self._session():
+            self._send_json(401, {"message": "login_required", "status": "fail"})
+            return
+        if self.app.latency:
+            time.sleep(self.app.latency)
+        max_id = query.get("max_id", [None])[0]
+        count = query.get("count", [None])[0]
+        status, payload = self.app.page(list_type, max_id, int(count) if count else None)
+        headers = {"Retry-After": f"{self.app.retry_after:g}"} if status == 429 else None
+        self._send_json(status, payload, headers)
+
+    def _profile_page(self, open_list: Optional[str]) -> str:
+        app = self.app
+        counts = "".join(
+            f'<li><a href="/{app.username}/{list_type}/">'
+            f'<span title="{len(app.lists[list_type]):,}">{len(app.lists[list_type]):,}</span> {list_type}</a></li>'
+            for list_type in LIST_TYPES
+        )
+        body = f"<header><h2>{app.username}</h2><ul><li><span>0</span> posts</li>{counts}</ul></header><main></main>"
+        if open_list:
+            body += (f'<div role="dialog"><div><h1>{open_list.title()}</h1></div>'
+                     f'<div class="list"></div></div>')
+            body += _DIALOG_SCRIPT % {
+                "user_id": app.user_id,
+                "list_type": open_list,
+                "page_size": app.page_size,
+                "virtual_window": app.virtual_window,
+            }
+        return _PAGE.format(title=f"{app.username} • Instagram", body=body)
+
+
+def serve(app: FakeInstagram, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start serving app in a background thread.
+
+    Args:
+        app: The fake site
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+
+    Returns:
+        The running server; its URL is ``http://host:server.server_port``
+        and ``server.shutdown()`` stops it
+    """
+    server = ThreadingHTTPServer((host, port), FakeInstagramHandler)
+    server.app = app
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-instagram", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Instagram for offline runs of the bot.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--username", default="fake_user", help="account whose lists are served")
+    parser.add_argument("--followers", type=int, default=120, help="number of generated followers")
+    parser.add_argument("--following", type=int, default=80, help="number of generated followed accounts")
+    parser.add_argument("--mutual", type=int, default=60,
+                        help="how many of the followed accounts are generated followers too")
+    parser.add_argument("--page-size", type=int, default=12, help="users per API page")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay per API response, in seconds")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="answer every n-th list API request with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of those 429s, in seconds")
+    parser.add_argument("--cursor-ttl", type=float, default=0.0,
+                        help="reject pagination cursors older than this many seconds")
+    parser.add_argument("--virtual-window", type=int, default=0,
+                        help="keep only this many rows in the list dialog, like a virtualized list (0 keeps all)")
+    parser.add_argument("--recordings", help="directory of recorded followers_*.json / following_*.json responses")
+    args = parser.parse_args()
+
+    lists = load_recorded_pages(args.recordings) if args.recordings else {}
+    app = FakeInstagram(
+        username=args.username,
+        followers=lists.get("followers", synthetic_users(args.followers, "follower")),
+        following=lists.get("following", (
+            synthetic_users(args.followers, "follower")[:min(args.mutual, args.following)] +
+            synthetic_users(max(0, args.following - args.mutual), "followed"))),
+        page_size=args.page_size,
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        cursor_ttl=args.cursor_ttl,
+        virtual_window=args.virtual_window,
+    )
+    server = serve(app, args.host, args.port)
+    print(f"Fake Instagram for '{app.username}' at http://{args.host}:{server.server_port}/ (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Browserless extraction of follower/following lists over plain HTTPS.
+
+Once a session is logged in, the lists can be paged straight from the
+friendship API the web client uses, with the session cookies and one
+pooled keep-alive connection, instead of scrolling a dialog in Chrome.
+"""
+
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from network_capture import FriendshipUser, parse_friendship_page
+from page_health import PageHealth, PageHealthError, RATE_LIMITED
+from rate_limiter import RequestScheduler
+from run_log import get_logger, sleep
+from session_store import SESSION_COOKIE
+
+log = get_logger("http_backend")
+
+# Application id the Instagram web client sends with its API calls
+WEB_APP_ID = "936619743392459"
+
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+class CursorExpired(Exception):
+    """The server no longer accepts a pagination cursor."""
+
+
+class HttpListClient:
+    """Page through an account's lists with the friendship API."""
+
+    def __init__(self, cookies: Iterable[dict], base_url: str = "https://www.instagram.com",
+                 page_size: int = 50, max_retries: int = 5, backoff: float = 2.0,
+                 max_backoff: float = 120.0, max_cursor_restarts: int = 2,
+                 timeout: float = 20.0, scheduler: Optional[RequestScheduler] = None):
+        """
+        Args:
+            cookies: Cookies of a logged-in session, as returned by
+                driver.get_cookies() or SessionStore.load()
+            base_url: Site to talk to
+            page_size: Users requested per page
+            max_retries: Consecutive 429/5xx responses tolerated per page
+            backoff: First retry delay when the server sends no Retry-After
+                (seconds); doubled on every further retry
+            max_backoff: Longest single retry delay (seconds)
+            max_cursor_restarts: How often a list is restarted from the top
+                after its pagination cursor expired
+            timeout: Timeout of one HTTP request (seconds)
+            scheduler: Paces the requests; it then also handles 429
+                responses (pausing and slowing down every user of the
+                scheduler) in place of the client's own retry delays
+        """
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_cursor_restarts = max_cursor_restarts
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.requests_made = 0
+        self.retries = 0
+        self.cursor_restarts = 0
+
+        self.session = requests.Session()
+        # One keep-alive connection is all a sequential crawl needs
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        self.session.headers.update({
+            "User-Agent": DEFAULT_USER_AGENT,
+            "X-IG-App-ID": WEB_APP_ID,
+            "X-Requested-With": "XMLHttpRequest",
+            "Referer": f"{self.base_url}/",
+        })
+        csrf_token = self.session.cookies.get("csrftoken")
+        if csrf_token:
+            self.session.headers["X-CSRFToken"] = csrf_token
+
+    @property
+    def has_session(self) -> bool:
+        """Whether the session cookie is present at all."""
+        return self.session.cookies.get(SESSION_COOKIE) is not None
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+    def profile(self, username: str) -> dict:
+        """
+        Look up an account's id and list sizes.
+
+        Returns:
+            Dict with "id", "followers" and "following" (counts may be None)
+        """
+        data = self._get_json("/api/v1/users/web_profile_info/", {"username": username})
+        user = (data.get("data") or {}).get("user") or {}
+        if not user.get("id"):
+            raise Exception(f"Could not find the Instagram account {username}.")
+        return {
+            "id": str(user["id"]),
+            "followers": (user.get("edge_followed_by") or {}).get("count"),
+            "following": (user.get("edge_follow") or {}).get("count"),
+        }
+
+    def fetch_list(self, user_id: str, list_type: str,
+                   known_usernames: Optional[Set[str]] = None,
+                   known_run_length: int = 25, start_cursor: Optional[str] = None,
+                   on_page: Optional[Callable[[Dict[str, FriendshipUser], Optional[str]], None]] = None
+                   ) -> Tuple[List[FriendshipUser], bool]:
+        """
+        Fetch every page of a list.
+
+        Args:
+            user_id: Id of the account (see profile())
+            list_type: "followers" or "following"
+            known_usernames: If given, stop once known_run_length consecutive
+                users are already in this set (lists are newest first)
+            known_run_length: See known_usernames
+            start_cursor: Continue from this page instead of the first one
+                (e.g. from a checkpoint); an expired cursor restarts the list
+            on_page: Called after every page with the users read so far
+                and the cursor of the next page
+
+        Returns:
+            Tuple of (users in list order, whether the last page was reached)
+
+        Raises:
+            Exception: If the session is no longer valid, or rate limiting
+                persists past max_retries
+        """
+        path = f"/api/v1/friendships/{user_id}/{list_type}/"
+        users: Dict[str, FriendshipUser] = {}
+        cursor = start_cursor
+        restarts = 0
+        known_run = 0
+        while True:
+            params = {"count": self.page_size}
+            if cursor:
+                params["max_id"] = cursor
+            try:
+                page, cursor = parse_friendship_page(self._get_text(path, params))
+            except CursorExpired:
+                if restarts >= self.max_cursor_restarts:
+                    raise Exception(f"The {list_type} list kept changing while it was read. Please try again.")
+                restarts += 1
+                self.cursor_restarts += 1
+                log.debug(f"{list_type} cursor expired, restarting from the top "
+                          f"({len(users)} users kept)")
+                cursor = None
+                known_run = 0
+                continue
+            except ValueError:
+                raise Exception(f"Unexpected response while reading {list_type}.")
+
+            for user in page:
+                if user.username in users:
+                    continue
+                users[user.username] = user
+                if known_usernames is not None:
+                    known_run = known_run + 1 if user.username in known_usernames else 0
+            if on_page:
+                on_page(users, cursor)
+
+            if cursor is None:
+                return list(users.values()), True
+            if known_usernames is not None and known_run >= known_run_length:
+                log.debug(f"Reached {known_run} consecutive already-known {list_type}, stopping...")
+                return list(users.values()), False
+
+    def _get_json(self, path: str, params: dict) -> dict:
+        try:
+            return json.loads(self._get_text(path, params))
+        except ValueError:
+            raise Exception(f"Unexpected response from {path}.")
+
+    def _get_text(self, path: str, params: dict) -> str:
+        """GET a path, retrying 429 and 5xx responses with backoff."""
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            if self.scheduler:
+                self.scheduler.acquire("fetch")
+            try:
+                response = self.session.get(self.base_url + path, params=params,
+                                            timeout=self.timeout, allow_redirects=False)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise Exception(f"Network error: Could not reach Instagram. {str(e)}")
+                response = None
+            self.requests_made += 1
+
+            if response is not None:
+                if response.status_code == 200:
+                    if self.scheduler:
+                        self.scheduler.recovered()
+                    return response.text
+                if response.status_code in (401, 403) or response.is_redirect:
+                    raise Exception("Instagram session is no longer logged in. Please login again.")
+                if response.status_code == 400 and "max_id" in params and _is_cursor_error(response):
+                    raise CursorExpired()
+                if response.status_code != 429 and response.status_code < 500:
+                    raise Exception(f"Instagram returned HTTP {response.status_code} for {path}.")
+                if response.status_code == 429 and self.scheduler:
+                    self.retries += 1
+                    self.scheduler.throttled("HTTP 429", _retry_after(response))
+                    if self.scheduler.should_give_up:
+                        raise PageHealthError(PageHealth(RATE_LIMITED, "HTTP 429"))
+                    continue
+                if attempt == self.max_retries:
+                    if response.status_code == 429:
+                        raise PageHealthError(PageHealth(RATE_LIMITED, "HTTP 429"))
+                    raise Exception(f"Instagram returned HTTP {response.status_code} for {path}.")
+
+            wait = _retry_after(response) if response is not None else None
+            if wait is None:
+                wait = delay
+                delay = min(delay * 2, self.max_backoff)
+            self.retries += 1
+            status = response.status_code if response is not None else "network error"
+            log.warning(f"{path}: {status}, retrying in {wait:.1f}s")
+            sleep(min(wait, self.max_backoff))
+        raise Exception(f"Could not read {path}.")
+
+
+def _is_cursor_error(response) -> bool:
+    try:
+        message = str(response.json().get("message", "")).lower()
+    except (ValueError, AttributeError):
+        # Not the API's JSON error: report the 400 instead of restarting the list
+        return False
+    return "cursor" in message or "max_id" in message or "invalid" in message
+
+
+def _retry_after(response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
@@ -3,8 +3,15 @@ Instagram Bot for identifying accounts that don't follow back.
 Uses Selenium WebDriver to automate browser interactions with Instagram.
 """
 
+import logging
+import re
+import threading
 import time
-from typing import List, Set, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from typing import List, NamedTuple, Set, Optional, Tuple
+import psutil
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -17,49 +24,495 @@ from selenium.common.exceptions import (
     NoSuchElementException, 
     ElementClickInterceptedException,
     WebDriverException,
+    SessionNotCreatedException,
     StaleElementReferenceException
 )
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.remote.command import Command
+
+from page_scripts import (
+    EXCLUDED_PATHS,
+    HARVEST_USERNAMES_JS,
+    INSTALL_HARVEST_OBSERVER_JS,
+    DRAIN_HARVEST_BUFFER_JS,
+    DISCONNECT_HARVEST_OBSERVER_JS,
+    LIST_STATE_JS,
+    SCROLL_TO_BOTTOM_JS,
+    READ_PROFILE_COUNTS_JS,
+    SESSION_PROBE_JS,
+    FIND_FIRST_MATCH_JS,
+    FIND_SCROLLABLE_CONTAINER_JS,
+    PAGE_LOAD_TIMING_JS
+)
+from adaptive_wait import AdaptiveScrollWait
+from session_store import SessionStore, SESSION_COOKIE
+from driver_cache import resolve_chromedriver
+from snapshot_store import SnapshotStore
+from selector_cache import SelectorCache
+from network_capture import FriendshipCapture, PERFORMANCE_LOG_PREFS
+from http_backend import HttpListClient
+from rate_limiter import RequestScheduler
+from checkpoint_store import Checkpoint, CheckpointStore
+from page_health import PageHealth, PageHealthError, probe_page_health, RATE_LIMITED, CHALLENGE
+from run_log import RunTimer, get_logger, sleep
+from command_stats import CommandStats
+
+log = get_logger()
+
+
+class ProfileCount(NamedTuple):
+    """A follower or following count read from the profile."""
+    count: int
+    uncertainty: int = 0  # How far the real count may be from an abbreviated figure
+    exact: bool = False  # Read from a title attribute or the API, not parsed from display text
+
+
+# Abbreviation suffixes of the locales Instagram formats counts in
+_COUNT_SUFFIXES = {
+    "k": 1_000, "tsd": 1_000, "mil": 1_000, "tys": 1_000, "тыс": 1_000,
+    "m": 1_000_000, "mio": 1_000_000, "mln": 1_000_000, "mi": 1_000_000, "млн": 1_000_000,
+    "b": 1_000_000_000, "md": 1_000_000_000, "mrd": 1_000_000_000, "bi": 1_000_000_000,
+    "млрд": 1_000_000_000,
+}
+
+# Digits with ".", ",", apostrophe, space, no-break or thin space separators, then an optional word
+_COUNT_PATTERN = re.compile(r"(\d+(?:[.,'\u00a0\u2009\u202f ]\d+)*)\s*([^\W\d_]+)?")
+
+
+def parse_count(text: str, exact: bool = False) -> Optional[ProfileCount]:
+    """
+    Parse a follower count as shown by Instagram.
+    
+    Handles grouped ("1,234", "1.234", "1 234") and abbreviated ("12.4K",
+    "1.2M", "12,4 Tsd.") forms. Instagram never shows a fraction without a
+    suffix, so without one every separator groups thousands.
+    
+    Args:
+        text: Count text, possibly followed by a label ("12.4K followers")
+        exact: The text is the full figure (a title attribute), not a
+            display text that may have been misread
+        
+    Returns:
+        ProfileCount, or None if no count is found
+    """
+    match = _COUNT_PATTERN.search(text or "")
+    if not match:
+        return None
+    number = match.group(1)
+    multiplier = _COUNT_SUFFIXES.get((match.group(2) or "").lower())
+    if not multiplier:
+        return ProfileCount(int(re.sub(r"\D", "", number)), 0, exact)
+    # The last "." or "," before a suffix is the decimal point
+    fraction = ""
+    decimal = re.search(r"[.,](\d+)$", number)
+    if decimal:
+        number, fraction = number[:decimal.start()], decimal.group(1)
+    value = int(re.sub(r"\D", "", number)) * multiplier
+    if fraction:
+        value += int(fraction) * multiplier // 10 ** len(fraction)
+    # "12.4K" stands for anything that rounds to it: 12,350 - 12,449
+    uncertainty = multiplier // 10 ** len(fraction) // 2
+    return ProfileCount(value, uncertainty, False)
+
+
+# Requests blocked by the lean browser profile: avatars, post media and fonts
+# are never needed to read usernames
+LEAN_BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.heic", "*.svg", "*.ico",
+    "*.mp4", "*.m4v", "*.webm", "*.m3u8", "*.mp3", "*.m4a",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.cdninstagram.com/v/*", "*.fbcdn.net/v/*",
+]
 
 
 class InstagramBot:
     """Main bot class for Instagram automation."""
     
-    def __init__(self, headless: bool = False):
+    HARVEST_MODES = ("batched", "observer", "elements", "network")
+    SCROLL_STRATEGIES = ("serial", "pipelined")
+    BACKENDS = ("browser", "http")
+    
+    def __init__(self, headless: bool = False, harvest_mode: str = "batched",
+                 max_scroll_wait: float = 8.0, idle_budget: float = 12.0,
+                 scroll_strategy: str = "serial", count_tolerance: float = 0.01,
+                 session_store: Optional[SessionStore] = None,
+                 user_data_dir: Optional[str] = None,
+                 chromedriver_version: Optional[str] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 known_run_length: int = 25, full_rescan_days: float = 7.0,
+                 selector_cache: Optional[SelectorCache] = None,
+                 lean: bool = False,
+                 base_url: str = "https://www.instagram.com",
+                 backend: str = "browser",
+                 scheduler: Optional[RequestScheduler] = None,
+                 checkpoint_store: Optional[CheckpointStore] = None,
+                 checkpoint_interval: float = 30.0,
+                 page_load_timeout: Optional[float] = None,
+                 direct_dialog_timeout: float = 5.0):
         """
         Initialize the Instagram bot.
         
         Args:
             headless: If True, run browser in headless mode (no GUI)
+            harvest_mode: How usernames are read from the list dialog.
+                "batched" reads and filters all links with one JavaScript
+                call per scroll; "observer" records rows as they are
+                inserted with an in-page MutationObserver and only drains
+                the new ones each scroll; "elements" issues one
+                get_attribute call per link (legacy behaviour); "network"
+                parses the list API responses the page receives while
+                scrolling, which also fills user_details
+            max_scroll_wait: Longest time to wait for new rows after one
+                scroll (seconds); shorter waits are learned from recent loads
+            idle_budget: Stop scrolling a list once no new users or rows
+                have appeared for this many seconds
+            scroll_strategy: Default scroll loop, "serial" or "pipelined"
+                (see _extract_user_list)
+            count_tolerance: Fraction of the count shown on the profile a list
+                may fall short of and still count as complete (deactivated and
+                restricted accounts are counted but never listed)
+            session_store: Where to save session cookies after a login and
+                restore them from on the next run (None disables this)
+            user_data_dir: Chrome profile directory to reuse between runs;
+                the browser then keeps its own cookies
+            chromedriver_version: chromedriver version to pin (see
+                driver_cache.resolve_chromedriver)
+            snapshot_store: If set, every analysis saves the extracted
+                followers and following lists as snapshots
+            known_run_length: In incremental analyses, stop scrolling after
+                this many consecutive accounts already in the last snapshot
+            full_rescan_days: Incremental analyses fall back to a full scan
+                when the last full snapshot is older than this, so
+                followers who left are eventually noticed
+            selector_cache: Remembers which fallback selector located each
+                element so later lookups try it first
+            lean: Scraping profile that blocks images, media and fonts and
+                uses the "eager" page load strategy, to save bandwidth,
+                renderer CPU and memory on long lists
+            base_url: Site to work against; a local stub server (see
+                fake_instagram_server.py) can stand in for Instagram
+            backend: How lists are extracted after login. "browser" scrolls
+                the list dialog; "http" pages through the friendship API
+                over a pooled HTTPS connection with the session cookies,
+                and restore_session() then needs no browser at all
+            scheduler: Paces navigations, scrolls and API fetches and backs
+                off when Instagram throttles; share one between bots that
+                use the same account (defaults to a RequestScheduler())
+            checkpoint_store: If set, extractions in progress are saved every
+                checkpoint_interval seconds and when they are interrupted,
+                and the next extraction of the list resumes from there
+            checkpoint_interval: Seconds between two checkpoints of a list
+            page_load_timeout: Longest time a page may take to load
+                (seconds); None keeps the WebDriver default
+            direct_dialog_timeout: How long to wait for the list dialog after
+                opening the list URL before clicking the profile link instead
+        
+        The browser is not started here but on first use of ``driver``.
         """
-        self.driver = None
+        if harvest_mode not in self.HARVEST_MODES:
+            raise ValueError(f"Unknown harvest mode: {harvest_mode}")
+        if scroll_strategy not in self.SCROLL_STRATEGIES:
+            raise ValueError(f"Unknown scroll strategy: {scroll_strategy}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self._driver = None
         self.is_logged_in = False
         self.username = None
         self.headless = headless
-        self._setup_driver()
+        self.harvest_mode = harvest_mode
+        self.max_scroll_wait = max_scroll_wait
+        self.idle_budget = idle_budget
+        self.scroll_strategy = scroll_strategy
+        self.count_tolerance = count_tolerance
+        self.session_store = session_store
+        self.user_data_dir = user_data_dir
+        self.chromedriver_version = chromedriver_version
+        self.snapshot_store = snapshot_store
+        self.known_run_length = known_run_length
+        self.full_rescan_days = full_rescan_days
+        self.selector_cache = selector_cache
+        self.lean = lean
+        self.base_url = base_url.rstrip("/")
+        self.user_details = {}  # list_type -> {username: FriendshipUser}, "network" mode only
+        self._capture = None
+        self.backend = backend
+        self._http = None  # HttpListClient, created on first use
+        self._http_user_id = None
+        self.scheduler = scheduler or RequestScheduler()
+        self.checkpoint_store = checkpoint_store
+        self.checkpoint_interval = checkpoint_interval
+        self.page_load_timeout = page_load_timeout
+        self.peak_browser_rss = 0  # Bytes, sampled while scrolling
+        self.startup_timings = {}
+        self.profile_counts = {}
+        self._container_path = None  # Child indexes from the dialog to its scrollable list
+        self.direct_dialog_timeout = direct_dialog_timeout
+        self.health_check_interval = 15.0  # Seconds between page health probes while scrolling
+        self.command_stats = CommandStats()  # WebDriver commands by type and call site
+        # Phase spans and sleep/WebDriver/Python split; command counts come from command_stats
+        self.timer = RunTimer(lambda: self.command_stats.total)
+        self.extraction_stats = {}
+        self.last_lists = {}  # Lists read by the last find_non_followers()
+        self._stats_lock = threading.Lock()
+        self.show_progress = True  # Off for a worker bot sharing the terminal
+        self._stop_requested = threading.Event()
+    
+    @property
+    def driver(self):
+        """The Chrome WebDriver, started the first time it is needed."""
+        if self._stop_requested.is_set():
+            raise WebDriverException("The bot was stopped")
+        if self._driver is None:
+            self._setup_driver()
+        return self._driver
+    
+    @property
+    def has_driver(self) -> bool:
+        """Whether a browser is currently running."""
+        return self._driver is not None
     
     def _setup_driver(self):
         """Set up Chrome WebDriver with appropriate options."""
         try:
             chrome_options = Options()
             if self.headless:
-                chrome_options.add_argument('--headless')
+                chrome_options.add_argument('--headless=new')
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
+            if self.user_data_dir:
+                chrome_options.add_argument(f'--user-data-dir={self.user_data_dir}')
             chrome_options.add_argument('--disable-blink-features=AutomationControlled')
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+            if self.harvest_mode == "network":
+                chrome_options.set_capability("goog:loggingPrefs", PERFORMANCE_LOG_PREFS)
+            if self.lean:
+                # Return from get() once the DOM is ready instead of after every image loaded
+                chrome_options.page_load_strategy = 'eager'
+                chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+                chrome_options.add_argument('--mute-audio')
+                chrome_options.add_experimental_option("prefs", {
+                    "profile.managed_default_content_settings.images": 2,
+                    "profile.default_content_setting_values.notifications": 2,
+                })
+            
+            phase_start = time.monotonic()
+            driver_path = resolve_chromedriver(self.chromedriver_version)
+            self.startup_timings["driver_resolution"] = time.monotonic() - phase_start
             
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.maximize_window()
+            phase_start = time.monotonic()
+            try:
+                self._driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            except SessionNotCreatedException as e:
+                # Typically Chrome updated itself and the cached driver is for the old version
+                fresh_path = resolve_chromedriver(self.chromedriver_version, refresh=True)
+                if fresh_path == driver_path:
+                    raise
+                log.warning(f"Cached chromedriver could not start Chrome, retrying with {fresh_path}: {str(e)}")
+                self._driver = webdriver.Chrome(service=Service(fresh_path), options=chrome_options)
+            self._install_command_counter()
+            if self.page_load_timeout:
+                self._driver.set_page_load_timeout(self.page_load_timeout)
+            self._driver.maximize_window()
+            if self.lean:
+                self._block_heavy_requests()
+            self.startup_timings["browser_launch"] = time.monotonic() - phase_start
         except WebDriverException as e:
             raise Exception(f"Failed to initialize browser: {str(e)}. Make sure Chrome is installed.")
         except Exception as e:
             raise Exception(f"Unexpected error setting up browser: {str(e)}")
     
-    def login(self, username: str, password: str) -> bool:
+    def _block_heavy_requests(self):
+        """Block image, media and font requests through the DevTools protocol."""
+        try:
+            self._driver.execute_cdp_cmd("Network.enable", {})
+            self._driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        except WebDriverException as e:
+            # Chrome prefs above still keep images from loading
+            log.warning(f"Could not block requests through CDP: {str(e)}")
+    
+    def browser_rss(self) -> Optional[int]:
+        """
+        Resident memory of chromedriver and all browser processes, in bytes.
+        
+        Returns:
+            The total, or None if no browser runs
+        """
+        if self._driver is None:
+            return None
+        try:
+            root = psutil.Process(self._driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        self.peak_browser_rss = max(self.peak_browser_rss, total)
+        return total
+    
+    def page_load_time(self) -> Optional[dict]:
+        """DOMContentLoaded and load times of the current page in milliseconds."""
+        try:
+            return self.driver.execute_script(PAGE_LOAD_TIMING_JS)
+        except WebDriverException:
+            return None
+    
+    def _install_command_counter(self):
+        """Count every WebDriver command sent to the browser.
+        
+        All Selenium calls (find_elements, get_attribute, execute_script, ...)
+        go through ``driver.execute``, so wrapping it on this instance gives
+        an exact round-trip count, time and call site of every command in
+        ``command_stats``; the timer's spans and the scroll passes count
+        their commands from it.
+        """
+        original_execute = self._driver.execute
+        
+        def counting_execute(driver_command, params=None):
+            phase_start = time.monotonic()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                elapsed = time.monotonic() - phase_start
+                self.timer.add_webdriver(elapsed)
+                self.command_stats.record(driver_command, elapsed)
+                if driver_command == Command.GET and "first_navigation" not in self.startup_timings:
+                    self.startup_timings["first_navigation"] = elapsed
+                    self._report_startup_timings()
+        
+        self._driver.execute = counting_execute
+    
+    def _report_startup_timings(self):
+        """Print how long driver resolution, browser launch and first page load took."""
+        phases = ", ".join(f"{name.replace('_', ' ')} {seconds:.2f}s"
+                           for name, seconds in self.startup_timings.items())
+        log.debug(f"Browser startup: {phases}")
+    
+    def restore_session(self, username: str) -> bool:
+        """
+        Reuse a previous login instead of going through the login form.
+        
+        Loads the cookies saved for the account (when a session store is
+        configured) or relies on the Chrome profile in user_data_dir, then
+        checks that Instagram still treats the browser as logged in.
+        
+        Args:
+            username: Instagram username the session belongs to
+            
+        Returns:
+            True if the session is valid and the bot is now logged in
+        """
+        with self.timer.span("restore_session"):
+            return self._restore_session(username)
+    
+    def _restore_session(self, username: str) -> bool:
+        if not self.session_store and not self.user_data_dir:
+            return False
+        if self.backend == "http" and self.session_store and not self.has_driver:
+            return self._restore_http_session(username)
+        
+        start = time.monotonic()
+        try:
+            if self.session_store:
+                cookies = self.session_store.load(username)
+                if not cookies:
+                    log.debug("No saved session for this account")
+                    if not self.user_data_dir:
+                        return False
+                else:
+                    self._import_cookies(cookies)
+            
+            self._navigate(f"{self.base_url}/")
+            probe = self.driver.execute_script(SESSION_PROBE_JS) or {}
+            logged_in = (
+                self.driver.get_cookie(SESSION_COOKIE) is not None and
+                "accounts/login" not in probe.get("url", "") and
+                not probe.get("loginForm")
+            )
+        except WebDriverException as e:
+            log.warning(f"Could not restore session: {str(e)}")
+            return False
+        
+        if not logged_in:
+            log.debug("Saved session has expired, a full login is needed")
+            if self.session_store:
+                self.session_store.delete(username)
+            return False
+        
+        self.is_logged_in = True
+        self.username = username
+        print(f"\n✓ Restored saved session for {username} ({time.monotonic() - start:.1f}s).")
+        return True
+    
+    def _restore_http_session(self, username: str) -> bool:
+        """Restore a saved session for the HTTP backend without starting a browser."""
+        start = time.monotonic()
+        cookies = self.session_store.load(username)
+        if not cookies:
+            log.debug("No saved session for this account")
+            return False
+        client = HttpListClient(cookies, base_url=self.base_url, scheduler=self.scheduler)
+        try:
+            self._http_user_id = client.profile(username)["id"]
+        except Exception as e:
+            log.warning(f"Saved session was not accepted: {str(e)}")
+            client.close()
+            if "logged in" in str(e):
+                self.session_store.delete(username)
+            return False
+        self._http = client
+        self.is_logged_in = True
+        self.username = username
+        print(f"\n✓ Restored saved session for {username} ({time.monotonic() - start:.1f}s).")
+        return True
+    
+    def _http_client(self) -> HttpListClient:
+        """The HTTP backend's client, built from the browser's (or saved) cookies."""
+        if self._http is None:
+            if self.has_driver:
+                cookies = self._export_cookies()
+            elif self.session_store:
+                cookies = self.session_store.load(self.username) or []
+            else:
+                cookies = []
+            self._http = HttpListClient(cookies, base_url=self.base_url, scheduler=self.scheduler)
+            if not self._http.has_session:
+                raise Exception("Not logged in. Please login first.")
+        return self._http
+    
+    def release_browser(self):
+        """
+        Quit the browser but stay logged in, for the HTTP backend.
+        
+        The session cookies are handed to the HTTP client first, so lists
+        can still be extracted afterwards.
+        """
+        if self.backend != "http" or not self.is_logged_in:
+            raise Exception("Only a logged-in bot using the HTTP backend can run without its browser.")
+        self._http_client()
+        if self._driver:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            finally:
+                self._driver = None
+    
+    def save_session(self):
+        """Save the current session cookies to the session store, if any."""
+        if not self.session_store or not self.is_logged_in:
+            return
+        try:
+            self.session_store.save(self.username, self._export_cookies())
+            log.debug(f"Session saved to {self.session_store.path_for(self.username)}")
+        except (OSError, WebDriverException) as e:
+            log.warning(f"Could not save session: {str(e)}")
+    
+    def login(self, username: str, password: str, reuse_session: bool = True) -> bool:
         """
         Log into Instagram with username and password.
         Handles 2FA if enabled.
@@ -67,23 +520,33 @@ class InstagramBot:
         Args:
             username: Instagram username
             password: Instagram password
+            reuse_session: Try restore_session() first and only fill in the
+                login form if the saved session is missing or expired
             
         Returns:
             True if login successful, False otherwise
         """
+        if reuse_session and self.restore_session(username):
+            return True
+        with self.timer.span("login"):
+            return self._login_with_form(username, password)
+    
+    def _login_with_form(self, username: str, password: str) -> bool:
+        """Fill in and submit the login form, handling 2FA (see login)."""
         try:
-            print("[DEBUG] Starting login process...")
-            print(f"[DEBUG] Username: {username}")
-            print(f"[DEBUG] Password length: {len(password)} characters")
+            log.debug("Starting login process...")
+            log.debug(f"Username: {username}")
+            log.debug(f"Password length: {len(password)} characters")
             
             print("\n[STEP 1/6] Navigating to Instagram login page...")
             try:
-                login_url = "https://www.instagram.com/accounts/login/"
-                print(f"[DEBUG] Loading URL: {login_url}")
-                self.driver.get(login_url)
-                print(f"[DEBUG] Current URL after navigation: {self.driver.current_url}")
-                time.sleep(2)
-                print(f"[DEBUG] Page title: {self.driver.title}")
+                login_url = f"{self.base_url}/accounts/login/"
+                log.debug(f"Loading URL: {login_url}")
+                self._navigate(login_url)
+                sleep(2)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Current URL after navigation: {self.driver.current_url}")
+                    log.debug(f"Page title: {self.driver.title}")
             except WebDriverException as e:
                 print(f"\n✗ Network error: Could not connect to Instagram. {str(e)}")
                 print("Please check your internet connection and try again.")
@@ -96,11 +559,10 @@ class InstagramBot:
             # Find and fill username
             print("[STEP 3/6] Looking for username input field...")
             try:
-                print("[DEBUG] Searching for username/email input field...")
-                print("[DEBUG] Waiting up to 15 seconds for username field...")
+                log.debug("Searching for username/email input field...")
+                log.debug("Waiting up to 15 seconds for username field...")
                 
                 # Try multiple selectors (Instagram uses 'username', Facebook login uses 'email')
-                username_input = None
                 selectors_to_try = [
                     (By.NAME, "username"),
                     (By.NAME, "email"),  # Facebook-style login
@@ -113,59 +575,50 @@ class InstagramBot:
                     (By.XPATH, "//input[@type='text' and contains(@placeholder, 'Username')]"),
                 ]
                 
-                for selector_type, selector_value in selectors_to_try:
-                    try:
-                        print(f"[DEBUG] Trying selector: {selector_type}={selector_value}")
-                        username_input = wait.until(
-                            EC.presence_of_element_located((selector_type, selector_value))
-                        )
-                        print(f"[DEBUG] Username input field found with selector: {selector_type}={selector_value}")
-                        break
-                    except TimeoutException:
-                        continue
-                
-                if not username_input:
+                try:
+                    username_input = self._find_element("login_username", selectors_to_try, timeout=15)
+                except TimeoutException:
                     raise TimeoutException("Could not find username input field with any selector")
                 
-                print("[DEBUG] Username input field found!")
-                print(f"[DEBUG] Username input is displayed: {username_input.is_displayed()}")
-                print(f"[DEBUG] Username input is enabled: {username_input.is_enabled()}")
-                print(f"[DEBUG] Username input location: {username_input.location}")
-                print(f"[DEBUG] Username input size: {username_input.size}")
+                log.debug("Username input field found!")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Username input is displayed: {username_input.is_displayed()}")
+                    log.debug(f"Username input is enabled: {username_input.is_enabled()}")
+                    log.debug(f"Username input location: {username_input.location}")
+                    log.debug(f"Username input size: {username_input.size}")
                 
                 username_input.clear()
-                print(f"[DEBUG] Entering username: {username}")
+                log.debug(f"Entering username: {username}")
                 username_input.send_keys(username)
-                time.sleep(1)
+                sleep(1)
                 
                 # Verify username was entered
-                entered_value = username_input.get_attribute('value')
-                print(f"[DEBUG] Username field value after entry: {entered_value}")
-                print("[DEBUG] Username entered successfully")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Username field value after entry: {username_input.get_attribute('value')}")
+                log.debug("Username entered successfully")
             except TimeoutException as e:
-                print("[DEBUG] Timeout waiting for username field")
-                print(f"[DEBUG] Current URL: {self.driver.current_url}")
-                print(f"[DEBUG] Page title: {self.driver.title}")
-                print("[DEBUG] Checking for available input fields on page...")
-                try:
-                    all_inputs = self.driver.find_elements(By.TAG_NAME, "input")
-                    print(f"[DEBUG] Found {len(all_inputs)} input elements on page")
-                    for i, inp in enumerate(all_inputs[:5]):  # Show first 5
-                        print(f"[DEBUG]   Input {i+1}: name='{inp.get_attribute('name')}', type='{inp.get_attribute('type')}', id='{inp.get_attribute('id')}'")
-                except:
-                    pass
-                print("[DEBUG] Page source snippet (first 1000 chars):")
-                print(self.driver.page_source[:1000])
+                log.warning("Timeout waiting for username field")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Current URL: {self.driver.current_url}")
+                    log.debug(f"Page title: {self.driver.title}")
+                    log.debug("Checking for available input fields on page...")
+                    try:
+                        all_inputs = self.driver.find_elements(By.TAG_NAME, "input")
+                        log.debug(f"Found {len(all_inputs)} input elements on page")
+                        for i, inp in enumerate(all_inputs[:5]):  # Show first 5
+                            log.debug(f"  Input {i+1}: name='{inp.get_attribute('name')}', type='{inp.get_attribute('type')}', id='{inp.get_attribute('id')}'")
+                    except:
+                        pass
+                    log.debug("Page source snippet (first 1000 chars):\n%s", self.driver.page_source[:1000])
                 raise
             
             # Find and fill password
             print("\n[STEP 4/6] Looking for password input field...")
             try:
-                print("[DEBUG] Searching for password input field...")
-                print("[DEBUG] Waiting up to 15 seconds for password field...")
+                log.debug("Searching for password input field...")
+                log.debug("Waiting up to 15 seconds for password field...")
                 
                 # Try multiple selectors (Instagram uses 'password', Facebook login uses 'pass')
-                password_input = None
                 password_selectors_to_try = [
                     (By.NAME, "password"),
                     (By.NAME, "pass"),  # Facebook-style login
@@ -174,56 +627,51 @@ class InstagramBot:
                     (By.XPATH, "//input[@type='password']"),
                 ]
                 
-                for selector_type, selector_value in password_selectors_to_try:
-                    try:
-                        print(f"[DEBUG] Trying password selector: {selector_type}={selector_value}")
-                        password_input = wait.until(
-                            EC.presence_of_element_located((selector_type, selector_value))
-                        )
-                        print(f"[DEBUG] Password input field found with selector: {selector_type}={selector_value}")
-                        break
-                    except TimeoutException:
-                        continue
-                
-                if not password_input:
+                try:
+                    password_input = self._find_element("login_password", password_selectors_to_try, timeout=15)
+                except TimeoutException:
                     raise TimeoutException("Could not find password input field with any selector")
                 
-                print("[DEBUG] Password input field found!")
-                print(f"[DEBUG] Password input is displayed: {password_input.is_displayed()}")
-                print(f"[DEBUG] Password input is enabled: {password_input.is_enabled()}")
+                log.debug("Password input field found!")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Password input is displayed: {password_input.is_displayed()}")
+                    log.debug(f"Password input is enabled: {password_input.is_enabled()}")
                 
                 password_input.clear()
-                print("[DEBUG] Entering password (masked)")
+                log.debug("Entering password (masked)")
                 password_input.send_keys(password)
-                time.sleep(1)
-                print("[DEBUG] Password entered successfully")
+                sleep(1)
+                log.debug("Password entered successfully")
             except TimeoutException:
-                print("[DEBUG] Timeout waiting for password field")
-                print(f"[DEBUG] Current URL: {self.driver.current_url}")
+                log.warning("Timeout waiting for password field")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Current URL: {self.driver.current_url}")
                 raise
             
             # Submit login form - Use Enter key method (most reliable for Facebook-style forms)
             print("\n[STEP 5/6] Submitting login form...")
-            print("[DEBUG] Using Enter key method to submit form (most reliable)")
+            log.debug("Using Enter key method to submit form (most reliable)")
             try:
                 password_input.send_keys(Keys.RETURN)
-                print("[DEBUG] Enter key pressed on password field")
-                time.sleep(3)
-                print(f"[DEBUG] URL after Enter key: {self.driver.current_url}")
+                log.debug("Enter key pressed on password field")
+                sleep(3)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"URL after Enter key: {self.driver.current_url}")
             except Exception as e:
-                print(f"[DEBUG] Error pressing Enter: {str(e)}")
+                log.warning(f"Error pressing Enter: {str(e)}")
                 # Fallback: Try to find and click login button
-                print("[DEBUG] Fallback: Trying to find login button...")
+                log.debug("Fallback: Trying to find login button...")
                 try:
                     login_button = wait.until(
                         EC.element_to_be_clickable((By.XPATH, "//button[@type='submit'] | //input[@type='submit']"))
                     )
-                    print("[DEBUG] Login button found, clicking...")
+                    log.debug("Login button found, clicking...")
                     login_button.click()
-                    time.sleep(3)
-                    print(f"[DEBUG] URL after button click: {self.driver.current_url}")
+                    sleep(3)
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug(f"URL after button click: {self.driver.current_url}")
                 except TimeoutException:
-                    print("[DEBUG] Could not find login button, Enter key method should have worked")
+                    log.warning("Could not find login button, Enter key method should have worked")
                     raise Exception("Failed to submit login form")
             
             # Check for 2FA prompt
@@ -236,20 +684,22 @@ class InstagramBot:
                     return False
             
             # Handle "Save Login Info" dialog
-            print("[DEBUG] Checking for 'Save Login Info' dialog...")
+            log.debug("Checking for 'Save Login Info' dialog...")
             self._handle_save_login_dialog()
             
             # Check if login was successful
-            print("[DEBUG] Waiting for page to load after login...")
-            time.sleep(3)
+            log.debug("Waiting for page to load after login...")
+            sleep(3)
             current_url = self.driver.current_url
-            print(f"[DEBUG] Final URL: {current_url}")
-            print(f"[DEBUG] Page title: {self.driver.title}")
+            log.debug(f"Final URL: {current_url}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Page title: {self.driver.title}")
             
             # Check for rate limiting or suspicious activity warnings
-            print("[DEBUG] Checking page content for warnings...")
-            page_source = self.driver.page_source.lower()
-            if "try again later" in page_source or "suspicious activity" in page_source:
+            log.debug("Checking page content for warnings...")
+            health = self.check_page_health(raise_on_problem=False)
+            if health.status in (RATE_LIMITED, CHALLENGE):
+                log.warning(f"Page health after login: {health.status} ({health.detail})")
                 print("\n✗ Login failed: Instagram has detected unusual activity.")
                 print("Please wait a few minutes and try again, or try logging in from a browser first.")
                 return False
@@ -257,11 +707,12 @@ class InstagramBot:
             if "accounts/login" not in current_url:
                 self.is_logged_in = True
                 self.username = username
+                self.save_session()
                 print(f"\n✓ Successfully logged in as {username}!")
-                print(f"[DEBUG] Login successful! Redirected to: {current_url}")
+                log.debug(f"Login successful! Redirected to: {current_url}")
                 return True
             else:
-                print("[DEBUG] Still on login page, checking for error messages...")
+                log.debug("Still on login page, checking for error messages...")
                 # Check for error messages
                 try:
                     error_selectors = [
@@ -276,47 +727,45 @@ class InstagramBot:
                             error_element = self.driver.find_element(By.XPATH, selector)
                             if error_element and error_element.is_displayed():
                                 error_text = error_element.text
-                                print(f"[DEBUG] Found error message: {error_text}")
+                                log.debug(f"Found error message: {error_text}")
                                 print("\n✗ Login failed: Invalid username or password.")
                                 return False
                         except NoSuchElementException:
                             continue
                     
                     # Check for any visible error indicators
-                    print("[DEBUG] Checking for generic error indicators...")
+                    log.debug("Checking for generic error indicators...")
                     error_indicators = self.driver.find_elements(
                         By.XPATH, 
                         "//div[contains(@class, 'error') or contains(@id, 'error')]"
                     )
                     for indicator in error_indicators:
                         if indicator.is_displayed():
-                            print(f"[DEBUG] Found error indicator: {indicator.text}")
+                            log.debug(f"Found error indicator: {indicator.text}")
                             
                 except Exception as e:
-                    print(f"[DEBUG] Error while checking for error messages: {str(e)}")
+                    log.warning(f"Error while checking for error messages: {str(e)}")
                 
                 print("\n✗ Login failed: Unknown error. Please check your credentials and try again.")
-                print(f"[DEBUG] Current URL: {current_url}")
-                print("[DEBUG] Page may have changed. Check the browser window for details.")
+                log.debug(f"Current URL: {current_url}")
+                log.debug("Page may have changed. Check the browser window for details.")
                 return False
                 
         except TimeoutException as e:
             print(f"\n✗ Login failed: Timeout waiting for page elements.")
-            print(f"[DEBUG] Timeout exception: {str(e)}")
-            print(f"[DEBUG] Current URL: {self.driver.current_url}")
-            print(f"[DEBUG] Page title: {self.driver.title}")
+            log.warning(f"Timeout exception: {str(e)}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Current URL: {self.driver.current_url}")
+                log.debug(f"Page title: {self.driver.title}")
             print("Instagram may be loading slowly. Please try again.")
             return False
         except WebDriverException as e:
             print(f"\n✗ Login failed: Network or browser error. {str(e)}")
-            print(f"[DEBUG] WebDriver exception type: {type(e).__name__}")
+            log.warning(f"WebDriver exception type: {type(e).__name__}")
             return False
         except Exception as e:
             print(f"\n✗ Login failed: {str(e)}")
-            print(f"[DEBUG] Exception type: {type(e).__name__}")
-            import traceback
-            print("[DEBUG] Full traceback:")
-            traceback.print_exc()
+            log.warning(f"Exception type: {type(e).__name__}", exc_info=True)
             return False
     
     def _check_for_2fa(self) -> bool:
@@ -359,7 +808,7 @@ class InstagramBot:
             
             code_input.clear()
             code_input.send_keys(verification_code)
-            time.sleep(1)
+            sleep(1)
             
             # Find and click submit button
             submit_selectors = [
@@ -382,7 +831,7 @@ class InstagramBot:
                 return False
             
             submit_button.click()
-            time.sleep(3)
+            sleep(3)
             
             # Check if verification was successful
             if "accounts/login" not in self.driver.current_url:
@@ -417,7 +866,7 @@ class InstagramBot:
                 )
             )
             not_now_button.click()
-            time.sleep(1)
+            sleep(1)
             print("Handled 'Save Login Info' dialog.")
         except (TimeoutException, NoSuchElementException):
             # Dialog might not appear, which is fine
@@ -429,10 +878,16 @@ class InstagramBot:
             except:
                 pass
     
-    def get_followers(self) -> List[str]:
+    def get_followers(self, known_usernames: Optional[Set[str]] = None) -> List[str]:
         """
         Get the complete list of accounts that follow the user.
         
+        Args:
+            known_usernames: Followers from a previous run. If given, only
+                the newest followers are scrolled through (see
+                _extract_user_list) and merged into this set; followers who
+                left since then are not noticed and stay in the result
+        
         Returns:
             List of usernames that follow the user
             
@@ -443,11 +898,15 @@ class InstagramBot:
             raise Exception("Not logged in. Please login first.")
         
         try:
-            print("\nExtracting followers list...")
-            followers = self._extract_user_list("followers")
+            self._print_progress("\nExtracting followers list...")
+            with self.timer.span("extract", list="followers"):
+                followers = self._extract_user_list("followers", known_usernames=known_usernames)
             if not followers:
                 raise Exception("Failed to extract followers list. Instagram may have rate-limited the request.")
-            print(f"✓ Found {len(followers)} followers.")
+            if known_usernames is not None:
+                followers = self._merge_with_known("followers", followers, known_usernames)
+            self._print_progress(f"✓ Found {len(followers)} followers.")
+            self._report_completeness("followers")
             return followers
         except Exception as e:
             if "rate" in str(e).lower() or "limit" in str(e).lower():
@@ -455,10 +914,16 @@ class InstagramBot:
                 print("Please wait a few minutes and try again.")
             raise
     
-    def get_following(self) -> List[str]:
+    def get_following(self, known_usernames: Optional[Set[str]] = None) -> List[str]:
         """
         Get the complete list of accounts that the user follows.
         
+        Args:
+            known_usernames: Accounts followed in a previous run. If given,
+                only the most recent follows are scrolled through (see
+                _extract_user_list) and merged into this set; accounts
+                unfollowed since then are not noticed and stay in the result
+        
         Returns:
             List of usernames that the user follows
             
@@ -469,11 +934,15 @@ class InstagramBot:
             raise Exception("Not logged in. Please login first.")
         
         try:
-            print("\nExtracting following list...")
-            following = self._extract_user_list("following")
+            self._print_progress("\nExtracting following list...")
+            with self.timer.span("extract", list="following"):
+                following = self._extract_user_list("following", known_usernames=known_usernames)
             if not following:
                 raise Exception("Failed to extract following list. Instagram may have rate-limited the request.")
-            print(f"✓ Found {len(following)} accounts you follow.")
+            if known_usernames is not None:
+                following = self._merge_with_known("following", following, known_usernames)
+            self._print_progress(f"✓ Found {len(following)} accounts you follow.")
+            self._report_completeness("following")
             return following
         except Exception as e:
             if "rate" in str(e).lower() or "limit" in str(e).lower():
@@ -481,355 +950,245 @@ class InstagramBot:
                 print("Please wait a few minutes and try again.")
             raise
     
-    def _extract_user_list(self, list_type: str) -> List[str]:
+    def _extract_user_list(self, list_type: str, strategy: Optional[str] = None,
+                           known_usernames: Optional[Set[str]] = None) -> List[str]:
         """
         Extract followers or following list by scrolling and loading all users.
         
         Args:
             list_type: Either "followers" or "following"
+            strategy: "serial" harvests, then scrolls and waits for the next
+                rows; "pipelined" triggers the next scroll first so Instagram
+                fetches the next page while the current rows are harvested.
+                Defaults to the bot's scroll_strategy.
+            known_usernames: Usernames already stored from a previous run.
+                Instagram lists the newest entries first, so scrolling stops
+                once known_run_length consecutive rows are already known
+                and only that new head of the list is returned
             
         Returns:
             List of usernames
         """
+        if self.backend == "http":
+            return self._extract_user_list_http(list_type, known_usernames)
+        
+        strategy = strategy or self.scroll_strategy
+        if strategy not in self.SCROLL_STRATEGIES:
+            raise ValueError(f"Unknown scroll strategy: {strategy}")
+        
+        mode = "full" if known_usernames is None else "incremental"
+        extraction_start = time.monotonic()
+        usernames = set()
+        # Scroll height the list has grown to, i.e. how deep it has been scrolled. The
+        # number of rows in the DOM would do only until a virtualized list caps it
+        list_depth = 0
+        completed = False
         try:
-            # Navigate to user's profile
-            print(f"[DEBUG] Navigating to profile: https://www.instagram.com/{self.username}/")
-            try:
-                self.driver.get(f"https://www.instagram.com/{self.username}/")
-                time.sleep(3)
-                print(f"[DEBUG] Profile page loaded. Current URL: {self.driver.current_url}")
-                print(f"[DEBUG] Page title: {self.driver.title}")
-            except WebDriverException as e:
-                print(f"[DEBUG] Network error loading profile: {str(e)}")
-                raise Exception(f"Network error: Could not load profile page. {str(e)}")
-            
-            # Check for rate limiting or account restrictions (more specific checks)
-            print("[DEBUG] Checking page content for warnings or restrictions...")
-            page_source = self.driver.page_source.lower()
-            page_url = self.driver.current_url.lower()
-            
-            # More specific checks for restrictions
-            restriction_indicators = [
-                "try again later",
-                "rate limit",
-                "too many requests"
-            ]
+            wait = WebDriverWait(self.driver, 15)
+            dialog_xpath = "//div[@role='dialog']"
             
-            for indicator in restriction_indicators:
-                if indicator in page_source:
-                    print(f"[DEBUG] Found restriction indicator: {indicator}")
-                    raise Exception("Instagram rate limit detected. Please wait before trying again.")
+            # Fast path: the list URL renders the profile with the dialog already open
+            list_url = f"{self.base_url}/{self.username}/{list_type}/"
+            log.debug(f"Navigating directly to {list_url}")
+            capture = None
+            if self.harvest_mode == "network":
+                # Drop older events so only this list's responses are parsed
+                capture = FriendshipCapture(self.driver, list_type)
+                capture.reset()
+            self._capture = capture
+            dialog = self._open_list(list_type, list_url, dialog_xpath)
+            page_load = self.page_load_time()
             
-            # Check URL for restriction pages
-            if "challenge" in page_url or "restricted" in page_url:
-                print(f"[DEBUG] Restricted URL detected: {page_url}")
-                raise Exception("Account may be restricted. Please check your Instagram account.")
+            # The profile header stays rendered underneath the dialog
+            if not self.profile_counts:
+                self.profile_counts = self._read_profile_counts()
+            expected = self.profile_counts.get(list_type)
             
-            # Check for specific error messages in page
-            error_messages = self.driver.find_elements(
-                By.XPATH,
-                "//div[contains(text(), 'restricted') or contains(text(), 'suspended') or contains(text(), 'blocked')]"
-            )
-            if error_messages:
-                for msg in error_messages:
-                    if msg.is_displayed():
-                        error_text = msg.text
-                        print(f"[DEBUG] Found error message on page: {error_text}")
-                        if "restricted" in error_text.lower() or "suspended" in error_text.lower():
-                            raise Exception("Account may be restricted. Please check your Instagram account.")
-            
-            print("[DEBUG] No restrictions detected, proceeding...")
-            
-            # Click on followers or following link
-            print(f"[DEBUG] Looking for {list_type} link...")
-            wait = WebDriverWait(self.driver, 15)
-            if list_type == "followers":
-                # Try multiple selectors for followers link
-                link_selectors = [
-                    f"//a[contains(@href, '/{self.username}/followers')]",
-                    "//a[contains(@href, '/followers/')]",
-                    "//a[contains(@href, '/followers')]",
-                    f"//a[@href='/{self.username}/followers/']",
-                    "//span[contains(text(), 'followers')]/parent::a",
-                    "//span[contains(text(), 'follower')]/parent::a"
-                ]
+            # Find the scrollable container within the dialog in a single probe;
+            # the followers and following dialogs share their structure, so the
+            # path found for one is tried first for the other
+            log.debug("Finding scrollable container...")
+            with self.timer.span("container_discovery", list=list_type):
+                scrollable_container, container_path = self.driver.execute_script(
+                    FIND_SCROLLABLE_CONTAINER_JS, dialog, self._container_path
+                )
+            if container_path:
+                if container_path != self._container_path:
+                    log.debug(f"Found scrollable container at path {container_path}")
+                self._container_path = container_path
             else:
-                # Try multiple selectors for following link
-                link_selectors = [
-                    f"//a[contains(@href, '/{self.username}/following')]",
-                    "//a[contains(@href, '/following/')]",
-                    "//a[contains(@href, '/following')]",
-                    f"//a[@href='/{self.username}/following/']",
-                    "//span[contains(text(), 'following')]/parent::a"
-                ]
+                log.debug("Using dialog as fallback scrollable container")
             
-            link = None
-            for selector in link_selectors:
-                try:
-                    print(f"[DEBUG] Trying {list_type} link selector: {selector}")
-                    link = wait.until(EC.element_to_be_clickable((By.XPATH, selector)))
-                    print(f"[DEBUG] Found {list_type} link!")
-                    print(f"[DEBUG] Link href: {link.get_attribute('href')}")
-                    print(f"[DEBUG] Link text: {link.text}")
-                    break
-                except TimeoutException:
-                    continue
+            # Scroll and extract usernames
+            log.debug(f"Starting to extract {list_type}...")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Dialog size: {dialog.size}")
+            log.debug(f"Scrollable container found: {scrollable_container is not None}")
             
-            if not link:
-                print(f"[DEBUG] Could not find {list_type} link with any selector")
-                print("[DEBUG] Checking for all links on profile page...")
-                try:
-                    all_links = self.driver.find_elements(By.TAG_NAME, "a")
-                    print(f"[DEBUG] Found {len(all_links)} links on page")
-                    for i, lnk in enumerate(all_links[:20]):  # Show first 20
-                        try:
-                            href = lnk.get_attribute('href') or 'N/A'
-                            text = lnk.text or 'N/A'
-                            if 'follow' in href.lower() or 'follow' in text.lower():
-                                print(f"[DEBUG]   Link {i+1}: href='{href}', text='{text}'")
-                        except:
-                            pass
-                except Exception as e:
-                    print(f"[DEBUG] Error checking links: {str(e)}")
-                raise Exception(f"Could not find {list_type} link")
+            checkpoint = self._load_checkpoint(list_type, mode)
+            if checkpoint:
+                usernames.update(checkpoint.usernames)
+            last_count = len(usernames)
+            scroll_wait = AdaptiveScrollWait(max_ceiling=self.max_scroll_wait)
+            last_progress = time.monotonic()  # Last time users or rows appeared
+            pass_commands = []  # WebDriver commands issued per scroll pass
+            harvest_commands = []  # ...of which spent reading usernames
+            pass_start_commands = None
+            phase_times = {"harvest": 0.0, "scroll": 0.0, "wait": 0.0, "fallback": 0.0}
+            pipelined = strategy == "pipelined"
+            known_run = 0  # Consecutive harvested usernames already in known_usernames
             
-            print(f"[DEBUG] Clicking {list_type} link...")
-            link.click()
-            time.sleep(3)
-            print(f"[DEBUG] After clicking {list_type} link, URL: {self.driver.current_url}")
+            def list_state():
+                return tuple(self.driver.execute_script(LIST_STATE_JS, scrollable_container))
             
-            # Find the dialog/modal that contains the list
-            print("[DEBUG] Looking for dialog/modal containing the list...")
-            dialog_xpath = "//div[@role='dialog']"
-            try:
-                dialog = wait.until(EC.presence_of_element_located((By.XPATH, dialog_xpath)))
-                print("[DEBUG] Dialog found!")
-            except TimeoutException:
-                print("[DEBUG] Dialog not found with standard selector")
-                print("[DEBUG] Checking page structure...")
-                print(f"[DEBUG] Current URL: {self.driver.current_url}")
-                print(f"[DEBUG] Page title: {self.driver.title}")
-                
-                # Check if we're on a different page (maybe Instagram redirected)
-                if f"/{self.username}/" not in self.driver.current_url:
-                    print(f"[DEBUG] Unexpected URL after clicking {list_type} link")
-                    raise Exception(f"Instagram redirected to unexpected page: {self.driver.current_url}")
-                
-                # Try alternative dialog selectors
-                alternative_dialogs = [
-                    "//div[contains(@class, 'modal')]",
-                    "//div[contains(@class, 'dialog')]",
-                    "//div[contains(@style, 'position: fixed')]",
-                    "//div[@role='presentation']"
-                ]
-                
-                dialog = None
-                for alt_selector in alternative_dialogs:
-                    try:
-                        print(f"[DEBUG] Trying alternative dialog selector: {alt_selector}")
-                        dialog = self.driver.find_element(By.XPATH, alt_selector)
-                        if dialog.is_displayed():
-                            print(f"[DEBUG] Found dialog with selector: {alt_selector}")
-                            break
-                    except NoSuchElementException:
-                        continue
-                
-                if not dialog:
-                    print("[DEBUG] Could not find dialog with any selector")
-                    print("[DEBUG] Page source snippet (first 2000 chars):")
-                    print(self.driver.page_source[:2000])
-                    raise Exception(f"Could not find {list_type} dialog. Instagram may have changed their interface.")
-            
-            # Find the scrollable container within the dialog
-            # Instagram uses a specific structure - find the actual scrollable list
-            print("[DEBUG] Finding scrollable container...")
-            scrollable_container = None
-            
-            # Try to find the actual scrollable list element
-            scrollable_selectors = [
-                ".//div[@role='dialog']//div[contains(@style, 'overflow')]",
-                ".//div[@role='dialog']//div[contains(@class, '_aano')]",  # Instagram's scrollable class
-                ".//div[@role='dialog']//ul",
-                ".//div[@role='dialog']//div[contains(@style, 'height')]",
-                ".//div[contains(@class, 'scroll')]",
-                ".//ul",
-            ]
-            
-            for selector in scrollable_selectors:
+            def trigger_scroll():
+                """Scroll to the bottom; returns (start time, moved, state before) or None."""
+                self.scheduler.acquire("scroll")
+                phase_start = time.monotonic()
                 try:
-                    containers = dialog.find_elements(By.XPATH, selector)
-                    print(f"[DEBUG] Found {len(containers)} containers with selector: {selector}")
-                    for container in containers:
-                        try:
-                            # Check if it's actually scrollable
-                            scroll_height = self.driver.execute_script("return arguments[0].scrollHeight", container)
-                            client_height = self.driver.execute_script("return arguments[0].clientHeight", container)
-                            if scroll_height > client_height:
-                                scrollable_container = container
-                                print(f"[DEBUG] Found scrollable container! scrollHeight={scroll_height}, clientHeight={client_height}")
-                                break
-                        except:
-                            continue
-                    if scrollable_container:
-                        break
+                    moved, *state_before = self.driver.execute_script(
+                        SCROLL_TO_BOTTOM_JS, scrollable_container
+                    )
+                    return phase_start, moved, tuple(state_before)
                 except Exception as e:
-                    print(f"[DEBUG] Error with selector {selector}: {str(e)}")
-                    continue
-            
-            # Fallback: use the dialog itself or find by scrolling
-            if not scrollable_container:
-                print("[DEBUG] No scrollable container found, trying dialog itself...")
-                try:
-                    scroll_height = self.driver.execute_script("return arguments[0].scrollHeight", dialog)
-                    client_height = self.driver.execute_script("return arguments[0].clientHeight", dialog)
-                    if scroll_height > client_height:
-                        scrollable_container = dialog
-                        print(f"[DEBUG] Using dialog as scrollable container")
-                    else:
-                        # Try to find any div inside dialog that can scroll
-                        all_divs = dialog.find_elements(By.XPATH, ".//div")
-                        for div in all_divs:
-                            try:
-                                sh = self.driver.execute_script("return arguments[0].scrollHeight", div)
-                                ch = self.driver.execute_script("return arguments[0].clientHeight", div)
-                                if sh > ch and sh > 100:  # Must have some content
-                                    scrollable_container = div
-                                    print(f"[DEBUG] Found scrollable div: scrollHeight={sh}, clientHeight={ch}")
-                                    break
-                            except:
-                                continue
-                except:
-                    scrollable_container = dialog
+                    log.warning(f"Error scrolling container: {str(e)}")
+                    return None
+                finally:
+                    phase_times["scroll"] += time.monotonic() - phase_start
             
-            if not scrollable_container:
-                scrollable_container = dialog
-                print("[DEBUG] Using dialog as fallback scrollable container")
+            def reopen_list():
+                """Load the list again, e.g. after a rate limit pause, and scroll back to where it was."""
+                nonlocal dialog, scrollable_container
+                log.debug(f"Reopening the {list_type} list...")
+                dialog = self._open_list(list_type, list_url, dialog_xpath)
+                scrollable_container, _ = self.driver.execute_script(
+                    FIND_SCROLLABLE_CONTAINER_JS, dialog, self._container_path
+                )
+                if list_depth:
+                    self._fast_forward(list_depth, trigger_scroll, list_state, scroll_wait)
             
-            # Scroll and extract usernames
-            print(f"[DEBUG] Starting to extract {list_type}...")
-            print(f"[DEBUG] Dialog size: {dialog.size}")
-            print(f"[DEBUG] Scrollable container found: {scrollable_container is not None}")
+            if checkpoint and checkpoint.depth:
+                # The rows harvested before are known; load them without reading them again
+                list_depth = self._fast_forward(checkpoint.depth, trigger_scroll, list_state, scroll_wait)
             
-            usernames = set()
-            last_count = 0
-            no_change_count = 0
-            max_no_change = 3  # Stop after 3 consecutive scrolls with no new users
-            scroll_delay = 2  # Wait 2 seconds for content to load after scroll
+            self._print_progress(f"Loading {list_type}...", end="", flush=True)
             
-            print(f"Loading {list_type}...", end="", flush=True)
+            last_health_check = time.monotonic()
+            last_checkpoint = time.monotonic()
             
-            while no_change_count < max_no_change:
+            while True:
+                if self._stop_requested.is_set():
+                    raise Exception("Extraction stopped")
+                pass_start_commands = self.command_stats.total
+                pass_started = time.monotonic()
+                if time.monotonic() - last_health_check >= self.health_check_interval:
+                    # Catch rate limiting mid-scrape, not only when the page opens. The
+                    # notice stays on the page, so after the backoff the list is loaded
+                    # again and scrolled back to where it was before probing once more
+                    while self._wait_out_rate_limit(
+                            self.check_page_health(skip_element=scrollable_container, raise_on_problem=False)):
+                        reopen_list()
+                        last_progress = time.monotonic()
+                    self.browser_rss()
+                    last_health_check = time.monotonic()
+                if self.checkpoint_store and time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                    self._save_checkpoint(list_type, mode, usernames, depth=list_depth)
+                    last_checkpoint = time.monotonic()
+                scroll = None
+                if pipelined:
+                    # Start Instagram's fetch of the next page before parsing this one
+                    scroll = trigger_scroll()
+                
                 # Extract usernames from visible elements
+                phase_start = time.monotonic()
                 try:
                     # Re-find dialog if stale
                     try:
-                        user_elements = dialog.find_elements(
-                            By.XPATH,
-                            ".//a[contains(@href, '/')]"
-                        )
+                        harvested = self._harvest_usernames(dialog, scrollable_container)
                     except StaleElementReferenceException:
-                        print("\n[DEBUG] Stale element reference, re-finding dialog...")
+                        log.debug("Stale element reference, re-finding dialog...")
                         dialog = wait.until(EC.presence_of_element_located((By.XPATH, dialog_xpath)))
-                        user_elements = dialog.find_elements(By.XPATH, ".//a[contains(@href, '/')]")
+                        harvested = self._harvest_usernames(dialog, dialog)
                     
-                    # Extract usernames from current visible elements
-                    before_extraction = len(usernames)
-                    for element in user_elements:
-                        try:
-                            href = element.get_attribute('href')
-                            if href and 'instagram.com' in href:
-                                # Extract username from URL (format: instagram.com/username/)
-                                parts = href.rstrip('/').split('/')
-                                if len(parts) > 0:
-                                    username = parts[-1]
-                                    # Validate username (should not contain special characters or be Instagram pages)
-                                    if (username and 
-                                        username != self.username and
-                                        username not in ['explore', 'reels', 'accounts', 'direct', 'stories', 'p'] and
-                                        not username.startswith('?') and
-                                        not username.startswith('#') and
-                                        not username.startswith('@')):
-                                        usernames.add(username)
-                        except:
-                            continue
+                    if known_usernames is None:
+                        usernames.update(harvested)
+                    else:
+                        # Harvest order follows the list order, newest first
+                        for name in harvested:
+                            if name in usernames:
+                                continue
+                            usernames.add(name)
+                            known_run = known_run + 1 if name in known_usernames else 0
+                    harvest_commands.append(self.command_stats.total - pass_start_commands)
                     
                     current_count = len(usernames)
                     if current_count > last_count:
-                        print(f"\rLoading {list_type}... {current_count} found", end="", flush=True)
+                        self._print_progress(f"\rLoading {list_type}... {current_count} found", end="", flush=True)
                         last_count = current_count
-                        no_change_count = 0  # Reset counter when we find new users
-                    else:
-                        no_change_count += 1
-                        if no_change_count >= max_no_change:
-                            print(f"\n[DEBUG] No new users found after {max_no_change} scrolls, stopping...")
-                            break
+                        last_progress = time.monotonic()
                     
                 except Exception as e:
-                    print(f"\n[DEBUG] Error extracting usernames: {str(e)}")
-                    no_change_count += 1
-                    if no_change_count >= max_no_change:
-                        break
+                    log.warning(f"Error extracting usernames: {str(e)}")
+                phase_times["harvest"] += time.monotonic() - phase_start
+                
+                if capture is not None and capture.exhausted:
+                    log.debug(f"Instagram returned the last page of {list_type}, stopping...")
+                    break
+                
+                if known_usernames is not None and known_run >= self.known_run_length:
+                    log.debug(f"Reached {known_run} consecutive already-known {list_type}, stopping...")
+                    break
+                
+                # Only a count known to be exact may end the scroll; a display text that
+                # was misread ("1.234" as 1) would stop it after the first pass
+                if expected and expected.exact and expected.count and len(usernames) >= self._stop_at(expected):
+                    log.debug(f"Reached the {expected[0]} {list_type} shown on the profile, stopping...")
+                    break
+                
+                idle_time = time.monotonic() - last_progress
+                if idle_time >= self.idle_budget:
+                    log.debug(f"No new users for {idle_time:.1f}s (idle budget {self.idle_budget}s), stopping...")
+                    break
                 
-                # Scroll down in the dialog
+                # Scroll down in the dialog and wait until new rows arrive
+                if not pipelined:
+                    scroll = trigger_scroll()
                 scroll_success = False
-                try:
-                    # Get current scroll position and height
-                    last_scroll_top = self.driver.execute_script(
-                        "return arguments[0].scrollTop", scrollable_container
-                    )
-                    last_scroll_height = self.driver.execute_script(
-                        "return arguments[0].scrollHeight", scrollable_container
-                    )
-                    
-                    # Scroll to bottom
-                    self.driver.execute_script(
-                        "arguments[0].scrollTop = arguments[0].scrollHeight",
-                        scrollable_container
-                    )
-                    
-                    # Wait for new content to load
-                    time.sleep(scroll_delay)
-                    
-                    # Check if we've scrolled and if new content loaded
-                    new_scroll_top = self.driver.execute_script(
-                        "return arguments[0].scrollTop", scrollable_container
-                    )
-                    new_scroll_height = self.driver.execute_script(
-                        "return arguments[0].scrollHeight", scrollable_container
-                    )
-                    
-                    if new_scroll_top > last_scroll_top or new_scroll_height > last_scroll_height:
-                        scroll_success = True
-                        if no_change_count == 0:  # Only print debug on first scroll
-                            print(f"\n[DEBUG] Scrolled: top={last_scroll_top}->{new_scroll_top}, height={last_scroll_height}->{new_scroll_height}")
-                    
-                    # If scroll height didn't change and we're at the bottom, we might be done
-                    if new_scroll_height == last_scroll_height and new_scroll_top >= new_scroll_height - 10:
-                        # Check one more time for new users after a brief wait
-                        time.sleep(1)
-                        if len(usernames) == last_count:
-                            print(f"\n[DEBUG] Reached bottom with no new users, stopping")
-                            break
-                    
-                except Exception as e:
-                    print(f"\n[DEBUG] Error scrolling container: {str(e)}")
+                if scroll:
+                    scroll_started, moved, state_before = scroll
+                    phase_start = time.monotonic()
+                    try:
+                        # In pipelined mode the harvest time already counts towards the load
+                        grew, state_after = scroll_wait.wait(list_state, state_before, started_at=scroll_started)
+                        list_depth = max(list_depth, state_after[0])
+                        scroll_success = moved or grew
+                        if grew:
+                            last_progress = time.monotonic()
+                            if len(pass_commands) == 0:  # Only print debug on first scroll
+                                log.debug(f"Scrolled: height={state_before[0]}->{state_after[0]}, "
+                                          f"load latency ~{scroll_wait.typical_latency:.2f}s")
+                    except Exception as e:
+                        log.warning(f"Error waiting for new rows: {str(e)}")
+                    phase_times["wait"] += time.monotonic() - phase_start
                 
+                phase_start = time.monotonic()
                 # If container scroll didn't work, try keyboard scrolling on the scrollable container
                 if not scroll_success:
                     try:
-                        # Focus on the scrollable container and scroll with keyboard
-                        self.driver.execute_script("arguments[0].focus();", scrollable_container)
-                        scrollable_container.send_keys(Keys.PAGE_DOWN)
-                        time.sleep(scroll_delay)
-                        scroll_success = True
-                    except Exception as e:
-                        # Try sending keys to dialog instead
+                        baseline = list_state()
                         try:
+                            # Focus on the scrollable container and scroll with keyboard
+                            self.driver.execute_script("arguments[0].focus();", scrollable_container)
+                            scrollable_container.send_keys(Keys.PAGE_DOWN)
+                        except Exception:
+                            # Try sending keys to dialog instead
                             dialog.send_keys(Keys.PAGE_DOWN)
-                            time.sleep(scroll_delay)
-                            scroll_success = True
-                        except:
-                            pass
+                        grew, _ = scroll_wait.wait(list_state, baseline)
+                        scroll_success = True
+                        if grew:
+                            last_progress = time.monotonic()
+                    except Exception:
+                        pass
                 
                 # Final fallback: scroll the last visible element into view
                 if not scroll_success:
@@ -837,27 +1196,59 @@ class InstagramBot:
                         # Find username links and scroll the last one into view
                         user_links = dialog.find_elements(By.XPATH, ".//a[contains(@href, '/')]")
                         if user_links and len(user_links) > 0:
+                            baseline = list_state()
                             # Scroll the last visible link into view
                             self.driver.execute_script(
                                 "arguments[0].scrollIntoView({behavior: 'smooth', block: 'end'});",
                                 user_links[-1]
                             )
-                            time.sleep(scroll_delay)
+                            grew, _ = scroll_wait.wait(list_state, baseline)
                             scroll_success = True
+                            if grew:
+                                last_progress = time.monotonic()
                     except Exception as e:
                         pass
+                phase_times["fallback"] += time.monotonic() - phase_start
                 
-                if not scroll_success:
-                    no_change_count += 1
-                    if no_change_count >= max_no_change:
-                        print(f"\n[DEBUG] Could not scroll after {max_no_change} attempts, stopping")
-                        break
+                pass_commands.append(self.command_stats.total - pass_start_commands)
+                self.timer.record("scroll_pass", time.monotonic() - pass_started,
+                                  list=list_type, commands=pass_commands[-1], users=len(usernames))
+                pass_start_commands = None
+                
+                if not scroll_success and time.monotonic() - last_progress >= self.idle_budget:
+                    log.warning(f"Could not scroll for {self.idle_budget}s, stopping")
+                    break
+            
+            self._print_progress()  # New line after progress
             
-            print()  # New line after progress
+            if pass_start_commands is not None:
+                # The loop stopped part-way through a pass
+                pass_commands.append(self.command_stats.total - pass_start_commands)
+                self.timer.record("scroll_pass", time.monotonic() - pass_started,
+                                  list=list_type, commands=pass_commands[-1], users=len(usernames))
+            if capture is not None:
+                self.user_details[list_type] = dict(capture.users)
+            self.browser_rss()
+            self._record_extraction_stats(list_type, len(usernames), pass_commands, harvest_commands,
+                                          strategy=strategy,
+                                          lean=self.lean,
+                                          page_load_ms=page_load,
+                                          api_pages=capture.pages if capture is not None else None,
+                                          lost_api_pages=capture.lost_pages if capture is not None else None,
+                                          peak_browser_rss=self.peak_browser_rss or None,
+                                          mode=mode,
+                                          resumed_users=len(checkpoint.usernames) if checkpoint else 0,
+                                          expected_count=expected[0] if expected else None,
+                                          completeness=self._completeness(len(usernames), expected),
+                                          phase_times={k: round(v, 3) for k, v in phase_times.items()},
+                                          elapsed=round(time.monotonic() - extraction_start, 3),
+                                          **scroll_wait.stats())
             
             if not usernames:
                 raise Exception(f"No {list_type} found. This may indicate an error or your account has no {list_type}.")
             
+            completed = True
+            self._clear_checkpoint(list_type)
             return sorted(list(usernames))
             
         except TimeoutException:
@@ -876,11 +1267,639 @@ class InstagramBot:
             error_msg = f"Error extracting {list_type}: {str(e)}"
             print(f"\n✗ {error_msg}")
             raise
+        finally:
+            if self.harvest_mode == "observer":
+                # Also on errors, so no observer keeps buffering rows in the page
+                try:
+                    self.driver.execute_script(DISCONNECT_HARVEST_OBSERVER_JS)
+                except Exception:
+                    pass
+            # Interrupted (including Ctrl+C): keep what was harvested for the next run
+            if not completed and usernames:
+                self._save_checkpoint(list_type, mode, usernames, depth=list_depth)
     
-    def find_non_followers(self) -> List[str]:
+    def _fast_forward(self, target_depth: int, trigger_scroll, list_state, scroll_wait) -> int:
+        """
+        Scroll a freshly opened list back to where a checkpoint left off.
+        
+        Instagram only loads rows as the list is scrolled, so the dialog
+        cannot jump straight to a depth; instead it is scrolled to the
+        bottom as soon as each page arrives, without harvesting on the way.
+        The depth is the list's scroll height, which keeps growing on a
+        virtualized list while its number of rows in the DOM does not.
+        
+        Returns:
+            Scroll height of the list when it stopped
+        """
+        log.debug(f"Restoring list position ({target_depth}px)...")
+        start = time.monotonic()
+        depth = 0
+        while True:
+            scroll = trigger_scroll()
+            if scroll is None:
+                break
+            scroll_started, moved, state_before = scroll
+            depth = state_before[0]
+            if depth >= target_depth:
+                break
+            grew, state_after = scroll_wait.wait(list_state, state_before, started_at=scroll_started)
+            depth = state_after[0]
+            if not grew and not moved:
+                break
+        log.debug(f"Restored {depth} of {target_depth}px in {time.monotonic() - start:.1f}s")
+        return depth
+    
+    def _load_checkpoint(self, list_type: str, mode: str) -> Optional[Checkpoint]:
+        """Return the checkpoint of an interrupted extraction of list_type, if any."""
+        if not self.checkpoint_store:
+            return None
+        checkpoint = self.checkpoint_store.load(self.username, list_type, mode)
+        if checkpoint:
+            log.debug(f"Resuming {list_type} from a checkpoint with {len(checkpoint.usernames)} users")
+        return checkpoint
+    
+    def _save_checkpoint(self, list_type: str, mode: str, usernames: Set[str],
+                         depth: int = 0, cursor: Optional[str] = None):
+        """Save the progress of an extraction to the checkpoint store, if any."""
+        if not self.checkpoint_store:
+            return
+        try:
+            self.checkpoint_store.save(Checkpoint(self.username, list_type, mode, sorted(usernames),
+                                                  depth=depth, cursor=cursor))
+        except OSError as e:
+            # A missing checkpoint only costs a full re-read
+            log.warning(f"Could not save {list_type} checkpoint: {str(e)}")
+    
+    def _clear_checkpoint(self, list_type: str):
+        if self.checkpoint_store:
+            self.checkpoint_store.delete(self.username, list_type)
+    
+    def _extract_user_list_http(self, list_type: str,
+                                known_usernames: Optional[Set[str]] = None) -> List[str]:
+        """
+        Extract a list through the friendship API instead of the dialog.
+        
+        Args:
+            list_type: Either "followers" or "following"
+            known_usernames: As for _extract_user_list
+            
+        Returns:
+            List of usernames
+        """
+        client = self._http_client()
+        start = time.monotonic()
+        requests_before, retries_before = client.requests_made, client.retries
+        if self._http_user_id is None or list_type not in self.profile_counts:
+            profile = client.profile(self.username)
+            self._http_user_id = profile["id"]
+            for kind in ("followers", "following"):
+                if profile[kind] is not None:
+                    self.profile_counts.setdefault(kind, ProfileCount(profile[kind], 0, True))
+        expected = self.profile_counts.get(list_type)
+        
+        mode = "full" if known_usernames is None else "incremental"
+        checkpoint = self._load_checkpoint(list_type, mode)
+        resumed = set(checkpoint.usernames) if checkpoint else set()
+        progress = {"users": {}, "cursor": checkpoint.cursor if checkpoint else None, "saved_at": time.monotonic()}
+        
+        def on_page(users_so_far, cursor):
+            progress["users"], progress["cursor"] = users_so_far, cursor
+            self._print_progress(f"\rLoading {list_type}... {len(users_so_far)} found", end="", flush=True)
+            if self.checkpoint_store and time.monotonic() - progress["saved_at"] >= self.checkpoint_interval:
+                self._save_checkpoint(list_type, mode, resumed.union(users_so_far), cursor=cursor)
+                progress["saved_at"] = time.monotonic()
+        
+        self._print_progress(f"Loading {list_type}...", end="", flush=True)
+        try:
+            users, reached_end = client.fetch_list(
+                self._http_user_id, list_type,
+                known_usernames=known_usernames, known_run_length=self.known_run_length,
+                start_cursor=progress["cursor"], on_page=on_page
+            )
+        except BaseException:
+            # Interrupted (including Ctrl+C): keep what was read for the next run
+            if resumed or progress["users"]:
+                self._save_checkpoint(list_type, mode, resumed.union(progress["users"]),
+                                      cursor=progress["cursor"])
+            raise
+        self._print_progress()  # New line after progress
+        self.user_details[list_type] = {user.username: user for user in users}
+        usernames = resumed.union(user.username for user in users)
+        
+        self._record_extraction_stats(list_type, len(usernames), [], [],
+                                      http_requests=client.requests_made - requests_before,
+                                      http_retries=client.retries - retries_before,
+                                      cursor_restarts=client.cursor_restarts,
+                                      reached_end=reached_end,
+                                      mode=mode,
+                                      resumed_users=len(resumed),
+                                      expected_count=expected[0] if expected else None,
+                                      completeness=self._completeness(len(usernames), expected),
+                                      elapsed=round(time.monotonic() - start, 3))
+        
+        if not usernames:
+            raise Exception(f"No {list_type} found. This may indicate an error or your account has no {list_type}.")
+        
+        self._clear_checkpoint(list_type)
+        return sorted(usernames)
+    
+    def _load_profile(self):
+        """Navigate to the logged-in user's profile page."""
+        # Navigate to user's profile
+        log.debug(f"Navigating to profile: {self.base_url}/{self.username}/")
+        try:
+            with self.timer.span("profile_load"):
+                self._navigate(f"{self.base_url}/{self.username}/")
+                try:
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.XPATH, "//header | //main"))
+                    )
+                except TimeoutException:
+                    log.debug("Profile header not rendered yet, continuing...")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Profile page loaded. Current URL: {self.driver.current_url}")
+                log.debug(f"Page title: {self.driver.title}")
+        except WebDriverException as e:
+            log.warning(f"Network error loading profile: {str(e)}")
+            raise Exception(f"Network error: Could not load profile page. {str(e)}")
+    
+    def check_page_health(self, skip_element=None, raise_on_problem: bool = True) -> PageHealth:
+        """
+        Check the current page for rate limits, challenges and restrictions.
+        
+        The check runs inside the page and returns a small verdict, so it is
+        cheap enough to call after every navigation and during long scrolls.
+        
+        Args:
+            skip_element: Element not to scan, normally the user list
+            raise_on_problem: Raise PageHealthError unless the page is ok
+            
+        Returns:
+            PageHealth verdict
+            
+        Raises:
+            PageHealthError: If raise_on_problem is set and the page is not ok
+        """
+        health = probe_page_health(self.driver, skip_element)
+        if health.ok:
+            if self.scheduler.awaiting_recovery:
+                self.scheduler.recovered()
+        else:
+            log.debug(f"Page health: {health.status} ({health.detail})")
+            if health.status == RATE_LIMITED:
+                self.scheduler.throttled("rate limit page")
+            if raise_on_problem:
+                raise PageHealthError(health)
+        return health
+    
+    def _wait_out_rate_limit(self, health: PageHealth) -> bool:
+        """
+        Sleep through the scheduler's backoff if health reports a rate limit.
+        
+        Returns:
+            True if the caller should retry what it was doing, False if the
+            page is ok
+            
+        Raises:
+            PageHealthError: For other problems, or once the rate limit has
+                outlasted the scheduler's max_throttle_retries pauses
+        """
+        if health.ok:
+            return False
+        if health.status == RATE_LIMITED and not self.scheduler.should_give_up:
+            log.debug("Waiting for the rate limit to pass before resuming...")
+            self.scheduler.wait_until_resumed()
+            return True
+        raise PageHealthError(health)
+    
+    def _navigate(self, url: str):
+        """Load url once the scheduler allows another navigation."""
+        self.scheduler.acquire("navigation")
+        self.driver.get(url)
+    
+    def _open_list(self, list_type: str, list_url: str, dialog_xpath: str):
+        """
+        Open the followers/following dialog, waiting out rate limits.
+        
+        Navigates to the list URL, which usually renders the profile with the
+        dialog already open, and checks the page's health before anything else
+        is done with it; a rate limit is waited out and the list loaded again.
+        If the dialog did not open, the link on the profile is clicked.
+        
+        Args:
+            list_type: Either "followers" or "following"
+            list_url: URL of the list
+            dialog_xpath: XPath of the list dialog
+            
+        Returns:
+            The dialog element
+            
+        Raises:
+            PageHealthError: If the page shows a problem other than a rate
+                limit, or the rate limit does not pass
+        """
+        while True:
+            try:
+                with self.timer.span("profile_load", list=list_type, direct=True):
+                    self._navigate(list_url)
+            except WebDriverException as e:
+                log.warning(f"Network error loading profile: {str(e)}")
+                raise Exception(f"Network error: Could not load profile page. {str(e)}")
+            
+            dialog = None
+            try:
+                with self.timer.span("dialog_open", list=list_type, direct=True):
+                    dialog = self._find_element("dialog", [(By.XPATH, dialog_xpath)],
+                                                timeout=self.direct_dialog_timeout)
+                log.debug("Dialog opened by direct navigation")
+            except TimeoutException:
+                log.debug("Direct navigation did not open the dialog")
+            
+            # The rows are not scanned: a user named "rate limit" is not a rate limit page
+            if not self._wait_out_rate_limit(self.check_page_health(skip_element=dialog,
+                                                                    raise_on_problem=False)):
+                break
+        
+        if dialog is None:
+            log.debug(f"Falling back to clicking the {list_type} link...")
+            dialog = self._open_list_dialog_by_click(list_type, dialog_xpath)
+        return dialog
+    
+    def _open_list_dialog_by_click(self, list_type: str, dialog_xpath: str):
+        """
+        Open the followers/following dialog by clicking the link on the profile page.
+        
+        Fallback for when navigating to the list URL does not open the dialog.
+        
+        Args:
+            list_type: Either "followers" or "following"
+            dialog_xpath: XPath of the list dialog
+            
+        Returns:
+            The dialog element
+        """
+        # Compare the first path segment, so /bob does not pass for /bobby
+        path_segments = [part for part in urlparse(self.driver.current_url).path.split("/") if part]
+        if not path_segments or path_segments[0] != self.username:
+            self._load_profile()
+        
+        # Click on followers or following link
+        log.debug(f"Looking for {list_type} link...")
+        if list_type == "followers":
+            # Try multiple selectors for followers link
+            link_selectors = [
+                f"//a[contains(@href, '/{self.username}/followers')]",
+                "//a[contains(@href, '/followers/')]",
+                "//a[contains(@href, '/followers')]",
+                f"//a[@href='/{self.username}/followers/']",
+                "//span[contains(text(), 'followers')]/parent::a",
+                "//span[contains(text(), 'follower')]/parent::a"
+            ]
+        else:
+            # Try multiple selectors for following link
+            link_selectors = [
+                f"//a[contains(@href, '/{self.username}/following')]",
+                "//a[contains(@href, '/following/')]",
+                "//a[contains(@href, '/following')]",
+                f"//a[@href='/{self.username}/following/']",
+                "//span[contains(text(), 'following')]/parent::a"
+            ]
+        
+        link = None
+        try:
+            with self.timer.span("link_lookup", list=list_type):
+                link = self._find_element(
+                    f"{list_type}_link",
+                    [(By.XPATH, selector) for selector in link_selectors],
+                    timeout=15,
+                    condition="clickable"
+                )
+            log.debug(f"Found {list_type} link!")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Link href: {link.get_attribute('href')}")
+                log.debug(f"Link text: {link.text}")
+        except TimeoutException:
+            pass
+        
+        if not link:
+            log.warning(f"Could not find {list_type} link with any selector")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Checking for all links on profile page...")
+                try:
+                    all_links = self.driver.find_elements(By.TAG_NAME, "a")
+                    log.debug(f"Found {len(all_links)} links on page")
+                    for i, lnk in enumerate(all_links[:20]):  # Show first 20
+                        try:
+                            href = lnk.get_attribute('href') or 'N/A'
+                            text = lnk.text or 'N/A'
+                            if 'follow' in href.lower() or 'follow' in text.lower():
+                                log.debug(f"  Link {i+1}: href='{href}', text='{text}'")
+                        except:
+                            pass
+                except Exception as e:
+                    log.debug(f"Error checking links: {str(e)}")
+            raise Exception(f"Could not find {list_type} link")
+        
+        log.debug(f"Clicking {list_type} link...")
+        with self.timer.span("dialog_open", list=list_type):
+            return self._wait_for_clicked_dialog(list_type, link, dialog_xpath)
+    
+    def _wait_for_clicked_dialog(self, list_type: str, link, dialog_xpath: str):
+        """Click the list link and return the dialog it opens."""
+        link.click()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"After clicking {list_type} link, URL: {self.driver.current_url}")
+        
+        # Find the dialog/modal that contains the list
+        log.debug("Looking for dialog/modal containing the list...")
+        try:
+            dialog = self._find_element("dialog", [(By.XPATH, dialog_xpath)], timeout=15)
+            log.debug("Dialog found!")
+        except TimeoutException:
+            log.debug("Dialog not found with standard selector")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Checking page structure...")
+                log.debug(f"Current URL: {self.driver.current_url}")
+                log.debug(f"Page title: {self.driver.title}")
+            
+            # Check if we're on a different page (maybe Instagram redirected)
+            if f"/{self.username}/" not in self.driver.current_url:
+                log.debug(f"Unexpected URL after clicking {list_type} link")
+                raise Exception(f"Instagram redirected to unexpected page: {self.driver.current_url}")
+            
+            # Try alternative dialog selectors
+            alternative_dialogs = [
+                "//div[contains(@class, 'modal')]",
+                "//div[contains(@class, 'dialog')]",
+                "//div[contains(@style, 'position: fixed')]",
+                "//div[@role='presentation']"
+            ]
+            
+            dialog = None
+            try:
+                # All alternatives are checked in a single probe, no further waiting
+                dialog = self._find_element(
+                    "dialog_fallback",
+                    [(By.XPATH, selector) for selector in alternative_dialogs],
+                    timeout=0,
+                    condition="visible"
+                )
+            except TimeoutException:
+                pass
+            
+            if not dialog:
+                log.warning("Could not find dialog with any selector")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Page source snippet (first 2000 chars):\n%s", self.driver.page_source[:2000])
+                raise Exception(f"Could not find {list_type} dialog. Instagram may have changed their interface.")
+        
+        return dialog
+    
+    def _read_profile_counts(self) -> dict:
+        """
+        Read the follower and following counts from the profile header.
+        
+        Returns:
+            Dict mapping "followers"/"following" to ProfileCount as returned
+            by parse_count; missing counts are omitted
+        """
+        counts = {}
+        try:
+            raw_counts = self.driver.execute_script(READ_PROFILE_COUNTS_JS) or {}
+        except WebDriverException as e:
+            log.warning(f"Could not read profile counts: {str(e)}")
+            return counts
+        for list_type, (text, from_title) in raw_counts.items():
+            parsed = parse_count(text, exact=from_title)
+            if parsed:
+                counts[list_type] = parsed
+        log.debug(f"Profile counts: {raw_counts} -> {counts}")
+        return counts
+    
+    @staticmethod
+    def _stop_at(expected: ProfileCount) -> int:
+        """
+        How many users end the scroll early: the top of the count's range.
+        
+        Anything less may still be short of the real list, so scrolling goes on
+        until the idle budget runs out.
+        """
+        return expected.count + expected.uncertainty
+    
+    def _complete_at(self, expected: ProfileCount) -> int:
+        """
+        How many users a finished list needs to count as complete.
+        
+        The bottom of the count's range ("12.4K" may be 12,350), less
+        count_tolerance of the count for accounts the profile counts but the
+        list never shows.
+        """
+        return expected.count - expected.uncertainty - int(expected.count * self.count_tolerance)
+    
+    @staticmethod
+    def _completeness(found: int, expected: Optional[ProfileCount]) -> Optional[float]:
+        """Ratio of users harvested to the count shown on the profile."""
+        if not expected or not expected[0]:
+            return None
+        return round(found / expected[0], 4)
+    
+    def _report_completeness(self, list_type: str):
+        """Print how much of the profile count the last extraction covered."""
+        stats = self.extraction_stats.get(list_type, {})
+        completeness = stats.get("completeness")
+        if completeness is None:
+            return
+        if completeness < 1.0:
+            self._print_progress(f"⚠ Only {completeness:.1%} of the {stats['expected_count']:,} {list_type} "
+                                 f"shown on the profile were retrieved.")
+        else:
+            log.debug(f"{list_type} completeness: {completeness:.1%} of {stats['expected_count']}")
+    
+    def _find_element(self, name: str, candidates: List[Tuple[str, str]], timeout: float = 15,
+                      condition: str = "presence", fast_timeout: float = 3):
+        """
+        Locate a page element through a list of fallback selectors.
+        
+        The selector that matched last time (per the selector cache) is
+        waited for first, with a short timeout. Otherwise all candidates are
+        probed together in one JavaScript query per poll, and the first one
+        (in the given order) that matches wins and is recorded.
+        
+        Args:
+            name: Logical element name the cache ranks selectors under
+            candidates: (By.XPATH or By.NAME, value) selectors in priority order
+            timeout: Total time to wait for any candidate (seconds); 0 probes once
+            condition: "presence", "visible" or "clickable"
+            fast_timeout: How long to wait for the cached winner alone
+            
+        Returns:
+            The matching WebElement
+            
+        Raises:
+            TimeoutException: If no candidate matched in time
+        """
+        deadline = time.monotonic() + timeout
+        winner = self.selector_cache.winner(name, candidates) if self.selector_cache else None
+        if winner and timeout > 0:
+            expected_condition = {
+                "presence": EC.presence_of_element_located,
+                "visible": EC.visibility_of_element_located,
+                "clickable": EC.element_to_be_clickable,
+            }[condition]
+            try:
+                element = WebDriverWait(self.driver, min(fast_timeout, timeout)).until(
+                    expected_condition(winner)
+                )
+                log.debug(f"{name} found with cached selector: {winner[1]}")
+                return element
+            except TimeoutException:
+                log.info(f"Cached selector for {name} no longer matches, probing all candidates...")
+        
+        xpaths = [value if by == By.XPATH else f"//*[@name='{value}']" for by, value in candidates]
+        while True:
+            match = self.driver.execute_script(FIND_FIRST_MATCH_JS, xpaths, condition, None)
+            if match:
+                index, element = match
+                log.debug(f"{name} found with selector: {candidates[index][0]}={candidates[index][1]}")
+                if self.selector_cache:
+                    self.selector_cache.record(name, candidates[index])
+                return element
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f"No selector matched {name} within {timeout}s")
+            sleep(0.25)
+    
+    def _harvest_usernames(self, dialog, container=None) -> List[str]:
+        """
+        Read the usernames currently linked from inside the list dialog.
+        
+        Args:
+            dialog: The dialog element holding the user rows
+            container: The scrollable list element; the "observer" mode
+                watches it for inserted rows (defaults to the dialog)
+            
+        Returns:
+            Usernames found, in document order, without duplicates. In
+            "observer" mode only the usernames inserted since the previous
+            call are returned.
+        """
+        if self.harvest_mode == "network":
+            # Rows are read from the API responses, not from the dialog
+            if not self._capture:
+                return []
+            lost_before = self._capture.lost_pages
+            usernames = self._capture.drain()
+            if self._capture.lost_pages > lost_before:
+                # A response body was gone; its rows were just rendered, so read the dialog
+                log.debug("Harvesting the dialog for a list response that could not be read")
+                usernames += self.driver.execute_script(
+                    HARVEST_USERNAMES_JS, dialog, self.username, EXCLUDED_PATHS
+                ) or []
+            return usernames
+        
+        if self.harvest_mode == "observer":
+            delta = self.driver.execute_script(DRAIN_HARVEST_BUFFER_JS)
+            if delta is None:
+                # First pass, or the page replaced the list: (re)attach the observer
+                log.debug("Installing harvest observer on the list container")
+                delta = self.driver.execute_script(
+                    INSTALL_HARVEST_OBSERVER_JS, container or dialog, self.username, EXCLUDED_PATHS
+                )
+            return delta or []
+        
+        if self.harvest_mode == "batched":
+            # One round-trip: the anchors are read and filtered in the page
+            return self.driver.execute_script(
+                HARVEST_USERNAMES_JS, dialog, self.username, EXCLUDED_PATHS
+            ) or []
+        
+        usernames = []
+        for element in dialog.find_elements(By.XPATH, ".//a[contains(@href, '/')]"):
+            try:
+                username = self._username_from_href(element.get_attribute('href'))
+            except Exception:
+                continue
+            if username and username not in usernames:
+                usernames.append(username)
+        return usernames
+    
+    def _username_from_href(self, href: Optional[str]) -> Optional[str]:
+        """Return the username a profile link points to, or None for other links."""
+        if not href or ('instagram.com' not in href and not href.startswith(self.base_url + '/')):
+            return None
+        # Extract username from URL (format: instagram.com/username/)
+        username = href.rstrip('/').split('/')[-1]
+        # Validate username (should not contain special characters or be Instagram pages)
+        if (not username or
+                username == self.username or
+                username in EXCLUDED_PATHS or
+                username.startswith(('?', '#', '@'))):
+            return None
+        return username
+    
+    def _record_extraction_stats(self, list_type: str, user_count: int,
+                                 pass_commands: List[int], harvest_commands: List[int], **extra):
+        """Store round-trip counts and other figures for the last extraction of list_type."""
+        passes = len(pass_commands)
+        stats = {
+            "backend": self.backend,
+            "harvest_mode": self.harvest_mode,
+            "users": user_count,
+            "passes": passes,
+            "webdriver_commands": sum(pass_commands),
+            "commands_per_pass": pass_commands,
+            "harvest_commands_per_pass": harvest_commands,
+            "avg_commands_per_pass": sum(pass_commands) / passes if passes else 0.0,
+        }
+        stats["pacing"] = self.scheduler.stats()
+        stats.update(extra)
+        with self._stats_lock:
+            self.extraction_stats[list_type] = stats
+        if "http_requests" in stats:
+            log.debug(f"{list_type}: {stats['http_requests']} HTTP requests "
+                      f"({stats['http_retries']} retried) in {stats['elapsed']:.2f}s")
+        else:
+            log.debug(f"{list_type}: {passes} passes, {stats['webdriver_commands']} WebDriver commands "
+                      f"({stats['avg_commands_per_pass']:.1f}/pass, harvest mode '{self.harvest_mode}')")
+        if stats["pacing"]["throttle_events"]:
+            pacing = stats["pacing"]
+            log.debug(f"Pacing: {pacing['throttle_events']} throttle events, "
+                      f"{pacing['backoff_time']:.0f}s backed off, rate now {pacing['rate']}/s")
+        if stats.get("peak_browser_rss"):
+            log.debug(f"{list_type}: peak browser memory {stats['peak_browser_rss'] / 1048576:.0f} MB"
+                      f"{' (lean profile)' if stats.get('lean') else ''}")
+        if "phase_times" in stats:
+            phases = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in stats["phase_times"].items())
+            log.debug(f"{list_type}: {stats.get('strategy')} loop phase times: {phases}")
+        log.info(f"Extracted {user_count} {list_type}", extra={
+            "event": "extraction", "list": list_type, "users": user_count, "passes": passes,
+            "webdriver_commands": stats["webdriver_commands"], "elapsed": stats.get("elapsed"),
+        })
+    
+    def _log_run_summary(self):
+        """Log where the time went so far: sleeping, waiting on WebDriver, or in Python."""
+        summary = self.timer.summary()
+        log.info(f"Run summary: {summary['run']:.2f}s, of which {summary['sleep']:.2f}s sleeping, "
+                 f"{summary['webdriver']:.2f}s in WebDriver ({summary['webdriver_commands']} commands) "
+                 f"and {summary['python']:.2f}s in Python", extra={"event": "run_summary", **summary})
+    
+    def find_non_followers(self, concurrent: bool = False, incremental: bool = False) -> List[str]:
         """
         Find accounts that the user follows but who don't follow back.
         
+        Args:
+            concurrent: If True, extract the following list in a second
+                browser sharing this session's cookies while this browser
+                extracts the followers list, so the analysis takes about as
+                long as the longer of the two lists
+            incremental: If True and a recent full snapshot exists, only
+                scroll the followers list until already-known accounts are
+                reached and merge the new ones into the stored list (needs a
+                snapshot store). Only new entries are seen this way, so
+                accounts that stopped following stay in the list until the
+                next full scan; the following list is always scanned in full,
+                since an account unfollowed there would otherwise keep being
+                reported as not following back
+        
         Returns:
             List of usernames that don't follow back
             
@@ -892,12 +1911,22 @@ class InstagramBot:
         
         try:
             print("\nAnalyzing followers and following lists...")
-            followers = self.get_followers()
-            following = self.get_following()
+            self.profile_counts = {}  # Re-read the header counts for this analysis
+            known_followers = self._known_usernames("followers") if incremental else None
+            with self.timer.span("analysis"):
+                if concurrent and self.backend == "browser":
+                    followers, following = self._get_lists_concurrently(known_followers)
+                else:
+                    followers = self.get_followers(known_followers)
+                    following = self.get_following()
+            self._log_run_summary()
             
             if not followers or not following:
                 raise Exception("Could not retrieve complete lists. Please try again.")
             
+            self.last_lists = {"followers": followers, "following": following}
+            self._save_snapshots(self.last_lists)
+            
             # Convert to sets for comparison
             followers_set = set(followers)
             following_set = set(following)
@@ -912,14 +1941,195 @@ class InstagramBot:
                 raise Exception("Instagram rate limit detected. Please wait a few minutes before trying again.")
             raise
     
+    def _merge_with_known(self, list_type: str, head: List[str], known_usernames: Set[str]) -> List[str]:
+        """
+        Merge the newest entries of an incremental scrape into the previously known list.
+        
+        Only the head of the list was scraped, so a known account missing from
+        it may have left or may just be further down; it is kept.
+        """
+        new_entries = [name for name in head if name not in known_usernames]
+        merged = sorted(known_usernames.union(head))
+        log.debug(f"Incremental {list_type}: {len(new_entries)} new, {len(merged)} in total")
+        with self._stats_lock:
+            stats = self.extraction_stats.setdefault(list_type, {})
+            stats["new_users"] = len(new_entries)
+            stats["users"] = len(merged)
+            stats["completeness"] = self._completeness(len(merged), self.profile_counts.get(list_type))
+        return merged
+    
+    def _known_usernames(self, list_type: str) -> Optional[Set[str]]:
+        """
+        Pick the baseline for an incremental scrape of list_type.
+        
+        Returns:
+            Usernames of the latest complete snapshot, or None when a full scan
+            is needed (no snapshot store, no usable snapshot, or the last full
+            scan is older than full_rescan_days)
+        """
+        if not self.snapshot_store:
+            return None
+        last_full = self.snapshot_store.latest_snapshot(
+            self.username, list_type, complete_only=True, mode="full"
+        )
+        if last_full is None:
+            log.debug(f"No complete {list_type} snapshot yet, doing a full scan")
+            return None
+        taken_at = datetime.strptime(last_full.taken_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        age_days = (datetime.now(timezone.utc) - taken_at).total_seconds() / 86400
+        if age_days >= self.full_rescan_days:
+            log.debug(f"Last full {list_type} scan is {age_days:.1f} days old, doing a full scan")
+            return None
+        
+        baseline = self.snapshot_store.latest_snapshot(self.username, list_type, complete_only=True)
+        return set(self.snapshot_store.snapshot_usernames(baseline))
+    
+    def _save_snapshots(self, lists: dict):
+        """Store extracted lists in the snapshot store, if one is configured."""
+        if not self.snapshot_store:
+            return
+        for list_type, usernames in lists.items():
+            try:
+                self.snapshot_store.save_snapshot(
+                    self.username, list_type, usernames,
+                    complete=self._list_is_complete(list_type, len(usernames)),
+                    mode=self.extraction_stats.get(list_type, {}).get("mode", "full")
+                )
+            except Exception as e:
+                # History is a convenience; never fail the analysis over it
+                log.warning(f"Could not save {list_type} snapshot: {str(e)}")
+    
+    def list_is_complete(self, list_type: str) -> bool:
+        """Whether the last extraction of list_type reached the count shown on the profile."""
+        stats = self.extraction_stats.get(list_type)
+        return stats is not None and self._list_is_complete(list_type, stats.get("users", 0))
+    
+    def _list_is_complete(self, list_type: str, found: int) -> bool:
+        """Whether an extraction reached the count shown on the profile (True if unknown)."""
+        expected = self.profile_counts.get(list_type)
+        if not expected or not expected[0]:
+            return True
+        return found >= self._complete_at(expected)
+    
+    def _get_lists_concurrently(self, known_followers: Optional[Set[str]] = None) -> Tuple[List[str], List[str]]:
+        """
+        Extract followers here and following in a cloned browser at the same time.
+        
+        A WebDriver session must only be used from one thread, so the worker
+        thread gets its own InstagramBot (and browser); self.driver is only
+        ever touched from the calling thread. The worker's extraction stats
+        are merged back under a lock once it finishes.
+        
+        Returns:
+            Tuple of (followers, following)
+        """
+        log.debug("Starting a second browser for the following list...")
+        worker = self._clone_session()
+        # Only this thread prints progress, including the worker's counts once its
+        # stats are merged; two "\r" progress lines would overwrite each other
+        worker.show_progress = False
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="following")
+        try:
+            following_future = executor.submit(worker.get_following)
+            try:
+                followers = self.get_followers(known_followers)
+            except BaseException:
+                # Abort the worker's scrape instead of waiting for it to finish
+                worker.stop()
+                raise
+            following = following_future.result()
+            with self._stats_lock:
+                self.extraction_stats.update(worker.extraction_stats)
+                self.user_details.update(worker.user_details)
+                for list_type, count in worker.profile_counts.items():
+                    self.profile_counts.setdefault(list_type, count)
+                self.timer.merge(worker.timer)
+                self.command_stats.merge(worker.command_stats)
+            self._print_progress(f"✓ Found {len(following)} accounts you follow.")
+            self._report_completeness("following")
+            return followers, following
+        finally:
+            # The worker is done, or stopped and failing at its next command
+            executor.shutdown(wait=False)
+            worker.close()
+    
+    def _clone_session(self) -> "InstagramBot":
+        """
+        Open a new browser logged into the same Instagram session.
+        
+        Returns:
+            A logged-in InstagramBot with the same settings as this one
+        """
+        worker = InstagramBot(
+            headless=self.headless,
+            harvest_mode=self.harvest_mode,
+            max_scroll_wait=self.max_scroll_wait,
+            idle_budget=self.idle_budget,
+            scroll_strategy=self.scroll_strategy,
+            count_tolerance=self.count_tolerance,
+            chromedriver_version=self.chromedriver_version,
+            known_run_length=self.known_run_length,
+            selector_cache=self.selector_cache,
+            lean=self.lean,
+            base_url=self.base_url,
+            scheduler=self.scheduler,
+            page_load_timeout=self.page_load_timeout,
+            direct_dialog_timeout=self.direct_dialog_timeout
+        )
+        try:
+            worker._import_cookies(self._export_cookies())
+            worker.username = self.username
+            worker.is_logged_in = True
+            return worker
+        except Exception:
+            worker.close()
+            raise
+    
+    def _export_cookies(self) -> List[dict]:
+        """Return the browser's Instagram cookies."""
+        return self.driver.get_cookies()
+    
+    def _import_cookies(self, cookies: List[dict]):
+        """Load cookies into the browser (it must be on the Instagram domain first)."""
+        self._navigate(f"{self.base_url}/")
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except WebDriverException as e:
+                log.debug(f"Skipping cookie {cookie.get('name')}: {str(e)}")
+    
+    def _print_progress(self, *args, **kwargs):
+        """print() progress output, unless show_progress is off."""
+        if self.show_progress:
+            print(*args, **kwargs)
+    
+    def stop(self):
+        """
+        Abort this bot's work from another thread.
+        
+        Quits the browser under a running extraction, which then fails at
+        its next WebDriver command instead of scrolling to the end; the
+        bot cannot be used afterwards, only closed.
+        """
+        self._stop_requested.set()
+        if self._driver:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+    
     def close(self):
         """Close the browser and cleanup."""
-        if self.driver:
+        if self._http:
+            self._http.close()
+            self._http = None
+            self.is_logged_in = False
+        if self._driver:
             try:
-                self.driver.quit()
+                self._driver.quit()
             except Exception:
                 # Ignore errors during cleanup
                 pass
             finally:
                 self.is_logged_in = False
-                self.driver = None
+                self._driver = None
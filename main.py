@@ -12,6 +12,11 @@ except ImportError:
     import termios
     import tty
 from instagram_bot import InstagramBot
+from session_store import SessionStore
+from snapshot_store import SnapshotStore
+from selector_cache import SelectorCache
+from checkpoint_store import CheckpointStore
+from run_log import configure_logging
 
 
 def print_header():
@@ -29,13 +34,14 @@ def print_menu():
     print("MENU:")
     print("  1. Login to Instagram")
     print("  2. Run Analysis (Find Non-Followers)")
-    print("  3. Exit")
+    print("  3. Show Follower Changes Since Last Analysis")
+    print("  4. Exit")
     print("-" * 60)
 
 
 def get_user_choice() -> str:
     """Get user's menu choice."""
-    choice = input("\nEnter your choice (1-3): ").strip()
+    choice = input("\nEnter your choice (1-4): ").strip()
     return choice
 
 
@@ -108,13 +114,18 @@ def login_flow(bot: InstagramBot) -> bool:
         print("✗ Username cannot be empty.")
         return False
     
+    # A saved session skips the password prompt and the login form entirely
+    if bot.restore_session(username):
+        print("\n✓ Login successful! You can now run the analysis.")
+        return True
+    
     password = get_password_with_asterisks("Enter your Instagram password: ")
     if not password:
         print("✗ Password cannot be empty.")
         return False
     
     print("\nLogging in...")
-    success = bot.login(username, password)
+    success = bot.login(username, password, reuse_session=False)
     
     if success:
         print("\n✓ Login successful! You can now run the analysis.")
@@ -155,9 +166,12 @@ def run_analysis(bot: InstagramBot):
         
         print("-" * 60)
         
+        if bot.snapshot_store:
+            print_changes(bot.snapshot_store, bot.username)
+        
     except KeyboardInterrupt:
         print("\n\n✗ Analysis interrupted by user.")
-        print("You can try running the analysis again.")
+        print("Run the analysis again to continue where it stopped.")
     except Exception as e:
         error_msg = str(e)
         print(f"\n✗ Error during analysis: {error_msg}")
@@ -176,14 +190,62 @@ def run_analysis(bot: InstagramBot):
             print("\nPlease try again. If the problem persists, try logging in again.")
 
 
+def print_changes(store: SnapshotStore, account: str):
+    """Print new and lost followers between the last two stored analyses."""
+    changes = store.changes(account, "followers")
+    if changes.new is None:
+        print("\nNo saved analyses yet. Run an analysis first.")
+        return
+    if changes.old is None:
+        print(f"\nOnly one analysis saved so far ({changes.new.taken_at}). "
+              "Changes will be shown after the next one.")
+        return
+    
+    print(f"\nFollower changes from {changes.old.taken_at} to {changes.new.taken_at}:")
+    if changes.added:
+        print(f"\n  New followers ({len(changes.added)}):")
+        for username in changes.added:
+            print(f"    + @{username}")
+    if changes.removed:
+        print(f"\n  Unfollowed you ({len(changes.removed)}):")
+        for username in changes.removed:
+            print(f"    - @{username}")
+    if not changes.added and not changes.removed:
+        print("  No changes.")
+    if not (changes.old.complete and changes.new.complete):
+        print("\n⚠ One of these analyses was incomplete, so some changes may be missing or spurious.")
+
+
+def show_changes(bot: InstagramBot):
+    """Show follower changes from stored analyses, without opening the browser."""
+    print("\n" + "-" * 60)
+    print("FOLLOWER CHANGES")
+    print("-" * 60)
+    
+    account = bot.username or input("Enter your Instagram username: ").strip()
+    if not account:
+        print("✗ Username cannot be empty.")
+        return
+    print_changes(bot.snapshot_store, account)
+
+
 def main():
     """Main entry point."""
+    configure_logging()  # Level and format from $INSTAGRAM_BOT_LOG_LEVEL / $INSTAGRAM_BOT_LOG_FORMAT
     print_header()
     
     bot = None
     
     try:
-        bot = InstagramBot(headless=False)
+        bot = InstagramBot(
+            headless=False,
+            session_store=SessionStore(),
+            snapshot_store=SnapshotStore(),
+            selector_cache=SelectorCache(),
+            checkpoint_store=CheckpointStore(),
+            # Off by default: blocking images can break challenge and captcha pages
+            lean=os.environ.get("INSTAGRAM_BOT_LEAN", "").lower() in ("1", "true", "yes")
+        )
         
         while True:
             print_menu()
@@ -194,10 +256,12 @@ def main():
             elif choice == "2":
                 run_analysis(bot)
             elif choice == "3":
+                show_changes(bot)
+            elif choice == "4":
                 print("\nThank you for using Instagram Non-Follower Bot!")
                 break
             else:
-                print("\n✗ Invalid choice. Please enter 1, 2, or 3.")
+                print("\n✗ Invalid choice. Please enter 1, 2, 3, or 4.")
     
     except KeyboardInterrupt:
         print("\n\nInterrupted by user. Exiting...")
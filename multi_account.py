@@ -0,0 +1,222 @@
+"""
+Analyse many accounts with a bounded pool of worker processes.
+
+    python multi_account.py accounts.json --workers 3 --output results.jsonl
+
+Each account runs in its own process with its own browser (or HTTP
+session), exactly as ``batch.py`` would run it. The pool shares one
+request budget: every worker gets ``--rate / --workers`` requests per
+second and the first wave starts staggered, so running accounts in
+parallel does not multiply the load Instagram sees from this machine.
+
+The accounts file is either JSON, a list of usernames or of objects::
+
+    [{"account": "brand_a", "password_env": "BRAND_A_PASSWORD"},
+     {"account": "brand_b", "session_dir": "/srv/sessions/b", "options": ["--incremental"]}]
+
+or plain text with one ``username [PASSWORD_ENV_VAR]`` per line.
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+import batch
+from driver_cache import resolve_chromedriver
+from run_log import configure_logging, get_logger
+
+log = get_logger("multi_account")
+
+
+def load_accounts(path: str) -> List[dict]:
+    """
+    Read the accounts file.
+
+    Returns:
+        One dict per account with "account" and optionally "password_env",
+        "session_dir" and "options" (extra batch.py arguments)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith(".json"):
+        entries = json.loads(text)
+        return [{"account": entry} if isinstance(entry, str) else dict(entry) for entry in entries]
+    accounts = []
+    for line in text.splitlines():
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        entry = {"account": fields[0]}
+        if len(fields) > 1:
+            entry["password_env"] = fields[1]
+        accounts.append(entry)
+    return accounts
+
+
+def account_arguments(entry: dict, shared: List[str], rate: float) -> List[str]:
+    """batch.py arguments for one account: the shared ones, then its own."""
+    arguments = ["--account", entry["account"], "--rate", f"{rate:g}", *shared]
+    if entry.get("password_env"):
+        arguments += ["--password-env", entry["password_env"]]
+    if entry.get("session_dir"):
+        arguments += ["--session-dir", entry["session_dir"]]
+    return arguments + list(entry.get("options", []))
+
+
+def run_account(arguments: List[str], start_delay: float, log_path: Optional[str]) -> dict:
+    """
+    Worker process: analyse one account.
+
+    Args:
+        arguments: batch.py command line for the account
+        start_delay: Seconds to wait before starting (staggers the first wave)
+        log_path: File for the bot's progress output (None discards it)
+
+    Returns:
+        batch.run()'s result record, plus the worker's pid and "latency_s"
+        (from the start of the analysis to its end, without start_delay)
+    """
+    if start_delay:
+        time.sleep(start_delay)
+    started = time.monotonic()
+    args = batch.build_parser().parse_args(arguments)
+    log_file = open(log_path, "a", encoding="utf-8") if log_path else open(os.devnull, "w")
+    try:
+        with contextlib.redirect_stdout(log_file), contextlib.redirect_stderr(log_file):
+            configure_logging(args.log_level, args.log_json)
+            try:
+                result = batch.run(args)
+            except Exception as e:
+                result = {"account": args.account, "status": batch.STATUSES[batch.EXIT_ERROR],
+                          "exit_code": batch.EXIT_ERROR, "error": str(e),
+                          "non_followers": [], "counts": {}, "complete": {}, "timings": {}}
+    finally:
+        log_file.close()
+    result["worker_pid"] = os.getpid()
+    result["latency_s"] = round(time.monotonic() - started, 3)
+    return result
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of values (None for an empty list)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(results: List[dict], wall_time: float, workers: int) -> dict:
+    """Throughput and latency figures of a whole run."""
+    latencies = [r["latency_s"] for r in results if r.get("latency_s") is not None]
+    statuses = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    return {
+        "accounts": len(results),
+        "workers": workers,
+        "wall_time_s": round(wall_time, 3),
+        "accounts_per_hour": round(len(results) / wall_time * 3600, 2) if wall_time else None,
+        "latency_s": {
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "max": max(latencies) if latencies else None,
+        },
+        "statuses": statuses,
+    }
+
+
+def print_summary(summary: dict, results: List[dict]):
+    """Per-account and overall figures, to stderr."""
+    out = sys.stderr
+    print(f"\n{'Account':<30} {'Status':<13} {'Non-followers':>13} {'Latency':>10}", file=out)
+    for result in sorted(results, key=lambda r: r["account"]):
+        count = result.get("counts", {}).get("non_followers", "")
+        print(f"{result['account']:<30} {result['status']:<13} {count:>13} {result['latency_s']:>9.1f}s", file=out)
+    latency = summary["latency_s"]
+    print(f"\n{summary['accounts']} accounts in {summary['wall_time_s']:.1f}s with {summary['workers']} workers: "
+          f"{summary['accounts_per_hour']} accounts/hour, latency p50 {latency['p50']}s, "
+          f"p95 {latency['p95']}s, max {latency['max']}s", file=out)
+    print("Statuses: " + ", ".join(f"{name} {n}" for name, n in sorted(summary["statuses"].items())), file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runner entry point.
+
+    Returns:
+        0 if every account succeeded, else the highest exit code among them
+        (see batch.py)
+    """
+    parser = argparse.ArgumentParser(
+        description="Run non-follower analyses for many accounts in parallel.",
+        epilog="Any further arguments (e.g. --backend http --incremental) are passed to every account's batch.py run.",
+    )
+    parser.add_argument("accounts_file", help="JSON or text file listing the accounts")
+    parser.add_argument("--workers", type=int, default=2, help="parallel worker processes (default: 2)")
+    parser.add_argument("--rate", type=float, default=3.0, metavar="PER_SECOND",
+                        help="requests per second for the whole pool, split between the workers (default: 3)")
+    parser.add_argument("--stagger", type=float, default=20.0, metavar="SECONDS",
+                        help="delay between the starts of the first workers (default: 20)")
+    parser.add_argument("--output", "-o", default="-", help="result file (default: stdout)")
+    parser.add_argument("--format", choices=batch.OUTPUT_FORMATS, help="output format (default: from --output)")
+    parser.add_argument("--log-dir", help="write each account's progress output to <log-dir>/<account>.log")
+    args, shared = parser.parse_known_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # Catch mistakes in the shared batch.py arguments before starting anything
+    shared_args = batch.build_parser().parse_args(["--account", "-", *shared])
+    configure_logging(shared_args.log_level, shared_args.log_json)
+    accounts = load_accounts(args.accounts_file)
+    if not accounts:
+        parser.error("no accounts in " + args.accounts_file)
+    workers = min(args.workers, len(accounts))
+    per_worker_rate = args.rate / workers
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+    if shared_args.backend == "browser":
+        # Resolve the driver once here rather than in every worker at the same time
+        try:
+            resolve_chromedriver()
+        except Exception as e:
+            log.warning(f"Could not resolve chromedriver up front: {str(e)}")
+
+    start = time.monotonic()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for index, entry in enumerate(accounts):
+            log_path = os.path.join(args.log_dir, f"{entry['account']}.log") if args.log_dir else None
+            # Only the first wave is staggered; later accounts start as workers free up
+            delay = index * args.stagger if index < workers else 0.0
+            future = pool.submit(run_account, account_arguments(entry, shared, per_worker_rate), delay, log_path)
+            futures[future] = entry["account"]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print(f"[{len(results)}/{len(accounts)}] {result['account']}: {result['status']} "
+                      f"({result['latency_s']:.1f}s)", file=sys.stderr)
+        except KeyboardInterrupt:
+            print("Interrupted, cancelling the remaining accounts...", file=sys.stderr)
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    summary = summarize(results, time.monotonic() - start, workers)
+    print_summary(summary, results)
+    output_format = batch.output_format_for(args.output, args.format)
+    if output_format == "json":
+        batch.write_results([{"summary": summary, "results": results}], args.output, output_format)
+    else:
+        batch.write_results(results, args.output, output_format)
+    return max((r["exit_code"] for r in results), default=0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
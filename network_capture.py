@@ -0,0 +1,179 @@
+"""
+Follower/following lists read from Instagram's own API responses.
+
+The rows of the list dialog are rendered from paginated JSON responses
+(``/api/v1/friendships/<id>/followers/``, or GraphQL queries on
+``/graphql/query/`` in some versions of the web client). With Chrome's performance log
+enabled, every response is announced as a Network event; the bodies of
+the friendship-list responses are fetched through the DevTools protocol
+and parsed, which yields user ids, full names and verification flags
+instead of just the usernames visible in link hrefs.
+"""
+
+import base64
+import json
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from run_log import get_logger
+
+log = get_logger("network_capture")
+
+# Chrome capability that makes driver.get_log("performance") return Network events
+PERFORMANCE_LOG_PREFS = {"performance": "ALL"}
+
+# REST endpoint used by the web client for both lists
+_FRIENDSHIPS_URL = re.compile(r"/api/v1/friendships/[^/]+/(followers|following)/")
+# GraphQL endpoints; the list a query is for only shows in its response
+_GRAPHQL_URL = re.compile(r"/(?:api/)?graphql(?:/query)?/?(?:\?|$)")
+# GraphQL responses carry the list under one of these edges
+_GRAPHQL_EDGES = {"edge_followed_by": "followers", "edge_follow": "following"}
+
+
+class FriendshipUser(NamedTuple):
+    """One account as described by a friendship-list response."""
+    id: str
+    username: str
+    full_name: str = ""
+    is_verified: bool = False
+    is_private: bool = False
+
+
+def parse_friendship_page(body: str) -> Tuple[List[FriendshipUser], Optional[str]]:
+    """
+    Parse one page of a followers/following response.
+
+    Understands the REST shape (``{"users": [...], "next_max_id": ...}``)
+    and the GraphQL shape (``data.user.edge_followed_by.edges[].node``).
+
+    Args:
+        body: The response body
+
+    Returns:
+        Tuple of (users on the page, cursor of the next page or None on
+        the last page)
+
+    Raises:
+        ValueError: If the body is not a friendship-list response
+    """
+    return _parse_page(body)[1:]
+
+
+def _parse_page(body: str) -> Tuple[Optional[str], List[FriendshipUser], Optional[str]]:
+    """parse_friendship_page(), also returning the list a GraphQL page is for (None for REST)."""
+    data = json.loads(body)
+    if isinstance(data, dict) and isinstance(data.get("users"), list):
+        users = [_user_from_json(entry) for entry in data["users"]]
+        cursor = data.get("next_max_id")
+        return None, [user for user in users if user], str(cursor) if cursor else None
+
+    user = ((data or {}).get("data") or {}).get("user") or {} if isinstance(data, dict) else {}
+    for edge_name, list_type in _GRAPHQL_EDGES.items():
+        edge = user.get(edge_name)
+        if isinstance(edge, dict) and "edges" in edge:
+            users = [_user_from_json(item.get("node") or {}) for item in edge["edges"]]
+            page_info = edge.get("page_info") or {}
+            cursor = page_info.get("end_cursor") if page_info.get("has_next_page") else None
+            return list_type, [user for user in users if user], cursor
+    raise ValueError("Not a friendship list response")
+
+
+def _user_from_json(entry: dict) -> Optional[FriendshipUser]:
+    username = entry.get("username")
+    if not username:
+        return None
+    return FriendshipUser(
+        id=str(entry.get("pk") or entry.get("pk_id") or entry.get("id") or ""),
+        username=username,
+        full_name=entry.get("full_name") or "",
+        is_verified=bool(entry.get("is_verified")),
+        is_private=bool(entry.get("is_private")),
+    )
+
+
+class FriendshipCapture:
+    """Collect the users of one list from the responses the page receives."""
+
+    def __init__(self, driver, list_type: str):
+        """
+        Args:
+            driver: Chrome WebDriver started with PERFORMANCE_LOG_PREFS
+            list_type: "followers" or "following"
+        """
+        self.driver = driver
+        self.list_type = list_type
+        self.users: Dict[str, FriendshipUser] = {}
+        self.pages = 0
+        self.lost_pages = 0  # Responses whose body could not be read
+        self.exhausted = False  # A page without a next cursor was seen
+        self._pending = {}  # requestId -> (URL, whether it is a GraphQL query) of responses still loading
+
+    def reset(self):
+        """Discard events logged so far, e.g. before navigating to the list."""
+        try:
+            self.driver.get_log("performance")
+        except WebDriverException:
+            pass
+        self._pending.clear()
+
+    def drain(self) -> List[str]:
+        """
+        Parse the list responses that finished loading since the last call.
+
+        Returns:
+            New usernames, in the order Instagram listed them
+        """
+        new_usernames = []
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.responseReceived":
+                url = params.get("response", {}).get("url", "")
+                match = _FRIENDSHIPS_URL.search(url)
+                if match and match.group(1) == self.list_type:
+                    self._pending[params.get("requestId")] = (url, False)
+                elif _GRAPHQL_URL.search(url):
+                    self._pending[params.get("requestId")] = (url, True)
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                url, graphql = self._pending.pop(params["requestId"])
+                new_usernames.extend(self._read_response(params["requestId"], url, graphql))
+        return new_usernames
+
+    def _read_response(self, request_id: str, url: str, graphql: bool = False) -> List[str]:
+        try:
+            response = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = response.get("body", "")
+            if response.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8")
+        except (WebDriverException, ValueError) as e:
+            # Bodies are evicted from Chrome's buffer eventually; the caller has to
+            # read this page's rows from the DOM (see lost_pages)
+            log.warning(f"Could not read {self.list_type} response {url}: {str(e)}")
+            self.lost_pages += 1
+            return []
+        try:
+            list_type, users, cursor = _parse_page(body)
+        except ValueError as e:
+            if graphql:
+                # Most GraphQL queries are about something else than the lists
+                return []
+            log.warning(f"Could not read {self.list_type} response {url}: {str(e)}")
+            self.lost_pages += 1
+            return []
+        if graphql and list_type != self.list_type:
+            return []
+        self.pages += 1
+        if cursor is None:
+            self.exhausted = True
+        new_usernames = []
+        for user in users:
+            if user.username not in self.users:
+                self.users[user.username] = user
+                new_usernames.append(user.username)
+        return new_usernames
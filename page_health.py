@@ -0,0 +1,63 @@
+"""
+Cheap in-page checks for rate limits, challenges and restrictions.
+
+The verdict is computed inside the browser and only a small dict comes
+back over the WebDriver connection, so it can run after every navigation
+and periodically while a long list is being scrolled.
+"""
+
+from typing import NamedTuple
+
+from page_scripts import PAGE_HEALTH_JS
+
+OK = "ok"
+RATE_LIMITED = "rate_limited"
+CHALLENGE = "challenge"
+RESTRICTED = "restricted"
+LOGGED_OUT = "logged_out"
+
+# User-facing messages; the rate limit wording is what callers match on
+_MESSAGES = {
+    RATE_LIMITED: "Instagram rate limit detected. Please wait before trying again.",
+    CHALLENGE: "Instagram is asking to confirm it's you (challenge). Please check your Instagram account.",
+    RESTRICTED: "Account may be restricted. Please check your Instagram account.",
+    LOGGED_OUT: "Instagram session is no longer logged in. Please login again.",
+}
+
+
+class PageHealth(NamedTuple):
+    """Verdict of one page health probe."""
+    status: str
+    detail: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+
+class PageHealthError(Exception):
+    """Raised when a page is rate limited, challenged, restricted or logged out."""
+
+    def __init__(self, health: PageHealth):
+        super().__init__(_MESSAGES.get(health.status, f"Unexpected page state: {health.status}"))
+        self.health = health
+
+    @property
+    def status(self) -> str:
+        return self.health.status
+
+
+def probe_page_health(driver, skip_element=None, max_chars: int = 200000) -> PageHealth:
+    """
+    Classify the page currently loaded in driver.
+
+    Args:
+        driver: Selenium WebDriver
+        skip_element: Element whose subtree is not scanned (e.g. the user list)
+        max_chars: Upper bound on the page text inspected
+
+    Returns:
+        PageHealth verdict
+    """
+    result = driver.execute_script(PAGE_HEALTH_JS, skip_element, max_chars) or {}
+    return PageHealth(result.get("status", OK), (result.get("detail") or "")[:200])
@@ -0,0 +1,364 @@
+"""
+JavaScript snippets executed inside the Instagram page via execute_script.
+
+Keeping the DOM work in the browser lets one WebDriver round-trip replace
+dozens of per-element find/get_attribute calls.
+"""
+
+# Path segments that look like profile links but are Instagram pages.
+EXCLUDED_PATHS = ['explore', 'reels', 'accounts', 'direct', 'stories', 'p']
+
+
+# Shared helper: the username a profile link points to, or null.
+# Mirrors InstagramBot._username_from_href.
+_USERNAME_FROM_ANCHOR_JS = """
+function usernameFromAnchor(anchor, ownUsername, excluded) {
+    var href = anchor.href;
+    if (!href || (href.indexOf('instagram.com') === -1 && anchor.host !== window.location.host)) {
+        return null;
+    }
+    var parts = href.replace(/\\/+$/, '').split('/');
+    var name = parts[parts.length - 1];
+    if (!name || name === ownUsername || excluded.indexOf(name) !== -1) {
+        return null;
+    }
+    var first = name.charAt(0);
+    if (first === '?' || first === '#' || first === '@') {
+        return null;
+    }
+    return name;
+}
+"""
+
+
+# Collect the deduplicated, filtered usernames linked from inside an element.
+# arguments: [root element, own username, excluded path segments]
+HARVEST_USERNAMES_JS = _USERNAME_FROM_ANCHOR_JS + """
+var root = arguments[0];
+// No prototype, so names like "constructor" are not already "seen"
+var seen = Object.create(null);
+var result = [];
+var anchors = root.querySelectorAll('a[href*="/"]');
+for (var i = 0; i < anchors.length; i++) {
+    var name = usernameFromAnchor(anchors[i], arguments[1], arguments[2]);
+    if (name && !seen[name]) {
+        seen[name] = true;
+        result.push(name);
+    }
+}
+return result;
+"""
+
+
+# Install a MutationObserver that buffers usernames as their rows are
+# inserted (or recycled with a new href) under the root element. Replaces
+# any previous observer and returns the usernames already present.
+# arguments: [root element, own username, excluded path segments]
+INSTALL_HARVEST_OBSERVER_JS = _USERNAME_FROM_ANCHOR_JS + """
+var root = arguments[0];
+var ownUsername = arguments[1];
+var excluded = arguments[2];
+if (window.__igHarvest) {
+    window.__igHarvest.observer.disconnect();
+}
+var state = {root: root, buffer: [], seen: Object.create(null), observer: null};
+function record(anchor) {
+    var name = usernameFromAnchor(anchor, ownUsername, excluded);
+    if (name && !state.seen[name]) {
+        state.seen[name] = true;
+        state.buffer.push(name);
+    }
+}
+function scan(node) {
+    if (node.nodeType !== 1) {
+        return;
+    }
+    if (node.tagName === 'A') {
+        record(node);
+    }
+    var anchors = node.querySelectorAll('a[href*="/"]');
+    for (var i = 0; i < anchors.length; i++) {
+        record(anchors[i]);
+    }
+}
+state.observer = new MutationObserver(function(mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var mutation = mutations[i];
+        if (mutation.type === 'attributes') {
+            scan(mutation.target);
+            continue;
+        }
+        for (var j = 0; j < mutation.addedNodes.length; j++) {
+            scan(mutation.addedNodes[j]);
+        }
+    }
+});
+state.observer.observe(root, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+window.__igHarvest = state;
+scan(root);
+var initial = state.buffer;
+state.buffer = [];
+return initial;
+"""
+
+
+# Return and clear the usernames buffered since the last drain, or null when
+# no observer is attached to a live element (page reloaded, dialog replaced).
+DRAIN_HARVEST_BUFFER_JS = """
+var state = window.__igHarvest;
+if (!state || !document.contains(state.root)) {
+    return null;
+}
+var drained = state.buffer;
+state.buffer = [];
+return drained;
+"""
+
+
+# Stop the harvest observer, if any.
+DISCONNECT_HARVEST_OBSERVER_JS = """
+if (window.__igHarvest) {
+    window.__igHarvest.observer.disconnect();
+    window.__igHarvest = null;
+}
+"""
+
+
+# Snapshot of a scrollable list used to detect newly loaded rows:
+# [scrollHeight, number of links, href of the last link].
+# arguments: [scrollable element]
+LIST_STATE_JS = """
+var el = arguments[0];
+var anchors = el.querySelectorAll('a[href*="/"]');
+var last = anchors.length ? anchors[anchors.length - 1].href : '';
+return [el.scrollHeight, anchors.length, last];
+"""
+
+
+# Scroll an element to its bottom and report whether it moved, followed by
+# the LIST_STATE_JS snapshot taken before the scroll.
+# arguments: [scrollable element]
+SCROLL_TO_BOTTOM_JS = """
+var el = arguments[0];
+var anchors = el.querySelectorAll('a[href*="/"]');
+var last = anchors.length ? anchors[anchors.length - 1].href : '';
+var state = [el.scrollHeight, anchors.length, last];
+var before = el.scrollTop;
+el.scrollTop = el.scrollHeight;
+return [el.scrollTop > before].concat(state);
+"""
+
+
+# Raw follower/following counts from the profile header as [text, whether
+# the text is a title attribute], e.g. {"followers": ["12,431", true],
+# "following": ["512", false]}. The exact figure is taken from the title
+# attribute Instagram puts on abbreviated counts ("12.4K") when it is
+# present, otherwise the link or list item text is returned.
+READ_PROFILE_COUNTS_JS = """
+var result = {};
+var anchors = document.querySelectorAll('a[href*="/followers"], a[href*="/following"]');
+for (var i = 0; i < anchors.length; i++) {
+    var anchor = anchors[i];
+    var kind = anchor.getAttribute('href').indexOf('/followers') !== -1 ? 'followers' : 'following';
+    if (result[kind]) {
+        continue;
+    }
+    var titled = anchor.querySelector('[title]');
+    var title = titled && titled.getAttribute('title');
+    result[kind] = title ? [title, true] : [anchor.innerText, false];
+}
+var items = document.querySelectorAll('header li');
+for (var j = 0; j < items.length; j++) {
+    var text = items[j].innerText.toLowerCase();
+    var kind = text.indexOf('follower') !== -1 ? 'followers' :
+               (text.indexOf('following') !== -1 ? 'following' : null);
+    if (kind && !result[kind]) {
+        var titled = items[j].querySelector('[title]');
+        var title = titled && titled.getAttribute('title');
+        result[kind] = title ? [title, true] : [items[j].innerText, false];
+    }
+}
+return result;
+"""
+
+
+# Cheap logged-in check after restoring a session: where the browser ended
+# up and whether a login form is on the page.
+SESSION_PROBE_JS = """
+return {
+    url: window.location.href,
+    loginForm: !!document.querySelector('input[name="username"], input[name="password"], input[name="email"]')
+};
+"""
+
+
+# Return [index, element] for the first XPath (in the given order) that
+# matches under root, or null. mode is "presence", "visible" or "clickable"
+# (visible and not disabled), mirroring the expected_conditions used before.
+# arguments: [list of XPaths, mode, root element or null for the document]
+FIND_FIRST_MATCH_JS = """
+var xpaths = arguments[0];
+var mode = arguments[1];
+var root = arguments[2] || document;
+for (var i = 0; i < xpaths.length; i++) {
+    var matches;
+    try {
+        matches = document.evaluate(xpaths[i], root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        continue;
+    }
+    for (var j = 0; j < matches.snapshotLength; j++) {
+        var el = matches.snapshotItem(j);
+        if (mode === 'presence') {
+            return [i, el];
+        }
+        if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) {
+            continue;
+        }
+        if (mode === 'clickable' && el.disabled) {
+            continue;
+        }
+        return [i, el];
+    }
+}
+return null;
+"""
+
+
+# Locate the element that scrolls the user list inside the dialog in one
+# pass. A cached path (child indexes from the dialog) is tried first; then
+# the whole subtree is walked and the scrollable element holding the most
+# profile links wins, preferring elements styled overflow auto/scroll.
+# Returns [element, path]; the dialog itself and [] if nothing scrolls.
+# arguments: [dialog element, cached path or null]
+FIND_SCROLLABLE_CONTAINER_JS = """
+var dialog = arguments[0];
+var cachedPath = arguments[1];
+function isScrollable(el) {
+    return el.clientHeight > 0 && el.scrollHeight > el.clientHeight + 1;
+}
+function pathTo(el) {
+    var path = [];
+    while (el && el !== dialog) {
+        var parent = el.parentElement;
+        if (!parent) {
+            return null;
+        }
+        path.unshift(Array.prototype.indexOf.call(parent.children, el));
+        el = parent;
+    }
+    return path;
+}
+if (cachedPath) {
+    var node = dialog;
+    for (var i = 0; i < cachedPath.length && node; i++) {
+        node = node.children[cachedPath[i]];
+    }
+    if (node && isScrollable(node)) {
+        return [node, cachedPath];
+    }
+}
+var best = null;
+var bestScore = null;
+var walker = document.createTreeWalker(dialog, NodeFilter.SHOW_ELEMENT);
+for (var el = walker.currentNode; el; el = walker.nextNode()) {
+    if (!isScrollable(el)) {
+        continue;
+    }
+    var overflow = window.getComputedStyle(el).overflowY;
+    var score = [
+        overflow === 'auto' || overflow === 'scroll' ? 1 : 0,
+        el.querySelectorAll('a[href*="/"]').length,
+        el.scrollHeight
+    ];
+    if (!bestScore || score[0] > bestScore[0] ||
+            (score[0] === bestScore[0] && (score[1] > bestScore[1] ||
+             (score[1] === bestScore[1] && score[2] > bestScore[2])))) {
+        best = el;
+        bestScore = score;
+    }
+}
+if (!best) {
+    return [dialog, []];
+}
+return [best, pathTo(best)];
+"""
+
+
+# Small structured verdict on the state of the current page:
+# {status: ok|rate_limited|challenge|restricted|logged_out, detail: text}.
+# Only the URL and the text outside the skipped element (normally the
+# scrolling user list) are inspected, and at most maxChars characters of
+# text are read, so the probe stays cheap on pages with huge lists.
+# arguments: [element to skip or null, maxChars]
+PAGE_HEALTH_JS = """
+var skip = arguments[0];
+var maxChars = arguments[1] || 200000;
+var url = window.location.href.toLowerCase();
+if (url.indexOf('/challenge') !== -1) {
+    return {status: 'challenge', detail: url};
+}
+if (url.indexOf('/accounts/suspended') !== -1 || url.indexOf('restricted') !== -1) {
+    return {status: 'restricted', detail: url};
+}
+if (url.indexOf('/accounts/login') !== -1) {
+    return {status: 'logged_out', detail: url};
+}
+var ratePhrases = ['try again later', 'rate limit', 'too many requests', 'please wait a few minutes'];
+var challengePhrases = ['suspicious activity', 'confirm it\\'s you', 'help us confirm'];
+var restrictPhrases = ['restricted', 'suspended'];
+var scanned = 0;
+var body = document.body;
+if (body) {
+    var walker = document.createTreeWalker(body, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+        acceptNode: function(node) {
+            if (node === skip || node.tagName === 'SCRIPT' || node.tagName === 'STYLE') {
+                return NodeFilter.FILTER_REJECT;
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+    var node;
+    while ((node = walker.nextNode()) && scanned < maxChars) {
+        if (node.nodeType !== 3) {
+            continue;
+        }
+        var text = node.nodeValue.toLowerCase();
+        scanned += text.length;
+        var i;
+        for (i = 0; i < ratePhrases.length; i++) {
+            if (text.indexOf(ratePhrases[i]) !== -1) {
+                return {status: 'rate_limited', detail: node.nodeValue.trim()};
+            }
+        }
+        for (i = 0; i < challengePhrases.length; i++) {
+            if (text.indexOf(challengePhrases[i]) !== -1) {
+                return {status: 'challenge', detail: node.nodeValue.trim()};
+            }
+        }
+        var parent = node.parentElement;
+        if (parent && parent.tagName === 'DIV' && (parent.offsetWidth || parent.offsetHeight)) {
+            for (i = 0; i < restrictPhrases.length; i++) {
+                if (text.indexOf(restrictPhrases[i]) !== -1) {
+                    return {status: 'restricted', detail: node.nodeValue.trim()};
+                }
+            }
+        }
+    }
+}
+if (document.querySelector('input[name="password"], input[name="pass"]')) {
+    return {status: 'logged_out', detail: 'login form on page'};
+}
+return {status: 'ok', detail: ''};
+"""
+
+
+# Timing of the current document's navigation in milliseconds:
+# {domContentLoaded, load} relative to the start of the navigation.
+PAGE_LOAD_TIMING_JS = """
+var entry = performance.getEntriesByType('navigation')[0];
+if (!entry) {
+    return null;
+}
+return {domContentLoaded: entry.domContentLoadedEventEnd, load: entry.loadEventEnd};
+"""
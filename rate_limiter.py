@@ -0,0 +1,182 @@
+"""
+Pacing of the requests the bot sends to Instagram.
+
+Navigations, list scrolls and API fetches all take a token from one
+bucket before they go out, with a little random jitter so the traffic has
+no fixed rhythm. When Instagram signals throttling (a rate limit page or
+an HTTP 429) the scheduler pauses everything with exponential backoff,
+lowers the rate, and lets it climb back after a run of requests that went
+through without complaint.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+from run_log import get_logger, sleep
+
+log = get_logger("rate_limiter")
+
+# Relative cost of each kind of request; a navigation loads a whole page
+DEFAULT_COSTS = {"navigation": 2.0, "scroll": 1.0, "fetch": 1.0}
+
+
+class RequestScheduler:
+    """Token bucket with jitter, multiplicative slow-down and backoff on throttling."""
+
+    def __init__(self, rate: float = 3.0, burst: float = 6.0, min_rate: float = 0.2,
+                 jitter: float = 0.3, backoff: float = 60.0, max_backoff: float = 900.0,
+                 slowdown: float = 0.5, recovery_after: int = 30, recovery_step: float = 0.1,
+                 max_throttle_retries: int = 4):
+        """
+        Args:
+            rate: Highest sustained rate, in request cost units per second
+            burst: Bucket size, i.e. how many requests may go out back to back
+            min_rate: Lowest rate throttling may push the scheduler down to
+            jitter: Random extra delay per request, as a fraction of the
+                current interval between requests
+            backoff: Pause after the first throttle signal (seconds), doubled
+                on every further signal until requests go through again
+            max_backoff: Longest single pause (seconds)
+            slowdown: Factor the rate is multiplied by on each throttle signal
+            recovery_after: Requests without a throttle signal after which
+                the rate is raised again
+            recovery_step: How much of the highest rate is added back each time
+            max_throttle_retries: Throttle signals in a row after which
+                callers should give up instead of waiting again
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.jitter = jitter
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.slowdown = slowdown
+        self.recovery_after = recovery_after
+        self.recovery_step = recovery_step
+        self.max_throttle_retries = max_throttle_retries
+
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._refilled_at = time.monotonic()
+        self._resume_at = 0.0
+        self._consecutive_throttles = 0
+        self._since_throttle = 0
+
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.throttle_events = 0
+        self.backoff_time = 0.0
+        self.last_throttle_reason = None
+
+    def acquire(self, kind: str = "fetch"):
+        """Block until a request of this kind may be sent."""
+        cost = DEFAULT_COSTS.get(kind, 1.0)
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    delay = self._resume_at - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= cost:
+                        self._tokens -= cost
+                        self.requests += 1
+                        self._since_throttle += 1
+                        if self._since_throttle >= self.recovery_after and self.rate < self.max_rate:
+                            self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery_step)
+                            self._since_throttle = 0
+                        delay = None
+                    else:
+                        delay = (cost - self._tokens) / self.rate
+            if delay is None:
+                break
+            sleep(delay)
+
+        # Jitter is slept outside the lock so other threads keep their pace
+        extra = random.uniform(0, self.jitter * cost / self.rate) if self.jitter else 0.0
+        if extra:
+            sleep(extra)
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            with self._lock:
+                self.waits += 1
+                self.wait_time += waited
+
+    def throttled(self, reason: str, retry_after: Optional[float] = None) -> float:
+        """
+        Record a throttle signal and pause all requests.
+
+        Args:
+            reason: What signalled it, e.g. "HTTP 429" or "rate limit page"
+            retry_after: Pause requested by the server (seconds), used
+                instead of the backoff when longer
+
+        Returns:
+            How long requests are paused (seconds)
+        """
+        with self._lock:
+            pause = min(self.max_backoff, self.backoff * (2 ** self._consecutive_throttles))
+            if retry_after is not None:
+                pause = max(pause, retry_after) if self._consecutive_throttles else retry_after
+            self._consecutive_throttles += 1
+            self._since_throttle = 0
+            self.rate = max(self.min_rate, self.rate * self.slowdown)
+            self._tokens = 0.0
+            self._resume_at = max(self._resume_at, time.monotonic() + pause)
+            self._refilled_at = self._resume_at
+            self.throttle_events += 1
+            self.backoff_time += pause
+            self.last_throttle_reason = reason
+        log.warning(f"Throttled ({reason}): pausing {pause:.1f}s, rate now {self.rate:.2f}/s",
+                    extra={"event": "throttle", "reason": reason, "pause": round(pause, 1)})
+        return pause
+
+    def recovered(self):
+        """Record that requests go through again after throttling."""
+        with self._lock:
+            self._consecutive_throttles = 0
+
+    @property
+    def awaiting_recovery(self) -> bool:
+        """
+        Whether requests were throttled and the pause since has passed.
+
+        Only then does a request going through show that the throttling
+        is over; during the pause (e.g. another thread's probe of a page
+        loaded earlier) it does not.
+        """
+        with self._lock:
+            return self._consecutive_throttles > 0 and time.monotonic() >= self._resume_at
+
+    @property
+    def should_give_up(self) -> bool:
+        """Whether throttling has persisted through max_throttle_retries pauses."""
+        return self._consecutive_throttles > self.max_throttle_retries
+
+    def wait_until_resumed(self):
+        """Sleep through the current backoff pause, if any."""
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            sleep(delay)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def stats(self) -> dict:
+        """Current rate and a summary of the waits and throttling so far."""
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "requests": self.requests,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 3),
+                "throttle_events": self.throttle_events,
+                "backoff_time": round(self.backoff_time, 3),
+                "last_throttle_reason": self.last_throttle_reason,
+            }
@@ -0,0 +1,233 @@
+"""
+Structured logging and per-phase timing of a run.
+
+The bot's diagnostics go to the "instagram_bot" logger instead of being
+printed, so they can be silenced, filtered by level or written as JSON
+lines for a log collector:
+
+    configure_logging("DEBUG", json_output=True)
+
+(or INSTAGRAM_BOT_LOG_LEVEL / INSTAGRAM_BOT_LOG_FORMAT=json in the
+environment). Progress and results meant for the user are still printed.
+
+RunTimer records how long each phase took (login, profile load, link
+lookup, dialog open, container discovery, every scroll pass, ...) and
+splits the run into time spent sleeping, waiting on WebDriver and
+running Python.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+LOGGER_NAME = "instagram_bot"
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_local = threading.local()  # The RunTimer of the span running in this thread
+
+# Phases the bot times, in the order they usually run
+PHASES = ("login", "restore_session", "profile_load", "link_lookup", "dialog_open",
+          "container_discovery", "scroll_pass", "extract", "analysis")
+
+
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """The bot's logger, or one of its children (e.g. "rate_limiter")."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the record's ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """``[LEVEL] message key=value ...`` for reading in a terminal."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"[{record.levelname}] {record.getMessage()}"
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Writes to whatever sys.stderr is at the time, so redirections apply."""
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(level: Optional[str] = None, json_output: Optional[bool] = None,
+                      stream=None) -> logging.Logger:
+    """
+    Set up the bot's logger; calling it again replaces the earlier setup.
+
+    Args:
+        level: "DEBUG", "INFO", "WARNING", "ERROR" or "OFF" (default:
+            $INSTAGRAM_BOT_LOG_LEVEL, else WARNING)
+        json_output: Write JSON lines instead of text (default: whether
+            $INSTAGRAM_BOT_LOG_FORMAT is "json")
+        stream: File to write to (default: the current sys.stderr)
+
+    Returns:
+        The configured logger
+    """
+    level = (level or os.environ.get("INSTAGRAM_BOT_LOG_LEVEL") or "WARNING").upper()
+    if json_output is None:
+        json_output = os.environ.get("INSTAGRAM_BOT_LOG_FORMAT", "").lower() == "json"
+    logger = get_logger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if level == "OFF":
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL + 1)
+    else:
+        handler = logging.StreamHandler(stream) if stream is not None else _StderrHandler()
+        handler.setFormatter(JsonFormatter() if json_output else TextFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def _new_phase() -> dict:
+    return {"count": 0, "total": 0.0, "max": 0.0, "commands": 0, "max_commands": 0}
+
+
+def sleep(seconds: float):
+    """time.sleep() that counts towards the sleep time of the running RunTimer."""
+    timer = getattr(_local, "timer", None)
+    start = time.monotonic()
+    time.sleep(seconds)
+    if timer is not None:
+        timer.add_sleep(time.monotonic() - start)
+
+
+class RunTimer:
+    """
+    Per-phase durations of one bot's work, and where the time went.
+
+    Time inside top-level spans is the run time. Sleeps made through
+    run_log.sleep() and WebDriver commands reported with add_webdriver()
+    while a span is open are subtracted from it; the rest is Python
+    (including WebDriverWait's own polling).
+    """
+
+    def __init__(self, command_count: Optional[Callable[[], int]] = None):
+        """
+        Args:
+            command_count: Returns how many WebDriver commands have been sent
+                so far (the bot's CommandStats.total); spans and the summary
+                report the commands sent since. None reports no commands
+        """
+        self.phases = {}  # name -> {"count", "total", "max", "commands", "max_commands"}
+        self.run_time = 0.0
+        self.sleep_time = 0.0
+        self.webdriver_time = 0.0
+        self._command_count = command_count or (lambda: 0)
+        self._commands_at_start = self._command_count()
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._log = get_logger("timing")
+
+    @contextmanager
+    def span(self, phase: str, **fields):
+        """Time the enclosed block as one occurrence of phase."""
+        previous = getattr(_local, "timer", None)
+        _local.timer = self
+        self._depth += 1
+        start = time.monotonic()
+        commands_before = self._command_count()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self._depth -= 1
+            _local.timer = previous
+            if self._depth == 0:
+                self.run_time += elapsed
+            self.record(phase, elapsed, commands=self._command_count() - commands_before, **fields)
+
+    def record(self, phase: str, seconds: float, commands: int = 0, **fields):
+        """Add one occurrence of phase, timed by the caller, that sent commands WebDriver commands."""
+        with self._lock:
+            stats = self.phases.setdefault(phase, _new_phase())
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["commands"] += commands
+            stats["max_commands"] = max(stats["max_commands"], commands)
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("span %s %.3fs", phase, seconds,
+                            extra={"event": "span", "phase": phase, "seconds": round(seconds, 4),
+                                   "commands": commands, **fields})
+
+    def add_sleep(self, seconds: float):
+        with self._lock:
+            self.sleep_time += seconds
+
+    def add_webdriver(self, seconds: float):
+        """Account the time of one WebDriver command, if it was sent inside a span."""
+        if self._depth:
+            with self._lock:
+                self.webdriver_time += seconds
+
+    def merge(self, other: "RunTimer"):
+        """Add another timer's phases (e.g. a worker bot's) to this one."""
+        with self._lock:
+            for phase, stats in other.phases.items():
+                mine = self.phases.setdefault(phase, _new_phase())
+                mine["count"] += stats["count"]
+                mine["total"] += stats["total"]
+                mine["max"] = max(mine["max"], stats["max"])
+                mine["commands"] += stats["commands"]
+                mine["max_commands"] = max(mine["max_commands"], stats["max_commands"])
+
+    def summary(self) -> dict:
+        """Run, sleep, WebDriver and Python time plus the per-phase figures, in seconds."""
+        commands = self._command_count() - self._commands_at_start
+        with self._lock:
+            return {
+                "run": round(self.run_time, 3),
+                "sleep": round(self.sleep_time, 3),
+                "webdriver": round(self.webdriver_time, 3),
+                "python": round(max(0.0, self.run_time - self.sleep_time - self.webdriver_time), 3),
+                "webdriver_commands": commands,
+                "phases": {
+                    phase: {"count": stats["count"], "total": round(stats["total"], 3),
+                            "max": round(stats["max"], 3), "commands": stats["commands"],
+                            "max_commands": stats["max_commands"]}
+                    for phase, stats in self.phases.items()
+                },
+            }
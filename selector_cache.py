@@ -0,0 +1,70 @@
+"""
+Persistent ranking of the selectors that located each page element.
+
+Several elements (login inputs, the followers/following links, ...) are
+looked up through a list of fallback selectors because Instagram's markup
+changes over time. Remembering which selector matched last lets the next
+lookup try it first instead of timing out on stale candidates.
+"""
+
+import json
+import os
+import threading
+from typing import Optional, Sequence, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".instagram_bot", "selectors.json")
+
+# A selector as used with find_element: (By.XPATH, "//input[@name='x']")
+Selector = Tuple[str, str]
+
+
+def _key(selector: Selector) -> str:
+    return f"{selector[0]}={selector[1]}"
+
+
+class SelectorCache:
+    """Which selector last matched each logical element, with hit counts."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH):
+        """
+        Args:
+            path: JSON file the ranking is kept in; None keeps it in memory
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def winner(self, element: str, candidates: Sequence[Selector]) -> Optional[Selector]:
+        """Return the selector that matched element last time, if it is still a candidate."""
+        last = self._entries.get(element, {}).get("winner")
+        for candidate in candidates:
+            if _key(candidate) == last:
+                return candidate
+        return None
+
+    def record(self, element: str, selector: Selector):
+        """Remember that selector located element, and persist the ranking."""
+        with self._lock:
+            entry = self._entries.setdefault(element, {"winner": None, "hits": {}})
+            entry["winner"] = _key(selector)
+            entry["hits"][_key(selector)] = entry["hits"].get(_key(selector), 0) + 1
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"  # Several processes may share the file
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The ranking is an optimisation only
+            pass
@@ -0,0 +1,73 @@
+"""
+On-disk storage of Instagram session cookies.
+
+Saving the cookies of a logged-in browser lets a later run restore the
+session instead of going through the full login flow.
+"""
+
+import json
+import os
+import re
+import time
+from typing import List, Optional
+
+DEFAULT_SESSION_DIR = os.path.join(os.path.expanduser("~"), ".instagram_bot", "sessions")
+
+# Cookie that carries the authenticated Instagram session
+SESSION_COOKIE = "sessionid"
+
+
+class SessionStore:
+    """Cookie jars saved as one JSON file per account."""
+
+    def __init__(self, directory: str = DEFAULT_SESSION_DIR):
+        """
+        Args:
+            directory: Folder holding the cookie files (created on first save)
+        """
+        self.directory = directory
+
+    def path_for(self, username: str) -> str:
+        """Return the cookie file path for an account."""
+        safe_name = re.sub(r'[^A-Za-z0-9._-]', '_', username.lower())
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    def load(self, username: str) -> Optional[List[dict]]:
+        """
+        Load the saved cookies for an account.
+
+        Returns:
+            The cookies, or None if there are none or the session cookie
+            has already expired
+        """
+        path = self.path_for(username)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cookies = json.load(f).get("cookies", [])
+        except (OSError, ValueError):
+            return None
+
+        session_cookie = next((c for c in cookies if c.get("name") == SESSION_COOKIE), None)
+        if not session_cookie:
+            return None
+        expiry = session_cookie.get("expiry")
+        if expiry and expiry <= time.time():
+            return None
+        return cookies
+
+    def save(self, username: str, cookies: List[dict]):
+        """Save an account's cookies, readable by the current user only."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(username)
+        tmp_path = path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"username": username, "saved_at": time.time(), "cookies": cookies}, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, username: str):
+        """Forget an account's saved session."""
+        try:
+            os.remove(self.path_for(username))
+        except FileNotFoundError:
+            pass
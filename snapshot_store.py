@@ -0,0 +1,278 @@
+"""
+SQLite history of follower/following lists.
+
+Every extraction is stored as a timestamped snapshot so runs can be
+compared: new followers, lost followers, who unfollowed since a date.
+Usernames are interned in a users table and snapshots only hold integer
+ids, so daily snapshots of large accounts stay small, and differences are
+computed by indexed anti-joins inside SQLite rather than in Python.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".instagram_bot", "snapshots.db")
+
+LIST_TYPES = ("followers", "following")
+
+# How a snapshot was taken: a full scroll through the list, or an
+# incremental scrape of the newest entries merged into the previous list
+SNAPSHOT_MODES = ("full", "incremental")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    list_type TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    user_count INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 1,
+    mode TEXT NOT NULL DEFAULT 'full'
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_account
+    ON snapshots (account, list_type, taken_at);
+CREATE TABLE IF NOT EXISTS snapshot_members (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    PRIMARY KEY (snapshot_id, user_id)
+) WITHOUT ROWID;
+"""
+
+_SNAPSHOT_COLUMNS = "id, account, list_type, taken_at, user_count, complete, mode"
+
+# Members of snapshot :new that are not in snapshot :old
+_DIFF_SQL = """
+SELECT u.username
+FROM snapshot_members n
+JOIN users u ON u.id = n.user_id
+WHERE n.snapshot_id = :new
+  AND NOT EXISTS (
+      SELECT 1 FROM snapshot_members o
+      WHERE o.snapshot_id = :old AND o.user_id = n.user_id
+  )
+ORDER BY u.username
+"""
+
+
+class Snapshot(NamedTuple):
+    """One stored extraction of a list."""
+    id: int
+    account: str
+    list_type: str
+    taken_at: str
+    user_count: int
+    complete: bool
+    mode: str = "full"
+
+
+class SnapshotDiff(NamedTuple):
+    """Users added to and removed from a list between two snapshots."""
+    old: Optional[Snapshot]
+    new: Optional[Snapshot]
+    added: List[str]
+    removed: List[str]
+
+
+def _timestamp(value: Union[datetime, str, None] = None) -> str:
+    """
+    Normalise a datetime or ISO string to the stored UTC format.
+
+    A bare date ("2024-06-01") stands for the end of that day, so "as of"
+    queries include snapshots taken on it.
+    """
+    if value is None:
+        value = datetime.now(timezone.utc)
+    if isinstance(value, str):
+        if len(value) == 10:
+            return value + "T23:59:59Z"
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SnapshotStore:
+    """Timestamped follower/following snapshots in a local SQLite database."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared behind a lock; bots may save from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        """Bring databases created by older versions up to the current schema."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(snapshots)")}
+        if "mode" not in columns:
+            self._conn.execute("ALTER TABLE snapshots ADD COLUMN mode TEXT NOT NULL DEFAULT 'full'")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def save_snapshot(self, account: str, list_type: str, usernames: Iterable[str],
+                      complete: bool = True,
+                      taken_at: Union[datetime, str, None] = None,
+                      mode: str = "full") -> Snapshot:
+        """
+        Store one extraction of a list.
+
+        Args:
+            account: The Instagram account the list belongs to
+            list_type: "followers" or "following"
+            usernames: Usernames in the list
+            complete: False if the extraction is known to have missed users
+            taken_at: When the list was extracted (defaults to now)
+            mode: "full" or "incremental" (see SNAPSHOT_MODES)
+
+        Returns:
+            The stored snapshot
+        """
+        if list_type not in LIST_TYPES:
+            raise ValueError(f"Unknown list type: {list_type}")
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode: {mode}")
+        rows = [(username,) for username in set(usernames)]
+        taken_at = _timestamp(taken_at)
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO snapshots (account, list_type, taken_at, user_count, complete, mode) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (account, list_type, taken_at, len(rows), int(complete), mode)
+            )
+            snapshot_id = cursor.lastrowid
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (username TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM incoming")
+            self._conn.executemany("INSERT INTO incoming (username) VALUES (?)", rows)
+            self._conn.execute("INSERT OR IGNORE INTO users (username) SELECT username FROM incoming")
+            self._conn.execute(
+                "INSERT INTO snapshot_members (snapshot_id, user_id) "
+                "SELECT ?, u.id FROM incoming i JOIN users u ON u.username = i.username",
+                (snapshot_id,)
+            )
+            self._conn.execute("DELETE FROM incoming")
+
+        return Snapshot(snapshot_id, account, list_type, taken_at, len(rows), complete, mode)
+
+    def latest_snapshot(self, account: str, list_type: str,
+                        before: Union[datetime, str, None] = None,
+                        complete_only: bool = False,
+                        mode: Optional[str] = None) -> Optional[Snapshot]:
+        """
+        Return the most recent snapshot of a list.
+
+        Args:
+            account: The Instagram account
+            list_type: "followers" or "following"
+            before: Only consider snapshots taken at or before this time
+            complete_only: Skip snapshots marked as incomplete
+            mode: Only consider snapshots taken in this mode
+
+        Returns:
+            The snapshot, or None if there is none
+        """
+        query = f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots WHERE account = ? AND list_type = ?"
+        params = [account, list_type]
+        if before is not None:
+            query += " AND taken_at <= ?"
+            params.append(_timestamp(before))
+        if complete_only:
+            query += " AND complete = 1"
+        if mode is not None:
+            query += " AND mode = ?"
+            params.append(mode)
+        query += " ORDER BY taken_at DESC, id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return self._to_snapshot(row)
+
+    def previous_snapshot(self, snapshot: Snapshot) -> Optional[Snapshot]:
+        """Return the snapshot of the same list taken just before the given one."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots WHERE account = ? AND list_type = ? "
+                "AND (taken_at < ? OR (taken_at = ? AND id < ?)) "
+                "ORDER BY taken_at DESC, id DESC LIMIT 1",
+                (snapshot.account, snapshot.list_type, snapshot.taken_at,
+                 snapshot.taken_at, snapshot.id)
+            ).fetchone()
+        return self._to_snapshot(row)
+
+    def snapshot_usernames(self, snapshot: Snapshot) -> List[str]:
+        """Return the usernames stored in a snapshot, sorted."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT u.username FROM snapshot_members m JOIN users u ON u.id = m.user_id "
+                "WHERE m.snapshot_id = ? ORDER BY u.username",
+                (snapshot.id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def diff(self, old: Optional[Snapshot], new: Optional[Snapshot]) -> SnapshotDiff:
+        """Compute who was added and removed between two snapshots of a list."""
+        if old is None or new is None:
+            return SnapshotDiff(old, new, [], [])
+        with self._lock:
+            added = [row[0] for row in self._conn.execute(_DIFF_SQL, {"new": new.id, "old": old.id})]
+            removed = [row[0] for row in self._conn.execute(_DIFF_SQL, {"new": old.id, "old": new.id})]
+        return SnapshotDiff(old, new, added, removed)
+
+    def changes(self, account: str, list_type: str = "followers",
+                since: Union[datetime, str, None] = None) -> SnapshotDiff:
+        """
+        Compare the latest snapshot of a list with an earlier one.
+
+        Args:
+            account: The Instagram account
+            list_type: "followers" or "following"
+            since: Compare against the last snapshot taken at or before this
+                time (e.g. "2024-06-01"); defaults to the previous snapshot
+
+        Returns:
+            SnapshotDiff; for followers, ``added`` are new followers and
+            ``removed`` are accounts that unfollowed
+        """
+        new = self.latest_snapshot(account, list_type)
+        if new is None:
+            return SnapshotDiff(None, None, [], [])
+        if since is None:
+            old = self.previous_snapshot(new)
+        else:
+            old = self.latest_snapshot(account, list_type, before=since)
+            if old is not None and old.id == new.id:
+                old = None
+        return self.diff(old, new)
+
+    def new_followers(self, account: str, since: Union[datetime, str, None] = None) -> List[str]:
+        """Accounts that started following since the previous snapshot (or a date)."""
+        return self.changes(account, "followers", since).added
+
+    def lost_followers(self, account: str, since: Union[datetime, str, None] = None) -> List[str]:
+        """Accounts that unfollowed since the previous snapshot (or a date)."""
+        return self.changes(account, "followers", since).removed
+
+    @staticmethod
+    def _to_snapshot(row) -> Optional[Snapshot]:
+        if row is None:
+            return None
+        return Snapshot(row[0], row[1], row[2], row[3], row[4], bool(row[5]), row[6])
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top level of the repository, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_instagram_server import FakeInstagram, serve, synthetic_users  # noqa: E402
+
+
+@pytest.fixture
+def fake_site():
+    """Start a FakeInstagram on a free port; yields a function building it with the given options."""
+    servers = []
+
+    def start(**options):
+        options.setdefault("followers", synthetic_users(130, "follower"))
+        app = FakeInstagram(**options)
+        server = serve(app)
+        servers.append(server)
+        return app, f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,48 @@
+import pytest
+
+from command_stats import CommandBudgetExceeded, CommandStats, check_budgets, parse_budgets
+from run_log import RunTimer
+
+
+def test_parses_phase_and_total_budgets():
+    assert parse_budgets(["scroll_pass=4", "total=2000"]) == {"scroll_pass": 4, "total": 2000}
+
+
+@pytest.mark.parametrize("spec", ["scroll_pass", "scroll_pass=", "=4", "scroll_pass=four"])
+def test_rejects_malformed_budgets(spec):
+    with pytest.raises(ValueError, match="expected PHASE=COUNT"):
+        parse_budgets([spec])
+
+
+def test_rejects_unknown_phases():
+    with pytest.raises(ValueError, match="Unknown phase 'scroll-pass'"):
+        parse_budgets(["scroll-pass=4"])
+
+
+def test_phase_budgets_apply_per_occurrence():
+    timer = RunTimer()
+    timer.record("scroll_pass", 0.1, commands=3)
+    timer.record("scroll_pass", 0.1, commands=5)
+
+    assert check_budgets(timer, {"scroll_pass": 5}) == []
+    with pytest.raises(CommandBudgetExceeded, match="scroll_pass used 5 commands"):
+        check_budgets(timer, {"scroll_pass": 4})
+
+
+def test_timer_counts_commands_from_the_command_stats():
+    stats = CommandStats(track_call_sites=False)
+    stats.record("findElements", 0.01)
+    timer = RunTimer(lambda: stats.total)
+    with timer.span("scroll_pass"):
+        stats.record("executeScript", 0.01)
+        stats.record("executeScript", 0.01)
+    worker = CommandStats(track_call_sites=False)
+    worker.record("get", 0.1)
+    stats.merge(worker)
+
+    summary = timer.summary()
+    assert summary["phases"]["scroll_pass"]["commands"] == 2
+    assert summary["webdriver_commands"] == 3  # Sent since the timer started, the worker's included
+    assert stats.total == stats.as_dict()["total"] == 4
+    with pytest.raises(CommandBudgetExceeded, match="total used 3 commands"):
+        check_budgets(timer, {"total": 2})
@@ -0,0 +1,139 @@
+import pytest
+import requests
+
+from http_backend import HttpListClient, _is_cursor_error
+from page_health import PageHealthError
+from rate_limiter import RequestScheduler
+
+
+def make_client(app, base_url, **options):
+    """A client logged into app, with retry delays short enough for tests."""
+    options.setdefault("backoff", 0.01)
+    cookies = [{"name": "sessionid", "value": app.new_session()}]
+    return HttpListClient(cookies, base_url=base_url, **options)
+
+
+def usernames(users):
+    return [user.username for user in users]
+
+
+def test_profile_reports_id_and_counts(fake_site):
+    app, base_url = fake_site()
+    client = make_client(app, base_url)
+
+    profile = client.profile(app.username)
+
+    assert profile == {"id": app.user_id, "followers": 130, "following": len(app.lists["following"])}
+
+
+def test_fetch_list_reads_every_page_in_order(fake_site):
+    app, base_url = fake_site(page_size=12)
+    client = make_client(app, base_url)
+
+    users, reached_end = client.fetch_list(app.user_id, "followers")
+
+    assert reached_end
+    assert usernames(users) == [user["username"] for user in app.lists["followers"]]
+    assert client.requests_made == 11  # ceil(130 / 12)
+    assert users[0].full_name == "Follower 0"
+
+
+def test_fetch_list_reports_pages_to_on_page_only(fake_site, capsys):
+    app, base_url = fake_site(page_size=50)
+    client = make_client(app, base_url)
+    seen = []
+
+    client.fetch_list(app.user_id, "followers", on_page=lambda users, cursor: seen.append(len(users)))
+
+    assert seen == [50, 100, 130]
+    assert capsys.readouterr().out == ""
+
+
+def test_fetch_list_stops_at_a_run_of_known_users(fake_site):
+    app, base_url = fake_site(page_size=10)
+    client = make_client(app, base_url)
+    known = {user["username"] for user in app.lists["followers"][20:]}
+
+    users, reached_end = client.fetch_list(app.user_id, "followers",
+                                           known_usernames=known, known_run_length=5)
+
+    assert not reached_end
+    assert usernames(users) == [user["username"] for user in app.lists["followers"][:30]]
+
+
+def test_rate_limited_pages_are_retried(fake_site):
+    app, base_url = fake_site(page_size=12, rate_limit_every=3, retry_after=0)
+    client = make_client(app, base_url)
+
+    users, reached_end = client.fetch_list(app.user_id, "followers")
+
+    assert reached_end
+    assert len(users) == 130
+    assert app.rate_limited > 0
+    assert client.retries == app.rate_limited
+
+
+def test_rate_limited_pages_go_through_the_scheduler(fake_site):
+    app, base_url = fake_site(page_size=12, rate_limit_every=4, retry_after=0)
+    scheduler = RequestScheduler(rate=1000.0, burst=1000.0, jitter=0.0, backoff=0.01, max_backoff=0.05)
+    client = make_client(app, base_url, scheduler=scheduler)
+
+    users, reached_end = client.fetch_list(app.user_id, "followers")
+
+    assert reached_end
+    assert len(users) == 130
+    assert scheduler.stats()["throttle_events"] == app.rate_limited
+
+
+def test_persistent_rate_limit_raises(fake_site):
+    app, base_url = fake_site(rate_limit_every=1, retry_after=0)
+    client = make_client(app, base_url, max_retries=2)
+
+    with pytest.raises(PageHealthError):
+        client.fetch_list(app.user_id, "followers")
+    assert client.requests_made == 3
+
+
+def test_expired_cursor_restarts_the_list(fake_site):
+    app, base_url = fake_site(page_size=12, cursor_ttl=60)
+    client = make_client(app, base_url)
+
+    # Issued at 1970-01-01T00:00:01, long expired
+    users, reached_end = client.fetch_list(app.user_id, "followers", start_cursor="24.1000")
+
+    assert reached_end
+    assert len(users) == 130
+    assert client.cursor_restarts == 1
+    assert app.expired_cursors == 1
+
+
+def test_cursors_that_keep_expiring_give_up(fake_site):
+    # Every cursor is older than the TTL by the time the next page is requested
+    app, base_url = fake_site(page_size=12, cursor_ttl=0.001, latency=0.01)
+    client = make_client(app, base_url, max_cursor_restarts=2)
+
+    with pytest.raises(Exception, match="kept changing"):
+        client.fetch_list(app.user_id, "followers")
+    assert client.cursor_restarts == 2
+
+
+def test_unknown_session_is_reported_as_logged_out(fake_site):
+    app, base_url = fake_site()
+    client = HttpListClient([{"name": "sessionid", "value": "stale"}], base_url=base_url)
+
+    with pytest.raises(Exception, match="no longer logged in"):
+        client.fetch_list(app.user_id, "followers")
+
+
+def response(status, body):
+    result = requests.Response()
+    result.status_code = status
+    result._content = body.encode("utf-8")
+    return result
+
+
+def test_cursor_error_needs_the_api_error_message():
+    assert _is_cursor_error(response(400, '{"message": "Invalid max_id cursor", "status": "fail"}'))
+    assert not _is_cursor_error(response(400, '{"message": "Bad request", "status": "fail"}'))
+    assert not _is_cursor_error(response(400, "<html>Bad Request</html>"))
+    assert not _is_cursor_error(response(400, "[]"))
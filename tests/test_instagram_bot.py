@@ -0,0 +1,71 @@
+import pytest
+
+from instagram_bot import InstagramBot, ProfileCount, parse_count
+
+
+@pytest.mark.parametrize("text, count", [
+    ("512", 512),
+    ("1,234", 1234),
+    ("1.234", 1234),
+    ("1 234", 1234),
+    ("1 234", 1234),
+    ("1 234 followers", 1234),
+    ("1'234", 1234),
+    ("12,431,002 followers", 12431002),
+])
+def test_separators_group_thousands_without_a_suffix(text, count):
+    assert parse_count(text) == ProfileCount(count, 0, False)
+
+
+@pytest.mark.parametrize("text, count, uncertainty", [
+    ("12.4K", 12400, 50),
+    ("12.4k followers", 12400, 50),
+    ("12K", 12000, 500),
+    ("1.2M", 1200000, 50000),
+    ("1M", 1000000, 500000),
+    ("12,4 Tsd. Follower", 12400, 50),
+    ("1,2 Mio.", 1200000, 50000),
+    ("3,5 mil seguidores", 3500, 50),
+    ("2,1 mi", 2100000, 50000),
+    ("1 234,5 тыс.", 1234500, 50),
+    ("1.5B", 1500000000, 50000000),
+])
+def test_abbreviated_counts_carry_their_rounding_range(text, count, uncertainty):
+    assert parse_count(text) == ProfileCount(count, uncertainty, False)
+
+
+def test_title_counts_are_exact():
+    assert parse_count("12,431", exact=True) == ProfileCount(12431, 0, True)
+    assert parse_count("12.431", exact=True) == ProfileCount(12431, 0, True)
+
+
+@pytest.mark.parametrize("text", ["", None, "followers"])
+def test_no_count(text):
+    assert parse_count(text) is None
+
+
+def bot_expecting(count, count_tolerance=0.01):
+    bot = InstagramBot(count_tolerance=count_tolerance)
+    bot.profile_counts["followers"] = count
+    return bot
+
+
+def test_an_abbreviated_count_is_complete_from_the_bottom_of_its_range():
+    # "12.4K" is anything from 12,350 to 12,449
+    bot = bot_expecting(parse_count("12.4K"), count_tolerance=0.0)
+
+    assert bot._list_is_complete("followers", 12350)
+    assert not bot._list_is_complete("followers", 12349)
+    assert InstagramBot._stop_at(parse_count("12.4K")) == 12450
+
+
+def test_an_exact_count_allows_the_tolerance():
+    bot = bot_expecting(ProfileCount(1000, 0, True))
+
+    assert bot._list_is_complete("followers", 990)
+    assert not bot._list_is_complete("followers", 989)
+    assert InstagramBot._stop_at(ProfileCount(1000, 0, True)) == 1000
+
+
+def test_an_unknown_count_is_complete():
+    assert InstagramBot()._list_is_complete("followers", 0)
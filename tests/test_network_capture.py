@@ -0,0 +1,106 @@
+import base64
+import json
+
+import pytest
+import requests
+
+from fake_instagram_server import load_recorded_pages, synthetic_users
+from network_capture import FriendshipCapture, FriendshipUser, parse_friendship_page
+
+
+def test_parses_the_rest_page_shape(fake_site):
+    app, _ = fake_site(page_size=12)
+    status, payload = app.page("followers", None, 50)
+
+    users, cursor = parse_friendship_page(json.dumps(payload))
+
+    assert status == 200
+    assert len(users) == 12
+    assert users[0] == FriendshipUser(id="10000000", username="follower00000",
+                                      full_name="Follower 0", is_verified=True, is_private=True)
+    assert cursor == payload["next_max_id"]
+
+
+def test_last_rest_page_has_no_cursor():
+    users, cursor = parse_friendship_page(json.dumps({"users": [{"pk": 1, "username": "a"}],
+                                                      "next_max_id": None}))
+
+    assert [user.username for user in users] == ["a"]
+    assert cursor is None
+
+
+def test_parses_the_graphql_page_shape():
+    body = {"data": {"user": {"edge_follow": {
+        "edges": [{"node": {"id": "7", "username": "b", "full_name": "B"}}, {"node": {}}],
+        "page_info": {"has_next_page": True, "end_cursor": "QVF"},
+    }}}}
+
+    users, cursor = parse_friendship_page(json.dumps(body))
+
+    assert users == [FriendshipUser(id="7", username="b", full_name="B")]
+    assert cursor == "QVF"
+
+
+def test_rejects_other_responses():
+    with pytest.raises(ValueError):
+        parse_friendship_page(json.dumps({"status": "ok"}))
+    with pytest.raises(ValueError):
+        parse_friendship_page("<html></html>")
+
+
+class RecordingDriver:
+    """Stands in for Chrome: replays responses as performance log events and serves their bodies."""
+
+    def __init__(self):
+        self.events = []
+        self.bodies = {}
+
+    def respond(self, url, body, base64_encoded=False):
+        request_id = str(len(self.bodies))
+        if base64_encoded:
+            body = base64.b64encode(body.encode("utf-8")).decode("ascii")
+        self.bodies[request_id] = {"body": body, "base64Encoded": base64_encoded}
+        for method, params in (("Network.responseReceived", {"response": {"url": url}}),
+                               ("Network.loadingFinished", {})):
+            message = {"method": method, "params": dict(params, requestId=request_id)}
+            self.events.append({"message": json.dumps({"message": message})})
+
+    def get_log(self, log_type):
+        events, self.events = self.events, []
+        return events
+
+    def execute_cdp_cmd(self, command, params):
+        return self.bodies[params["requestId"]]
+
+
+def test_capture_reads_recorded_rest_and_graphql_pages(fake_site, tmp_path):
+    recorded = synthetic_users(30, "recorded")
+    for number, start in enumerate(range(0, 30, 12)):
+        (tmp_path / f"followers_{number:03}.json").write_text(json.dumps({"users": recorded[start:start + 12]}))
+    app, base_url = fake_site(page_size=12, **load_recorded_pages(str(tmp_path)))
+    session = requests.Session()
+    session.cookies.set("sessionid", app.new_session())
+    driver = RecordingDriver()
+    capture = FriendshipCapture(driver, "followers")
+
+    url = f"{base_url}/api/v1/friendships/{app.user_id}/followers/?count=12"
+    first = session.get(url).json()
+    driver.respond(url, json.dumps(first), base64_encoded=True)
+    second = session.get(f"{url}&max_id={first['next_max_id']}").json()
+    edges = [{"node": user} for user in second["users"]]
+    driver.respond(f"{base_url}/graphql/query/?query_hash=abc", json.dumps({"data": {"user": {
+        "edge_followed_by": {"edges": edges, "page_info": {"has_next_page": True, "end_cursor": "x"}},
+    }}}))
+    # Neither the following list nor an unrelated query belong to this capture
+    driver.respond(f"{base_url}/graphql/query/?query_hash=def", json.dumps({"data": {"user": {
+        "edge_follow": {"edges": [{"node": {"username": "someone_else"}}], "page_info": {}},
+    }}}))
+    driver.respond(f"{base_url}/graphql/query/?query_hash=ghi", json.dumps({"data": {"viewer": {}}}))
+    third = session.get(f"{url}&max_id={second['next_max_id']}").json()
+    driver.respond(url, json.dumps(third))
+
+    assert capture.drain() == [user["username"] for user in recorded]
+    assert capture.pages == 3
+    assert capture.lost_pages == 0
+    assert capture.exhausted
+    assert capture.users["recorded00000"].full_name == "Recorded 0"
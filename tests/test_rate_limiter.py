@@ -0,0 +1,31 @@
+import time
+
+from rate_limiter import RequestScheduler
+
+
+def test_backoff_doubles_until_requests_go_through_after_the_pause():
+    scheduler = RequestScheduler(backoff=0.05, max_backoff=1.0, max_throttle_retries=2)
+    assert not scheduler.awaiting_recovery
+
+    assert scheduler.throttled("rate limit page") == 0.05
+    # Still paused: a clean probe of an older page proves nothing
+    assert not scheduler.awaiting_recovery
+    assert scheduler.throttled("rate limit page") == 0.1
+    assert not scheduler.should_give_up
+
+    scheduler.wait_until_resumed()
+    assert scheduler.awaiting_recovery
+    scheduler.recovered()
+    assert not scheduler.awaiting_recovery
+    assert scheduler.throttled("rate limit page") == 0.05
+
+
+def test_gives_up_after_max_throttle_retries():
+    scheduler = RequestScheduler(backoff=0.01, max_throttle_retries=2)
+    for _ in range(3):
+        scheduler.throttled("HTTP 429")
+    assert scheduler.should_give_up
+
+    time.sleep(0.1)
+    scheduler.recovered()
+    assert not scheduler.should_give_up